@@ -21,12 +21,11 @@ django.setup()
 
 # Importer les modèles après la configuration de Django
 from neads.creators.models import Creator, Domain, ContentType, Location, Media
+from neads.creators.gazetteer import country_position
+from neads.creators.geocoding import geocode
 from neads.core.models import User
 from django.contrib.auth.models import Group
 
-# Cache pour les coordonnées géographiques (évite les requêtes répétées à l'API)
-GEOCODE_CACHE = {}
-
 def generate_random_password(length=12):
     """
     Génère un mot de passe aléatoire sécurisé.
@@ -78,122 +77,39 @@ def get_or_create_creator_user(email, first_name, last_name):
 
 def geocode_address(address, city, postal_code, country):
     """
-    Utilise l'API Nominatim pour géocoder une adresse internationale.
+    Géocode une adresse internationale au niveau de la ville: en mémoire avec
+    le gazetteer local (neads/creators/gazetteer.py), puis avec l'API Nominatim
+    si la ville est inconnue. Les résultats de Nominatim sont conservés dans le
+    cache de géocodage partagé (en base, voir neads/creators/geocoding.py).
     Ajoute une légère variation aléatoire pour éviter des points exacts superposés.
-    Inclut un cache pour éviter les requêtes répétées.
     """
     # S'assurer que le pays est spécifié, sinon utiliser France par défaut
     if not country or country.strip() == '':
         country = 'France'
         
-    # Normaliser l'adresse pour la clé de cache
-    cache_key = f"{city.lower() if city else ''}, {postal_code}, {country}"
+    # Construire l'adresse de recherche
+    search_address = f"{city}, {postal_code}, {country}"
     
-    # Vérifier le cache
-    if cache_key in GEOCODE_CACHE:
-        base_lat, base_lng = GEOCODE_CACHE[cache_key]
-    else:
-        # Construire l'adresse de recherche
-        search_address = f"{city}, {postal_code}, {country}"
-        
-        # Utiliser l'API Nominatim (OpenStreetMap)
-        nominatim_url = "https://nominatim.openstreetmap.org/search"
-        params = {
-            'q': search_address,
-            'format': 'json',
-            'limit': 1,
-            'addressdetails': 1
-        }
-        
-        # Ajouter un header d'agent utilisateur (requis par Nominatim)
-        headers = {
-            'User-Agent': 'NEADS Creators Import Script (contact@neads.io)'
-        }
-        
-        try:
-            # Attendre pour respecter la limitation de l'API (1 requête/seconde max)
-            time.sleep(1)
-            
-            response = requests.get(nominatim_url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data and len(data) > 0:
-                # Extraire les coordonnées
-                base_lat = float(data[0]['lat'])
-                base_lng = float(data[0]['lon'])
-                
-                # Mettre en cache les résultats
-                GEOCODE_CACHE[cache_key] = (base_lat, base_lng)
-                print(f"Coordonnées trouvées pour {search_address}: {base_lat}, {base_lng}")
-            else:
-                # Essayons juste avec la ville et le pays si l'adresse complète échoue
-                search_address = f"{city}, {country}"
-                params['q'] = search_address
-                
-                # Attendre à nouveau avant une nouvelle requête
-                time.sleep(1)
-                
-                response = requests.get(nominatim_url, params=params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data and len(data) > 0:
-                    # Extraire les coordonnées
-                    base_lat = float(data[0]['lat'])
-                    base_lng = float(data[0]['lon'])
-                    
-                    # Mettre en cache les résultats
-                    GEOCODE_CACHE[cache_key] = (base_lat, base_lng)
-                    print(f"Coordonnées trouvées pour {search_address}: {base_lat}, {base_lng}")
-                else:
-                    # Si tout échoue, utiliser des coordonnées par défaut selon le pays
-                    print(f"Échec de géocodage pour {search_address}, utilisation des coordonnées par défaut")
-                    
-                    # Dictionnaire des centres approximatifs des pays
-                    country_fallbacks = {
-                        'France': (46.603354, 1.888334),
-                        'Switzerland': (46.8182, 8.2275),
-                        'Suisse': (46.8182, 8.2275),
-                        'Belgium': (50.5039, 4.4699),
-                        'Belgique': (50.5039, 4.4699),
-                        'Canada': (56.1304, -106.3468),
-                        'USA': (37.0902, -95.7129),
-                        'États-Unis': (37.0902, -95.7129),
-                        'United Kingdom': (55.3781, -3.4360),
-                        'Royaume-Uni': (55.3781, -3.4360),
-                        'Germany': (51.1657, 10.4515),
-                        'Allemagne': (51.1657, 10.4515),
-                        'Spain': (40.4637, -3.7492),
-                        'Espagne': (40.4637, -3.7492),
-                        'Italy': (41.8719, 12.5674),
-                        'Italie': (41.8719, 12.5674)
-                    }
-                    
-                    # Utiliser les coordonnées du pays spécifié ou un point au centre de l'Europe
-                    base_lat, base_lng = country_fallbacks.get(country, (48.8566, 2.3522))
-        except Exception as e:
-            print(f"Erreur lors du géocodage de {search_address}: {str(e)}")
-            # Utiliser des coordonnées par défaut selon le pays (même mapping que ci-dessus)
-            country_fallbacks = {
-                'France': (46.603354, 1.888334),
-                'Switzerland': (46.8182, 8.2275),
-                'Suisse': (46.8182, 8.2275),
-                'Belgium': (50.5039, 4.4699),
-                'Belgique': (50.5039, 4.4699),
-                'Canada': (56.1304, -106.3468),
-                'USA': (37.0902, -95.7129),
-                'États-Unis': (37.0902, -95.7129),
-                'United Kingdom': (55.3781, -3.4360),
-                'Royaume-Uni': (55.3781, -3.4360),
-                'Germany': (51.1657, 10.4515),
-                'Allemagne': (51.1657, 10.4515),
-                'Spain': (40.4637, -3.7492),
-                'Espagne': (40.4637, -3.7492),
-                'Italy': (41.8719, 12.5674),
-                'Italie': (41.8719, 12.5674)
-            }
-            base_lat, base_lng = country_fallbacks.get(country, (48.8566, 2.3522))
+    try:
+        # Gazetteer local d'abord; le débit de 1 requête/seconde vers Nominatim est respecté par geocode()
+        position = geocode(search_address)
+        if position is None:
+            # Essayons juste avec la ville et le pays si l'adresse complète échoue
+            search_address = f"{city}, {country}"
+            position = geocode(search_address)
+        
+        if position is not None:
+            base_lat, base_lng = position
+            print(f"Coordonnées trouvées pour {search_address}: {base_lat}, {base_lng}")
+        else:
+            # Si tout échoue, utiliser des coordonnées par défaut selon le pays
+            print(f"Échec de géocodage pour {search_address}, utilisation des coordonnées par défaut")
+            # Utiliser les coordonnées du pays spécifié ou un point au centre de l'Europe
+            base_lat, base_lng = country_position(country) or (48.8566, 2.3522)
+    except Exception as e:
+        print(f"Erreur lors du géocodage de {search_address}: {str(e)}")
+        # Utiliser des coordonnées par défaut selon le pays
+        base_lat, base_lng = country_position(country) or (48.8566, 2.3522)
     
     # Ajouter une légère variation aléatoire (±500 mètres environ)
     # 0.005 degré ≈ 500 mètres à cette latitude
@@ -1,7 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q
 from django.template.loader import render_to_string
 from django.core.mail import send_mail
@@ -11,6 +10,7 @@ from django.http import JsonResponse
 from .models import User, UserProfile
 from .forms import AdminUserCreationForm, AdminUserEditForm, SendTempPasswordForm, ClientCreationForm, ConsultantCreationForm
 from .decorators import role_required
+from .pagination import next_page_query, paginate
 
 from neads.creators.models import Creator, Domain, Location
 
@@ -94,10 +94,8 @@ def user_list(request):
             Q(email__icontains=query)
         )
     
-    # Pagination
-    paginator = Paginator(users, 20)  # 20 utilisateurs par page
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Pagination (par curseur si le paramètre `cursor` est présent)
+    paginator, page_obj = paginate(request, users, 20, ordering=('-date_joined', 'id'))  # 20 utilisateurs par page
     
     # Préparer les choix de rôles pour le filtre
     role_choices = User.ROLE_CHOICES
@@ -109,7 +107,8 @@ def user_list(request):
         'role_filter': role_filter,
         'query': query,
         'role_choices': role_choices,
-        'total_users': paginator.count,
+        'total_users': paginator.count if paginator else None,
+        'next_page_query': next_page_query(request, page_obj),
         'is_admin': is_admin,
     }
     
@@ -73,6 +73,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
     
+    class Meta:
+        indexes = [
+            # Tris des listes d'utilisateurs et de clients (pagination par curseur)
+            models.Index(fields=['-date_joined', 'id'], name='user_date_joined_idx'),
+            models.Index(fields=['role', 'last_name', 'first_name', 'id'], name='user_role_name_idx'),
+        ]
+    
     def __str__(self):
         return self.email
     
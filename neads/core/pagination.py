@@ -0,0 +1,164 @@
+"""
+Pagination par curseur (keyset) du projet NEADS.
+
+Alternative au Paginator de Django pour le défilement infini: au lieu d'un
+COUNT(*) suivi d'un OFFSET (de plus en plus coûteux à mesure que l'on avance
+dans les pages), chaque page est obtenue par une condition sur les valeurs de
+tri du dernier élément de la page précédente. Le coût d'une page est donc
+proportionnel à sa taille, quelle que soit sa profondeur, à condition qu'un
+index composite corresponde au tri.
+
+Le curseur transmis au client est opaque (JSON encodé en base64 URL-safe).
+
+Exemple d'utilisation:
+    paginator = CursorPaginator(User.objects.all(), 20, ordering=('-date_joined', 'id'))
+    page = paginator.get_page(request.GET.get('cursor'))
+    page.next_cursor  # None sur la dernière page
+"""
+
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPage:
+    """Page de résultats obtenue par curseur."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __repr__(self):
+        return f"<CursorPage ({len(self)} objets)>"
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Paginateur par curseur.
+
+    `ordering` doit définir un ordre total (se terminer par un champ unique,
+    typiquement 'id'); par défaut, le tri du queryset est utilisé.
+    """
+
+    def __init__(self, queryset, per_page, ordering=None):
+        ordering = tuple(ordering or queryset.query.order_by)
+        if not ordering:
+            raise ValueError("CursorPaginator nécessite un queryset trié.")
+        self.ordering = ordering
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = int(per_page)
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+    def get_page(self, cursor=None):
+        """Retourne la page qui suit le curseur (la première si le curseur est vide ou invalide)."""
+        queryset = self.queryset
+        if cursor:
+            try:
+                queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+            except InvalidCursor:
+                pass
+
+        # Un élément de plus que la taille de page permet de savoir s'il reste des résultats
+        items = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(items) > self.per_page:
+            items = items[:self.per_page]
+            next_cursor = self.encode_cursor(items[-1])
+        return CursorPage(items, next_cursor)
+
+    def _after(self, values):
+        """
+        Condition "strictement après" pour un tri multi-colonnes:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, obj):
+        values = [self._serialize(getattr(obj, name)) for name, _ in self.fields]
+        payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise InvalidCursor(str(e))
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor("Curseur incompatible avec le tri demandé.")
+        return [self._deserialize(name, value) for (name, _), value in zip(self.fields, values)]
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        return value
+
+    def _deserialize(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation (ex: score de pertinence): valeur JSON brute
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError as e:
+            raise InvalidCursor(str(e))
+
+
+def cursor_requested(request):
+    """Le mode curseur est activé explicitement par le paramètre `cursor` (même vide)."""
+    return 'cursor' in request.GET
+
+
+def paginate(request, queryset, per_page, ordering=None):
+    """
+    Pagine un queryset selon le mode demandé par la requête.
+    Retourne (Paginator, Page) en mode classique et (None, CursorPage) en mode curseur.
+    """
+    if cursor_requested(request):
+        page = CursorPaginator(queryset, per_page, ordering).get_page(request.GET.get('cursor'))
+        return None, page
+    paginator = Paginator(queryset, per_page)
+    return paginator, paginator.get_page(request.GET.get('page', 1))
+
+
+def next_page_query(request, page):
+    """Paramètres GET de la page suivante par curseur (filtres courants conservés), ou None."""
+    if not isinstance(page, CursorPage) or not page.has_next:
+        return None
+    params = request.GET.copy()
+    params.pop('page', None)
+    params['cursor'] = page.next_cursor
+    return params.urlencode()
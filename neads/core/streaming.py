@@ -0,0 +1,58 @@
+"""
+Réponses JSON en flux du projet NEADS.
+
+Pour les réponses volumineuses (ex: tous les points de la carte), JsonResponse
+oblige à construire toute la liste en mémoire puis à l'encoder d'un bloc: la
+mémoire du worker et le délai avant le premier octet croissent avec le
+catalogue. StreamingJsonResponse encode les éléments au fil de l'eau, par
+lots, et envoie le document au fur et à mesure:
+
+    {"points": [{...}, {...}, ...], "total": 2}
+
+Exemple d'utilisation:
+    return StreamingJsonResponse(point(c) for c in creators_iterator)
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+# Nombre d'éléments encodés par morceau envoyé
+STREAM_BATCH_SIZE = 500
+
+
+def iter_json_document(items, key='points', count_key='total', extra=None, batch_size=STREAM_BATCH_SIZE):
+    """
+    Générateur des morceaux d'un document JSON {key: [items...], count_key: n, **extra}.
+    Le nombre d'éléments, inconnu au départ, est écrit après la liste.
+    """
+    encode = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+    yield f'{{{json.dumps(key)}:['
+
+    count = 0
+    batch = []
+    for item in items:
+        batch.append(encode(item))
+        count += 1
+        if len(batch) >= batch_size:
+            yield (',' if count > len(batch) else '') + ','.join(batch)
+            batch = []
+    if batch:
+        yield (',' if count > len(batch) else '') + ','.join(batch)
+
+    tail = {count_key: count} if count_key else {}
+    tail.update(extra or {})
+    yield ']' + ''.join(f',{json.dumps(name)}:{encode(value)}' for name, value in tail.items()) + '}'
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """Réponse JSON dont la liste principale est encodée et envoyée en flux."""
+
+    def __init__(self, items, key='points', count_key='total', extra=None,
+                 batch_size=STREAM_BATCH_SIZE, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(
+            (chunk.encode('utf-8') for chunk in iter_json_document(items, key, count_key, extra, batch_size)),
+            **kwargs,
+        )
@@ -0,0 +1,82 @@
+import pytest
+import colorlog
+import logging
+from django.test import TestCase, Client
+from django.urls import reverse
+from neads.core.models import User
+from neads.core.pagination import CursorPaginator
+from neads.creators.models import Creator, Location
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('core_pagination_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestCursorPaginator(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests de la pagination par curseur")
+        # Notes en doublon pour vérifier le départage par les colonnes suivantes
+        for i in range(7):
+            Creator.objects.create(
+                first_name=f'Prénom{i}', last_name='Nom', age=30, gender='F',
+                email=f'creator{i}@example.com', location=Location.objects.create(),
+                average_rating=i % 3,
+            )
+
+    def test_pages_cover_all_items_once(self):
+        """Les pages successives couvrent tous les éléments, sans doublon, dans l'ordre du tri."""
+        logger.info("Test du parcours complet par curseur")
+        ordering = ('-average_rating', 'full_name', 'id')
+        paginator = CursorPaginator(Creator.objects.all(), 3, ordering=ordering)
+        seen, cursor = [], None
+        while True:
+            page = paginator.get_page(cursor)
+            seen.extend(creator.id for creator in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(Creator.objects.order_by(*ordering).values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Un curseur illisible ramène à la première page."""
+        logger.info("Test d'un curseur invalide")
+        paginator = CursorPaginator(Creator.objects.all(), 3, ordering=('-created_at', 'id'))
+        first = [creator.id for creator in paginator.get_page()]
+        self.assertEqual([creator.id for creator in paginator.get_page('pas-un-curseur')], first)
+
+    def test_gallery_ajax_cursor(self):
+        """La galerie AJAX renvoie un curseur suivant en mode curseur."""
+        logger.info("Test du mode curseur de la galerie")
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        client = Client()
+        client.login(username='consultant@example.com', password='pass')
+        url = reverse('gallery_view')
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+        Creator.objects.bulk_create([
+            Creator(first_name=f'Autre{i}', last_name='Nom', age=30, gender='M', email=f'autre{i}@example.com')
+            for i in range(8)
+        ])
+        first = client.get(url, {'cursor': ''}, **headers).json()
+        self.assertEqual(len(first['creators']), 12)
+        self.assertTrue(first['has_next'])
+        second = client.get(url, {'cursor': first['next_cursor']}, **headers).json()
+        self.assertEqual(len(second['creators']), 3)
+        self.assertIsNone(second['next_cursor'])
+        ids = {c['id'] for c in first['creators']} | {c['id'] for c in second['creators']}
+        self.assertEqual(len(ids), 15)
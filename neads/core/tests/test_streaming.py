@@ -0,0 +1,53 @@
+import pytest
+import colorlog
+import json
+import logging
+from decimal import Decimal
+from django.test import SimpleTestCase
+from neads.core.streaming import StreamingJsonResponse, iter_json_document
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('core_streaming_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+class TestStreamingJson(SimpleTestCase):
+    def test_document_is_valid_json(self):
+        """Le document produit par lots est un JSON valide, quel que soit le nombre d'éléments."""
+        logger.info("Test de l'encodage JSON en flux")
+        for count in (0, 1, 3, 7):
+            items = ({'id': i, 'rating': Decimal('4.5'), 'name': 'Hélène'} for i in range(count))
+            chunks = list(iter_json_document(items, batch_size=3, extra={'version': 2}))
+            data = json.loads(''.join(chunks))
+            self.assertEqual(data['total'], count)
+            self.assertEqual(data['version'], 2)
+            self.assertEqual([p['id'] for p in data['points']], list(range(count)))
+
+    def test_response_is_lazy(self):
+        """Les éléments ne sont produits qu'à la lecture de la réponse."""
+        logger.info("Test du caractère paresseux de la réponse")
+        consumed = []
+
+        def items():
+            for i in range(4):
+                consumed.append(i)
+                yield {'id': i}
+
+        response = StreamingJsonResponse(items(), key='creators', count_key=None, batch_size=2)
+        self.assertEqual(consumed, [])
+        self.assertEqual(response['Content-Type'], 'application/json')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(json.loads(body), {'creators': [{'id': 0}, {'id': 1}, {'id': 2}, {'id': 3}]})
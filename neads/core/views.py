@@ -8,7 +8,6 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 from django.conf import settings
 from django.contrib import messages
-from django.core.paginator import Paginator
 from django.db.models import Q
 import datetime
 import logging
@@ -23,6 +22,7 @@ from django.views.decorators.csrf import csrf_exempt
 from .models import User, UserProfile
 from .forms import LoginForm, TemporaryLoginForm, UserProfileForm, SetPasswordForm, ClientCreationForm
 from .decorators import role_required
+from .pagination import next_page_query, paginate
 from neads.creators.models import Creator
 
 
@@ -106,15 +106,14 @@ def creator_list(request):
             Q(full_name__icontains=search_query)
         )
     
-    # Pagination
-    paginator = Paginator(creators, 15)  # 15 créateurs par page
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Pagination (par curseur si le paramètre `cursor` est présent)
+    paginator, page_obj = paginate(request, creators, 15, ordering=('-created_at', 'id'))  # 15 créateurs par page
     
     context = {
         'creators': page_obj,
         'search_query': search_query,
-        'total_creators': paginator.count,
+        'total_creators': paginator.count if paginator else None,
+        'next_page_query': next_page_query(request, page_obj),
     }
     
     return render(request, 'core/creator_list.html', context)
@@ -528,7 +527,7 @@ def client_list(request):
     Vue pour la gestion des clients (pour consultants et admins).
     """
     # Filtrer uniquement les clients
-    clients = User.objects.filter(role='client').order_by('last_name', 'first_name')
+    clients = User.objects.filter(role='client').order_by('last_name', 'first_name', 'id')
     
     # Recherche par nom/email
     search_query = request.GET.get('query')
@@ -539,15 +538,14 @@ def client_list(request):
             Q(email__icontains=search_query)
         )
     
-    # Pagination
-    paginator = Paginator(clients, 15)  # 15 clients par page
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Pagination (par curseur si le paramètre `cursor` est présent)
+    paginator, page_obj = paginate(request, clients, 15)  # 15 clients par page
     
     context = {
         'clients': page_obj,
         'search_query': search_query,
-        'total_clients': paginator.count,
+        'total_clients': paginator.count if paginator else None,
+        'next_page_query': next_page_query(request, page_obj),
     }
     
     return render(request, 'core/client_list.html', context)
@@ -0,0 +1,172 @@
+"""
+Décomposition des adresses du projet NEADS.
+
+Chaque localisation conserve, en plus de son adresse libre (full_address),
+des colonnes structurées et indexées calculées à l'écriture (Location.save):
+rue, code postal, ville (nom du référentiel, voir cities.py), département et
+région (France, voir departments.py) et code ISO2 du pays. Les filtres par
+pays, ville, département et région sont des recherches exactes sur ces
+colonnes, sans `icontains` sur l'adresse.
+
+Les localisations enregistrées avant l'ajout des colonnes sont décomposées par
+`python manage.py backfill_location_addresses`.
+
+Avant décomposition, l'adresse est normalisée (normalize_address): le code
+postal administratif de quelques grandes villes est remplacé par le code
+couramment utilisé (Montpellier 34062 -> 34000, arrondissements de Lyon et
+Marseille). Seule la localité accolée au code postal compte: une rue qui porte
+le nom d'une ville ("5 rue de Lille, 75007 Paris") ne change pas le code.
+Tous les noms de villes et d'arrondissements sont compilés en une seule
+expression régulière (alternance) au chargement du module. Les adresses déjà enregistrées sont normalisées
+à nouveau par `python manage.py renormalize_addresses`.
+
+Exemple d'utilisation:
+    parse_address("1 rue Balay, 42000 Saint-Étienne, France")
+    # {'street': '1 rue Balay', 'postcode': '42000', 'city': 'Saint-Étienne',
+    #  'department': '42', 'region': '84', 'country_iso2': 'FR'}
+"""
+
+import re
+
+from .cities import POSTCODE_RE, country_code, normalize, parse_city
+from .departments import region_of
+
+# Colonnes structurées de Location, dans l'ordre de parse_address()
+ADDRESS_FIELDS = ('street', 'postcode', 'city', 'department', 'region', 'country_iso2')
+
+# Codes postaux couramment utilisés, par ville (au lieu des codes administratifs),
+# arrondissements compris (le nom de la ville seule en dernier).
+POSTAL_CORRECTIONS = (
+    ('Montpellier', (('Montpellier', '34000'),)),  # Au lieu de 34062 (administratif)
+    ('Marseille', tuple(
+        (f"Marseille {n}{'er' if n == 1 else 'e'} Arrondissement", f'130{n:02d}') for n in range(1, 17)
+    ) + (('Marseille', '13000'),)),
+    ('Lyon', tuple(
+        (f"Lyon {n}{'er' if n == 1 else 'e'} Arrondissement", f'6900{n}') for n in range(1, 10)
+    ) + (('Lyon', '69000'),)),
+    ('Toulouse', (('Toulouse', '31000'),)),      # Au lieu de 31500 (administratif)
+    ('Bordeaux', (('Bordeaux', '33000'),)),      # Au lieu de 33063 (administratif)
+    ('Nantes', (('Nantes', '44000'),)),          # Au lieu de 44109 (administratif)
+    ('Strasbourg', (('Strasbourg', '67000'),)),  # Au lieu de 67482 (administratif)
+    ('Lille', (('Lille', '59000'),)),            # Au lieu de 59350 (administratif)
+)
+
+FRENCH_POSTCODE_RE = re.compile(r'\b\d{5}\b')
+
+# Tous les noms, les plus longs d'abord ("Lyon 1er Arrondissement" avant "Lyon")
+_NAMES_RE = re.compile(r'\b(?:%s)\b' % '|'.join(
+    re.escape(name)
+    for name in sorted({name for _, names in POSTAL_CORRECTIONS for name, _ in names}, key=len, reverse=True)
+))
+
+
+# Code postal à appliquer par nom de ville ou d'arrondissement
+_CODES = {name: code for _, names in POSTAL_CORRECTIONS for name, code in names}
+
+
+def _locality(address, match):
+    """
+    Nom (de POSTAL_CORRECTIONS) de la localité accolée au code postal trouvé
+    par `match`, ou None: nom qui suit le code postal dans son segment
+    ("75007 Paris"), sinon nom qui le précède immédiatement ("Lyon 69003",
+    "Strasbourg 67200 France"),
+    sinon, pour un code postal seul dans son segment, la ville reconnue par
+    parse_city ("Montpellier, Hérault, 34062, France").
+    """
+    start = address.rfind(',', 0, match.start()) + 1
+    end = address.find(',', match.end())
+    after = address[match.end():end if end >= 0 else len(address)].strip()
+    before = address[start:match.start()].rstrip()
+    if after and not country_code(after):
+        name = _NAMES_RE.match(after)
+        return name.group() if name else None
+    if before:
+        for name in _NAMES_RE.finditer(before):
+            if name.end() == len(before):
+                return name.group()
+        return None
+    city, _ = parse_city(address)
+    return city if city in _CODES else None
+
+
+def normalize_address(address):
+    """
+    Normalise une adresse pour être cohérente avec les pratiques françaises:
+    corrige les codes postaux administratifs en codes couramment utilisés.
+    "Place Bellecour, 69287 Lyon 2e Arrondissement" -> "Place Bellecour, 69002 Lyon 2e Arrondissement"
+    """
+    if not address:
+        return address
+    postcodes = list(FRENCH_POSTCODE_RE.finditer(address))
+    if not postcodes or not _NAMES_RE.search(address):
+        return address
+    # Dernier code postal de l'adresse (comme parse_address)
+    match = postcodes[-1]
+    name = _locality(address, match)
+    if name is None:
+        return address
+    return address[:match.start()] + _CODES[name] + address[match.end():]
+
+
+def normalize_many(addresses):
+    """Normalise un lot d'adresses (liste dans le même ordre), chaque adresse distincte une seule fois."""
+    addresses = list(addresses)
+    normalized = {}
+    for address in addresses:
+        if address not in normalized:
+            normalized[address] = normalize_address(address)
+    return [normalized[address] for address in addresses]
+
+
+def department_of(postcode):
+    """Département français d'un code postal: "75002" -> "75", "20090" -> "2A", "97400" -> "974"."""
+    if not postcode or len(postcode) != 5 or not postcode.isdigit():
+        return ''
+    if postcode.startswith('20'):
+        # Corse: 200xx-201xx Corse-du-Sud, 202xx-206xx Haute-Corse
+        return '2A' if postcode[2] in '01' else '2B'
+    if postcode.startswith(('97', '98')):
+        return postcode[:3]
+    return postcode[:2]
+
+
+def _street(address, city, postcode):
+    """Partie de l'adresse qui précède la ville et le code postal."""
+    city_words = normalize(city).split() if city else []
+    street = []
+    for segment in address.split(','):
+        raw_words = segment.split()
+        keys = [normalize(word) for word in raw_words]
+        for index, key in enumerate(keys):
+            following = ' '.join(key for key in keys[index:index + len(city_words)] if key)
+            if key == postcode or (city_words and following == ' '.join(city_words)):
+                # Le reste de l'adresse est la ville, le code postal et le pays
+                prefix = ' '.join(raw_words[:index]).strip()
+                if prefix:
+                    street.append(prefix)
+                return ', '.join(street)
+        if segment.strip():
+            street.append(segment.strip())
+    # Ni ville ni code postal reconnus: rue inconnue
+    return ''
+
+
+def parse_address(address):
+    """Colonnes structurées (dictionnaire de ADDRESS_FIELDS) d'une adresse libre."""
+    if not address or not normalize(address):
+        return dict.fromkeys(ADDRESS_FIELDS, '')
+    city, iso2 = parse_city(address)
+    postcode = ''
+    for word in reversed(normalize(address).split()):
+        if POSTCODE_RE.match(word):
+            postcode = word
+            break
+    department = department_of(postcode) if iso2 == 'FR' else ''
+    return {
+        'street': _street(address, city, postcode)[:255],
+        'postcode': postcode,
+        'city': city or '',
+        'department': department,
+        'region': region_of(department),
+        'country_iso2': iso2 or '',
+    }
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CreatorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'neads.creators'
+
+    def ready(self):
+        # Enregistrement des signaux (image de couverture dénormalisée)
+        from . import signals  # noqa: F401
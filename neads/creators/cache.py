@@ -0,0 +1,81 @@
+"""
+Version des données du catalogue de créateurs.
+
+Les valeurs dérivées du catalogue (facettes, contextes de page, résultats de
+recherche) sont mises en cache sous des clés qui incluent la version courante
+des données. Toute écriture sur un créateur, un domaine, une localisation, un
+média ou un avis incrémente cette version (voir signals.py): les anciennes
+entrées ne sont alors plus jamais lues et expirent d'elles-mêmes, sans
+invalidation ciblée. La version sert aussi d'ETag aux API JSON (etags.py).
+
+Une seconde version, incrémentée seulement par les écritures qui peuvent
+déplacer un créateur (localisation, rattachement à une localisation), évite
+de relire les positions après un avis ou un média.
+"""
+
+import time
+
+from django.core.cache import cache
+
+DATA_VERSION_KEY = 'creators:data_version'
+
+# Version des seules positions des créateurs (index des plus proches, voir nearest.py)
+POSITIONS_VERSION_KEY = 'creators:positions_version'
+
+# Durée de conservation des entrées versionnées (une version périmée n'est plus lue)
+VERSIONED_TIMEOUT = 60 * 60
+
+
+def read_version(key):
+    """Valeur courante d'un compteur de version (initialisé si absent)."""
+    version = cache.get(key)
+    if version is None:
+        # Initialisation horodatée: une version perdue (éviction, redémarrage)
+        # ne peut pas réutiliser des clés encore présentes dans le cache
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Incrémente un compteur de version."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Clé absente: la prochaine lecture initialise une nouvelle version
+        return read_version(key)
+
+
+def data_version():
+    """Version courante des données du catalogue."""
+    return read_version(DATA_VERSION_KEY)
+
+
+def bump_data_version():
+    """Invalide toutes les valeurs dérivées du catalogue."""
+    return bump_version(DATA_VERSION_KEY)
+
+
+def positions_version():
+    """Version courante des positions (localisations) des créateurs."""
+    return read_version(POSITIONS_VERSION_KEY)
+
+
+def bump_positions_version():
+    """Signale qu'une position de créateur a pu changer."""
+    return bump_version(POSITIONS_VERSION_KEY)
+
+
+def versioned_key(key):
+    """Préfixe une clé de cache avec la version courante des données."""
+    return f"v{data_version()}:{key}"
+
+
+def get_or_build(key, builder, timeout=VERSIONED_TIMEOUT):
+    """Lit une valeur dérivée du catalogue ou la construit pour la version courante."""
+    key = versioned_key(key)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
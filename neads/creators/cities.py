@@ -0,0 +1,234 @@
+"""
+Index d'autocomplétion des villes du projet NEADS.
+
+Les villes proposées combinent:
+- les villes des créateurs (colonne Location.city, extraite de l'adresse à
+  l'écriture, voir addresses.py) classées par nombre de créateurs
+- les villes du référentiel des pays (voir countries.py)
+
+Les deux listes sont conservées en mémoire sous forme de tableaux triés de
+clés normalisées (minuscules, sans accents ni ponctuation): une recherche par
+préfixe est une simple recherche dichotomique (bisect), sans requête SQL.
+La partie issue des créateurs est reconstruite lorsque la version des données
+du catalogue change (voir cache.py), c'est-à-dire après toute écriture sur une
+localisation ou un créateur.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from django.db.models import Count
+
+from .cache import data_version
+from .countries import all_countries, country_cities, country_names
+from .models import Location
+from .search import fold
+
+# Pays par défaut des adresses qui n'en mentionnent pas
+DEFAULT_COUNTRY = 'FR'
+
+# Nombre maximal de mots d'un nom de ville ("Saint-Lubin-des-Joncherets")
+MAX_CITY_WORDS = 5
+
+POSTCODE_RE = re.compile(r'^\d{4,5}$')
+
+# Index du référentiel conservés en mémoire (pays les plus demandés)
+REFERENCE_INDEX_CACHE_SIZE = 32
+
+
+def normalize(text):
+    """Clé de comparaison d'un nom: "Saint-Étienne" -> "saint etienne"."""
+    return ' '.join(re.findall(r'[a-z0-9]+', fold(text)))
+
+
+class PrefixIndex:
+    """Tableau trié de (clé normalisée, nom, poids) interrogé par préfixe."""
+
+    def __init__(self, entries):
+        entries = sorted(entries)
+        self.keys = [key for key, _, _ in entries]
+        self.names = [name for _, name, _ in entries]
+        self.weights = [weight for _, _, weight in entries]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def span(self, prefix):
+        """Bornes [début, fin) des entrées dont la clé commence par le préfixe."""
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + '\uffff', start)
+        return start, end
+
+    def search(self, prefix, limit, ranked=False):
+        start, end = self.span(prefix)
+        if not ranked:
+            return self.names[start:min(end, start + limit)]
+        matches = sorted(range(start, end), key=lambda i: (-self.weights[i], self.keys[i]))
+        return [self.names[i] for i in matches[:limit]]
+
+
+@lru_cache(maxsize=1)
+def _reference():
+    """Tables du référentiel: villes par pays (clé -> nom) et noms de pays."""
+    by_country = {
+        country['iso2']: {normalize(name): name for name in country_cities(country['iso2'])}
+        for country in all_countries()
+    }
+    countries = {normalize(name): iso2 for name, iso2 in country_names().items()}
+    return by_country, countries
+
+
+@lru_cache(maxsize=REFERENCE_INDEX_CACHE_SIZE)
+def _reference_index(iso2=None):
+    """
+    Index des villes du référentiel (d'un pays, ou de tous les pays sans
+    doublon). `iso2` est un code validé par country_code: la clé du cache ne
+    provient jamais directement d'un paramètre de requête.
+    """
+    by_country, _ = _reference()
+    if iso2:
+        cities = by_country.get(iso2, {})
+    else:
+        cities = {}
+        for names in by_country.values():
+            for key, name in names.items():
+                cities.setdefault(key, name)
+    return PrefixIndex((key, name, 0) for key, name in cities.items())
+
+
+def country_code(text):
+    """Code ISO2 d'un pays désigné par son code ou son nom ("fr", "France", "Allemagne"), ou None."""
+    by_country, countries = _reference()
+    code = (text or '').strip().upper()
+    if code in by_country:
+        return code
+    return countries.get(normalize(text))
+
+
+def city_names(text, iso2=None):
+    """
+    Noms du référentiel correspondant à une saisie de ville ("saint etienne"
+    -> ["Saint-Étienne"]), dans un pays ou dans tous: valeurs de Location.city.
+    """
+    by_country, _ = _reference()
+    key = normalize(text)
+    countries = [by_country.get(iso2, {})] if iso2 else by_country.values()
+    return sorted({cities[key] for cities in countries if key in cities})
+
+
+def parse_city(address):
+    """
+    Extrait (ville, code ISO2 du pays) d'une adresse libre.
+
+    Le pays est reconnu en fin d'adresse (France par défaut). La ville est le
+    nom du référentiel de ce pays accolé au code postal dans son segment (qui
+    le suit, sinon qui le précède), sinon le plus proche avant le code postal
+    (ou de la fin de l'adresse), le plus long en cas d'égalité:
+        "5 rue Lothaire Strasbourg 67200 France" -> ("Strasbourg", "FR")
+        "1 rue Balay, 42000 Saint-Étienne" -> ("Saint-Étienne", "FR")
+    """
+    if not address:
+        return None, None
+    by_country, countries = _reference()
+
+    segments = [normalize(part).split() for part in address.split(',')]
+    segments = [words for words in segments if words]
+    words = [word for segment in segments for word in segment]
+
+    # Pays: dernier nom de pays reconnu (ex: "Suisse Switzerland", "France métropolitaine, 34062, France")
+    iso2 = DEFAULT_COUNTRY
+    for size in (3, 2, 1):
+        if len(words) >= size and ' '.join(words[-size:]) in countries:
+            iso2 = countries[' '.join(words[-size:])]
+            break
+    cities = by_country.get(iso2, {})
+
+    # Position de référence: dernier code postal, sinon fin de l'adresse
+    offset = 0
+    anchor, anchor_segment = len(words), None
+    for number, segment in enumerate(segments):
+        for index, word in enumerate(segment):
+            if POSTCODE_RE.match(word):
+                anchor, anchor_segment = offset + index, number
+        offset += len(segment)
+
+    best = None
+    offset = 0
+    for number, segment in enumerate(segments):
+        for start in range(len(segment)):
+            for size in range(1, MAX_CITY_WORDS + 1):
+                end = start + size
+                if end > len(segment):
+                    break
+                key = ' '.join(segment[start:end])
+                if key not in cities:
+                    continue
+                position = offset + end
+                # Accolé au code postal dans son segment ("42000 Saint-Étienne", puis
+                # "Strasbourg 67200"; pas "rue de Lille, 75007"), puis plus proche
+                # avant la position de référence, puis plus long
+                adjacent = 0
+                if number == anchor_segment:
+                    adjacent = 2 if offset + start == anchor + 1 else 1 if position == anchor else 0
+                rank = (adjacent, position <= anchor, -abs(anchor - position), size)
+                if best is None or rank > best[0]:
+                    best = (rank, cities[key])
+        offset += len(segment)
+
+    return (best[1] if best else None), iso2
+
+
+class CityIndex:
+    """Index combiné des villes des créateurs (classées) et du référentiel."""
+
+    def __init__(self, version):
+        self.version = version
+        counts, names = Counter(), {}
+        cities = Location.objects.exclude(city='').values('city').annotate(
+            creator_count=Count('creators')
+        ).filter(creator_count__gt=0).values_list('city', 'creator_count')
+        for city, creator_count in cities:
+            key = normalize(city)
+            counts[key] += creator_count
+            names.setdefault(key, city)
+        self.creator_cities = PrefixIndex((key, names[key], count) for key, count in counts.items())
+
+    def search(self, query, limit=10, country=None):
+        """
+        Villes commençant par la saisie: villes des créateurs d'abord, puis
+        référentiel (du pays `country`, code ou nom). Un pays inconnu ne
+        donne aucune ville.
+        """
+        prefix = normalize(query)
+        iso2 = country_code(country) if country else None
+        if not prefix or (country and iso2 is None):
+            return []
+        results = self.creator_cities.search(prefix, limit, ranked=True)
+        if len(results) < limit:
+            seen = {normalize(name) for name in results}
+            for name in _reference_index(iso2).search(prefix, limit * 2):
+                if normalize(name) not in seen:
+                    results.append(name)
+                    if len(results) == limit:
+                        break
+        return results
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def city_index():
+    """Index courant, reconstruit si les données du catalogue ont changé."""
+    global _index
+    version = data_version()
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = CityIndex(version)
+            index = _index
+    return index
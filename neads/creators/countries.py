@@ -0,0 +1,159 @@
+"""
+Référentiel des pays et villes du projet NEADS.
+
+Le jeu de données de py_countries_states_cities_database (250 pays, environ
+150 000 villes) n'est plus inclus dans les pages HTML. Il est servi:
+- sous forme de fichier statique compilé par `python manage.py
+  build_country_assets`: JSON compact {iso2: [villes]}, nommé d'après son
+  empreinte (cache navigateur illimité) et précompressé en gzip (et brotli si
+  le module `brotli` est installé)
+- pays par pays, à la demande, par l'endpoint
+  /creators/api/countries/<iso2>/cities/ (avec ETag)
+
+Les coordonnées des villes et des pays alimentent le géocodage local
+(gazetteer.py). Le jeu de données est chargé une seule fois par processus.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.templatetags.static import static
+
+from py_countries_states_cities_database import get_all_countries_and_cities_nested
+
+try:
+    import brotli
+except ImportError:  # Dépendance facultative
+    brotli = None
+
+# Emplacement du fichier compilé, relatif aux fichiers statiques
+ASSET_DIR = 'data'
+ASSET_NAME = 'country_cities'
+MANIFEST_NAME = f'{ASSET_NAME}.manifest.json'
+
+
+def _position(entry):
+    try:
+        return float(entry['latitude']), float(entry['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=1)
+def _dataset():
+    countries = []
+    cities = {}
+    names = {}
+    # Coordonnées des pays {iso2: (lat, lng)} et des villes {iso2: [(nom, lat, lng)]}
+    country_centers = {}
+    city_positions = {}
+    for entry in get_all_countries_and_cities_nested():
+        iso2 = entry['iso2'].upper()
+        countries.append({'iso2': iso2, 'name': entry['name']})
+        cities[iso2] = sorted({city['name'] for city in entry['cities']})
+        for name in (entry['name'], entry.get('native'), (entry.get('translations') or {}).get('fr')):
+            if name:
+                names[name] = iso2
+        country_centers[iso2] = _position(entry)
+        city_positions[iso2] = [
+            (city['name'], *position) for city in entry['cities'] if (position := _position(city))
+        ]
+    return countries, cities, names, country_centers, city_positions
+
+
+def all_countries():
+    """Liste des pays ({'iso2', 'name'}) pour les sélecteurs."""
+    return _dataset()[0]
+
+
+def country_cities(iso2):
+    """Villes d'un pays (liste triée de noms), None si le code est inconnu."""
+    return _dataset()[1].get((iso2 or '').upper())
+
+
+def country_names():
+    """Noms des pays (anglais, natif et français) associés à leur code ISO2."""
+    return _dataset()[2]
+
+
+@lru_cache(maxsize=1)
+def _names_by_code():
+    return {country['iso2']: country['name'] for country in all_countries()}
+
+
+def country_name(iso2):
+    """Nom (anglais) d'un pays à partir de son code ISO2, chaîne vide si inconnu."""
+    return _names_by_code().get((iso2 or '').upper(), '')
+
+
+def country_center(iso2):
+    """Coordonnées (latitude, longitude) approximatives du centre d'un pays, ou None."""
+    return _dataset()[3].get((iso2 or '').upper())
+
+
+def city_positions(iso2):
+    """Villes d'un pays avec leurs coordonnées: liste de (nom, latitude, longitude)."""
+    return _dataset()[4].get((iso2 or '').upper(), [])
+
+
+@lru_cache(maxsize=1)
+def dataset_fingerprint():
+    """Empreinte du jeu de données (nom du fichier compilé et ETag de l'endpoint)."""
+    return hashlib.sha256(_serialize()).hexdigest()[:12]
+
+
+def _serialize():
+    return json.dumps(
+        _dataset()[1], ensure_ascii=False, separators=(',', ':'), sort_keys=True
+    ).encode('utf-8')
+
+
+def build_asset(static_dir):
+    """
+    Compile le jeu de données dans `static_dir`/data et retourne la liste des
+    fichiers écrits. Les versions précédentes du fichier sont supprimées.
+    """
+    payload = _serialize()
+    name = f'{ASSET_NAME}.{dataset_fingerprint()}.json'
+    target_dir = os.path.join(static_dir, ASSET_DIR)
+    os.makedirs(target_dir, exist_ok=True)
+
+    for filename in os.listdir(target_dir):
+        if filename.startswith(f'{ASSET_NAME}.') and not filename.startswith(name):
+            os.remove(os.path.join(target_dir, filename))
+
+    variants = {name: payload, f'{name}.gz': gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[f'{name}.br'] = brotli.compress(payload, quality=11)
+    variants[MANIFEST_NAME] = json.dumps({'file': f'{ASSET_DIR}/{name}'}).encode('utf-8')
+
+    written = []
+    for filename, content in variants.items():
+        path = os.path.join(target_dir, filename)
+        with open(path, 'wb') as f:
+            f.write(content)
+        written.append(path)
+    return written
+
+
+@lru_cache(maxsize=1)
+def asset_path():
+    """Chemin statique du fichier compilé, None si la commande n'a pas été exécutée."""
+    for static_dir in [*settings.STATICFILES_DIRS, settings.STATIC_ROOT]:
+        if not static_dir:
+            continue
+        try:
+            with open(os.path.join(static_dir, ASSET_DIR, MANIFEST_NAME), encoding='utf-8') as f:
+                return json.load(f)['file']
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+
+def asset_url():
+    path = asset_path()
+    return static(path) if path else None
@@ -0,0 +1,74 @@
+"""
+Requêtes conditionnelles (ETag / If-None-Match) des API JSON du catalogue.
+
+Les réponses des API de recherche (galerie AJAX, carte, domaines, facettes...)
+ne dépendent que:
+- de la version des données du catalogue (voir cache.py), incrémentée à chaque
+  écriture sur un créateur, une localisation, un média, un avis ou un domaine
+- de l'URL complète (filtres), des en-têtes qui modifient la représentation
+  (Accept, X-Requested-With) et du rôle de l'utilisateur
+- des favoris de l'utilisateur lorsque le filtre `favorites_only` est demandé
+
+L'ETag est calculé à partir de ces seuls éléments, sans requête SQL: une
+requête dont l'en-tête If-None-Match correspond reçoit une réponse 304 avant
+l'exécution de la vue.
+
+Exemple d'utilisation:
+    @login_required
+    @catalog_conditional
+    def api_domains(request):
+        ...
+"""
+
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .cache import data_version
+from .results import favorite_ids
+
+
+def catalog_etag(request, *args, **kwargs):
+    """ETag fort d'une réponse de l'API du catalogue pour la version courante."""
+    user = request.user
+    parts = [
+        str(data_version()),
+        request.get_full_path(),
+        request.headers.get('accept', ''),
+        request.headers.get('x-requested-with', ''),
+        getattr(user, 'role', '') or '',
+    ]
+    if request.GET.get('favorites_only') and user.is_authenticated:
+        parts.append(','.join(map(str, sorted(favorite_ids(user)))))
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def ajax_catalog_etag(request, *args, **kwargs):
+    """ETag des seules requêtes AJAX (les pages HTML contiennent des données de session)."""
+    if request.headers.get('x-requested-with') != 'XMLHttpRequest':
+        return None
+    return catalog_etag(request, *args, **kwargs)
+
+
+def catalog_conditional(view_func=None, etag_func=catalog_etag):
+    """
+    Décorateur: ETag du catalogue, réponse 304 si le client possède déjà la
+    représentation courante, et revalidation systématique côté navigateur.
+    """
+    def decorator(func):
+        conditional_view = condition(etag_func=etag_func)(func)
+
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ['Accept', 'X-Requested-With'])
+            return response
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
@@ -0,0 +1,129 @@
+"""
+Facettes de recherche des créateurs du projet NEADS.
+
+Calcule en une seule passe les comptages affichés à côté des filtres de la
+galerie, de la recherche et de la carte (domaines, genre, note, tranches d'âge,
+facturation, départements et régions), au lieu d'un COUNT par domaine:
+- une requête GROUP BY sur les créateurs pour les facettes scalaires, dont les
+  lignes (une par combinaison genre/note/âge/facturation/département) sont
+  ensuite sommées par dimension; les régions sont déduites des départements
+  (departments.py)
+- une requête GROUP BY sur les domaines pour les comptages par domaine
+
+Les comptages peuvent être restreints par une spécification CreatorQuery (ils
+reflètent alors la recherche en cours, chaque dimension filtrée étant comptée
+sans son propre critère) et sont mis en cache par version des données du
+catalogue.
+"""
+
+from collections import Counter
+
+from django.db.models import Count, F, IntegerField, Q
+from django.db.models.functions import Cast, Floor
+
+from .cache import get_or_build
+from .departments import DEPARTMENTS, REGIONS, region_of
+from .models import Creator, Domain
+from .query import CreatorQuery, located_creators
+
+# Largeur des tranches de l'histogramme des âges
+AGE_BUCKET = 10
+
+# Critères de recherche comptés sans leur propre filtre: (champ de CreatorQuery, facette)
+MULTI_SELECT_FACETS = (
+    ('domains', 'domains'),
+    ('gender', 'gender'),
+    ('department', 'departments'),
+    ('region', 'regions'),
+)
+
+
+def compute_facets(creators=None, filtered=True):
+    """
+    Calcule les facettes d'un queryset de créateurs (tous les créateurs par défaut).
+    `filtered=False` indique que le queryset n'est pas restreint, ce qui évite
+    la sous-requête de restriction des domaines.
+    """
+    if creators is None:
+        creators, filtered = Creator.objects.all(), False
+
+    rows = creators.order_by().values(
+        'gender', 'can_invoice', 'location__department',
+        rating_bucket=Cast(Floor('average_rating'), IntegerField()),
+        age_bucket=Cast(F('age') / AGE_BUCKET, IntegerField()),
+    ).annotate(count=Count('id'))
+
+    total = 0
+    gender, rating, age, can_invoice = Counter(), Counter(), Counter(), Counter()
+    department, region = Counter(), Counter()
+    for row in rows:
+        count = row['count']
+        total += count
+        gender[row['gender']] += count
+        rating[row['rating_bucket'] or 0] += count
+        if row['age_bucket'] is not None:
+            age[row['age_bucket']] += count
+        can_invoice[bool(row['can_invoice'])] += count
+        if row['location__department']:
+            department[row['location__department']] += count
+            region[region_of(row['location__department'])] += count
+
+    if filtered:
+        domain_count = Count('creators', filter=Q(creators__in=creators.order_by().values('pk')))
+    else:
+        domain_count = Count('creators')
+    domains = Domain.objects.annotate(count=domain_count).order_by('name').values('id', 'name', 'count')
+
+    return {
+        'total': total,
+        'domains': list(domains),
+        'gender': {value: gender[value] for value, _ in Creator.GENDER_CHOICES},
+        # Nombre de créateurs dont la note est au moins égale à la valeur (filtre min_rating)
+        'min_rating': {
+            value: sum(count for bucket, count in rating.items() if bucket >= value)
+            for value in range(1, 6)
+        },
+        'age': [
+            {'min': bucket * AGE_BUCKET, 'max': bucket * AGE_BUCKET + AGE_BUCKET - 1, 'count': age[bucket]}
+            for bucket in sorted(age)
+        ],
+        'can_invoice': can_invoice[True],
+        # Départements et régions représentés, dans l'ordre des sélecteurs
+        'departments': [
+            {'code': code, 'name': name, 'count': department[code]}
+            for code, (name, _) in DEPARTMENTS.items() if department[code]
+        ],
+        'regions': [
+            {'code': code, 'name': name, 'count': region[code]}
+            for code, name in sorted(REGIONS.items(), key=lambda item: item[1]) if region[code]
+        ],
+    }
+
+
+def creator_facets(creator_query=None, located=False):
+    """
+    Facettes (mises en cache) des créateurs correspondant à la spécification.
+
+    Une dimension qui est aussi un critère de la recherche (domaines, genre,
+    département, région) est comptée sans son propre critère: les valeurs non
+    sélectionnées gardent le nombre de résultats qu'elles ajouteraient.
+    `located` restreint aux créateurs disposant de coordonnées (carte).
+    Le filtre des favoris, propre à chaque utilisateur, n'est pas appliqué.
+    """
+    creator_query = creator_query or CreatorQuery()
+    key = creator_query.cache_key(prefix='facets:located' if located else 'facets')
+
+    def compute(spec):
+        if not spec and not located:
+            return compute_facets()
+        base = located_creators() if located else None
+        return compute_facets(spec.queryset(base=base, ordered=False))
+
+    def build():
+        facets = compute(creator_query)
+        for field, facet in MULTI_SELECT_FACETS:
+            if creator_query.get(field) is not None:
+                facets[facet] = compute(creator_query.without(field))[facet]
+        return facets
+
+    return get_or_build(key, build)
@@ -2,10 +2,10 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from .models import Creator, Media, Rating, Domain, Location, Favorite
+from .geocoding import lookup
+from .departments import department_choices, region_choices
 from neads.core.models import User
 import datetime
-import requests
-from django.conf import settings
 
 
 class LocationForm(forms.ModelForm):
@@ -41,27 +41,18 @@ class LocationForm(forms.ModelForm):
         
         # Si l'adresse est fournie mais pas les coordonnées
         if full_address and (not latitude or not longitude):
-            try:
-                # Construire l'URL de l'API Nominatim
-                params = {
-                    'q': full_address,
-                    'format': 'json',
-                    'limit': 1,
-                    'countrycodes': 'fr'  # Limiter aux résultats en France
-                }
-                
-                response = requests.get(settings.NOMINATIM_URL, params=params)
-                response.raise_for_status()
-                
-                results = response.json()
-                if results:
-                    # Mettre à jour les coordonnées avec le premier résultat
-                    cleaned_data['latitude'] = float(results[0]['lat'])
-                    cleaned_data['longitude'] = float(results[0]['lon'])
-                else:
-                    self.add_error('full_address', "Impossible de géolocaliser cette adresse. Veuillez vérifier l'adresse ou sélectionner une suggestion.")
-            except requests.RequestException as e:
-                self.add_error('full_address', f"Erreur lors de la géolocalisation: {str(e)}")
+            # Aucune requête à Nominatim ici: seuls le gazetteer et le cache partagé
+            # sont consultés (voir geocoding.py), limité à la France
+            found, position = lookup(full_address, countrycodes='fr')
+            if position is not None:
+                cleaned_data['latitude'], cleaned_data['longitude'] = position
+            elif found:
+                self.add_error('full_address', "Impossible de géolocaliser cette adresse. Veuillez vérifier l'adresse ou sélectionner une suggestion.")
+            else:
+                # Adresse inconnue: enregistrée en attente, géocodée par process_geocoding_queue
+                self.instance.geocoding_status = Location.GEOCODING_PENDING
+                self.instance.geocoding_attempts = 0
+                self.instance.geocoding_next_attempt = None
         
         return cleaned_data
     
@@ -208,7 +199,7 @@ class CreatorForm(forms.ModelForm):
     class Meta:
         model = Creator
         exclude = ['user', 'created_at', 'updated_at', 'location', 'average_rating', 
-                  'total_ratings', 'verified_by_neads', 'verified_by', 'verified_at',
+                  'total_ratings', 'rating_sum', 'verified_by_neads', 'verified_by', 'verified_at',
                   'last_activity', 'full_name']
 
 
@@ -234,6 +225,16 @@ class CreatorSearchForm(forms.Form):
     favorites_only = forms.BooleanField(required=False, label="Favoris uniquement")
     country = forms.CharField(required=False, label="Pays")
     city = forms.CharField(required=False, label="Ville")
+    department = forms.ChoiceField(
+        choices=[('', 'Tous les départements')] + department_choices(),
+        required=False,
+        label="Département"
+    )
+    region = forms.ChoiceField(
+        choices=[('', 'Toutes les régions')] + region_choices(),
+        required=False,
+        label="Région"
+    )
     
     def clean(self):
         cleaned_data = super().clean()
@@ -0,0 +1,148 @@
+"""
+Géocodage local des villes (gazetteer) du projet NEADS.
+
+Les requêtes de la forme "ville, code postal, pays" (celles de l'import CSV,
+ou une adresse réduite à sa ville) sont résolues en mémoire, sans requête
+réseau, à partir de:
+- les coordonnées des villes et des pays du référentiel (voir countries.py),
+  compilées une seule fois par processus en tables indexées par nom normalisé
+- les codes postaux français présents dans nos adresses (colonne
+  Location.postcode): position moyenne des localisations géocodées de chaque
+  code postal, qui départage les homonymes ("Saint-Sauveur") et résout un
+  code postal seul
+
+La ville est reconnue comme pour l'autocomplétion (cities.parse_city). Une
+adresse qui contient autre chose que la ville, le code postal et le pays (rue,
+numéro) n'est pas résolue ici: la précision à la rue est laissée à Nominatim
+(geocoding.py), le gazetteer ne servant alors que de repli.
+
+Les codes postaux sont relus lorsque la version des données du catalogue
+change (voir cache.py), comme l'index des villes.
+
+Exemple d'utilisation:
+    resolve("Strasbourg, 67000, France")  # (48.58392, 7.74553)
+    resolve("5 rue Lothaire, Strasbourg")  # None: adresse à la rue
+"""
+
+import math
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.db.models import Avg
+
+from .cache import data_version
+from .cities import POSTCODE_RE, normalize, parse_city
+from .countries import city_positions, country_center, country_names
+from .models import Location
+
+# Écart (degrés) en deçà duquel des villes homonymes sont considérées comme un même lieu
+SAME_PLACE_DEGREES = 0.1
+
+
+@lru_cache(maxsize=None)
+def _cities(iso2):
+    """Positions des villes d'un pays par nom normalisé: {clé: [(lat, lng), ...]}."""
+    table = defaultdict(list)
+    for name, latitude, longitude in city_positions(iso2):
+        table[normalize(name)].append((latitude, longitude))
+    return dict(table)
+
+
+@lru_cache(maxsize=1)
+def _countries():
+    """Codes ISO2 des pays par nom normalisé, et mots des noms de chaque pays."""
+    codes, words = {}, defaultdict(set)
+    for name, iso2 in country_names().items():
+        key = normalize(name)
+        codes[key] = iso2
+        words[iso2].update(key.split())
+    return codes, words
+
+
+def country_position(name):
+    """Centre approximatif d'un pays désigné par son nom ("France", "Allemagne"), ou None."""
+    codes, _ = _countries()
+    return country_center(codes.get(normalize(name)))
+
+
+def _postcode(words):
+    """Dernier code postal d'une adresse normalisée (liste de mots), ou None."""
+    for word in reversed(words):
+        if POSTCODE_RE.match(word):
+            return word
+    return None
+
+
+def _distance(a, b):
+    return math.hypot(a[0] - b[0], (a[1] - b[1]) * math.cos(math.radians(a[0])))
+
+
+class Gazetteer:
+    """Positions moyennes des codes postaux français de nos adresses, pour une version des données."""
+
+    def __init__(self, version):
+        self.version = version
+        postcodes = Location.objects.filter(
+            country_iso2='FR', latitude__isnull=False, longitude__isnull=False,
+        ).exclude(postcode='').values('postcode').annotate(
+            mean_latitude=Avg('latitude'), mean_longitude=Avg('longitude'),
+        ).values_list('postcode', 'mean_latitude', 'mean_longitude')
+        self.postcodes = {
+            postcode: (latitude, longitude)
+            for postcode, latitude, longitude in postcodes if len(postcode) == 5
+        }
+
+    def resolve(self, query, countrycodes=None, city_level_only=True):
+        """
+        (latitude, longitude) de la ville (ou du code postal) d'une requête, ou
+        None. Avec `city_level_only`, une requête qui mentionne autre chose que
+        la ville, le code postal et le pays n'est pas résolue.
+        """
+        city, iso2 = parse_city(query)
+        if not iso2 or (countrycodes and iso2.lower() not in countrycodes.lower().split(',')):
+            return None
+        words = normalize(query).split()
+        postcode = _postcode(words)
+        anchor = self.postcodes.get(postcode) if iso2 == 'FR' else None
+
+        if city_level_only:
+            country_words = _countries()[1].get(iso2, set())
+            city_words = [word for word in normalize(city or '').split() if word not in country_words]
+            rest = [word for word in words if not POSTCODE_RE.match(word) and word not in country_words]
+            if rest != city_words:
+                return None
+
+        candidates = _cities(iso2).get(normalize(city), []) if city else []
+        if not candidates:
+            return anchor
+        if anchor is not None:
+            # Homonymes départagés par la position connue du code postal
+            return min(candidates, key=lambda position: _distance(position, anchor))
+        if all(_distance(position, candidates[0]) <= SAME_PLACE_DEGREES for position in candidates):
+            return candidates[0]
+        return None
+
+
+_gazetteer = None
+_lock = threading.Lock()
+
+
+def gazetteer():
+    """Gazetteer courant, relu si les données du catalogue ont changé."""
+    global _gazetteer
+    version = data_version()
+    current = _gazetteer
+    if current is None or current.version != version:
+        with _lock:
+            if _gazetteer is None or _gazetteer.version != version:
+                _gazetteer = Gazetteer(version)
+            current = _gazetteer
+    return current
+
+
+def resolve(query, countrycodes=None, city_level_only=True):
+    """Géocode localement une requête "ville, code postal, pays" (voir Gazetteer.resolve)."""
+    if not query:
+        return None
+    return gazetteer().resolve(query, countrycodes, city_level_only)
@@ -0,0 +1,320 @@
+"""
+Géocodage des adresses du projet NEADS, avec cache persistant partagé.
+
+Les requêtes "ville, code postal, pays" sont d'abord résolues localement, en
+mémoire (gazetteer.py); le fournisseur (Nominatim) n'est interrogé que pour
+les adresses à la rue, avec repli sur la position de la ville s'il ne trouve
+pas l'adresse.
+
+Chaque requête envoyée au fournisseur est réduite à une clé normalisée
+(accents, casse et ponctuation ignorés: "Saint-Étienne, 42000" et "saint
+etienne 42000" partagent la même entrée; les pays demandés, `countrycodes`,
+font partie de la clé) et son résultat est conservé en base (GeocodeCache): le
+formulaire de localisation, l'import CSV et les autres processus ne
+réinterrogent pas le fournisseur pour une adresse déjà géocodée.
+- résultat trouvé: conservé POSITIVE_TTL
+- adresse introuvable: conservée NEGATIVE_TTL (cache négatif), pour ne pas
+  réinterroger le fournisseur à chaque saisie de la même adresse erronée
+- erreur du fournisseur (réseau, HTTP): non conservée
+
+Chaque entrée compte ses lectures servies par le cache (hits) et ses appels
+au fournisseur (misses); `geocode_stats()` et la commande
+`python manage.py geocode_cache` en donnent le taux de succès.
+
+Aucune requête au fournisseur n'est faite pendant une requête HTTP: une
+localisation enregistrée avec une adresse sans coordonnées est "en attente"
+(Location.GEOCODING_PENDING) et géocodée en arrière-plan par
+`python manage.py process_geocoding_queue` (`process_pending()`), par lots,
+au rythme de NOMINATIM_MIN_INTERVAL (1 requête/s), avec nouvelles tentatives
+espacées en cas d'erreur du fournisseur. Chaque lot est réservé (prochaine
+tentative repoussée de CLAIM_TIMEOUT) avant d'être traité: deux workers ne
+géocodent jamais la même localisation. L'intervalle entre deux requêtes est
+toutefois mesuré par processus: un seul worker doit tourner pour respecter
+la limite de 1 requête/s de Nominatim.
+
+Exemple d'utilisation:
+    position = geocode("12 rue de la Paix, 75002 Paris", countrycodes='fr')
+    if position is not None:
+        latitude, longitude = position
+"""
+
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .cache import bump_data_version, bump_positions_version
+from .cities import normalize
+from .gazetteer import resolve
+from .models import Creator, GeocodeCache, Location
+from .spatial import update_location_index
+
+# Durée de conservation d'un résultat trouvé / d'une adresse introuvable
+POSITIVE_TTL = timedelta(days=90)
+NEGATIVE_TTL = timedelta(days=1)
+
+# Longueur maximale d'une clé de cache (GeocodeCache.query_key)
+KEY_MAX_LENGTH = 255
+
+# Délai maximal d'une requête au fournisseur (secondes)
+REQUEST_TIMEOUT = 10
+
+# File d'attente: localisations traitées par lot, tentatives et délai avant la suivante
+QUEUE_BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+RETRY_DELAY = timedelta(minutes=1)
+
+# Durée de la réservation d'un lot (au-delà, un worker interrompu libère ses localisations)
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Colonnes écrites pour les localisations résolues d'un lot
+RESOLVED_FIELDS = ['latitude', 'longitude', 'geocoding_status', 'geocoding_attempts', 'geocoding_next_attempt']
+
+USER_AGENT = 'NEADS Geocoder (contact@neads.io)'
+
+_throttle_lock = threading.Lock()
+_last_request = 0.0
+
+
+def normalize_query(query, countrycodes=None):
+    """
+    Clé de cache d'une requête: "Saint-Étienne, 42000" -> "saint etienne 42000".
+    Une requête trop longue est tronquée et suivie de l'empreinte de la requête
+    complète; le suffixe des pays est toujours conservé.
+    """
+    key = normalize(query)
+    suffix = f"|{countrycodes.lower()}" if countrycodes else ''
+    if len(key) + len(suffix) > KEY_MAX_LENGTH:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        key = f"{key[:KEY_MAX_LENGTH - len(suffix) - len(digest) - 1]}#{digest}"
+    return f"{key}{suffix}"
+
+
+def _throttle():
+    """Attend si la dernière requête à Nominatim date de moins de NOMINATIM_MIN_INTERVAL (par processus)."""
+    global _last_request
+    with _throttle_lock:
+        wait = _last_request + settings.NOMINATIM_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_request = time.monotonic()
+
+
+def nominatim(query, countrycodes=None):
+    """
+    Géocode une requête avec Nominatim (OpenStreetMap): (latitude, longitude)
+    ou None si l'adresse est introuvable. Lève requests.RequestException en
+    cas d'erreur réseau ou HTTP.
+    """
+    params = {'q': query, 'format': 'json', 'limit': 1}
+    if countrycodes:
+        params['countrycodes'] = countrycodes
+    _throttle()
+    response = requests.get(
+        settings.NOMINATIM_URL, params=params,
+        headers={'User-Agent': USER_AGENT}, timeout=REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    results = response.json()
+    if not results:
+        return None
+    return float(results[0]['lat']), float(results[0]['lon'])
+
+
+def cached_position(query, countrycodes=None):
+    """
+    Entrée valide du cache pour une requête, sans appeler le fournisseur:
+    (True, position) si elle existe (position None pour un résultat négatif),
+    (False, None) sinon.
+    """
+    key = normalize_query(query, countrycodes)
+    entry = GeocodeCache.objects.filter(query_key=key, expires_at__gt=timezone.now()).first()
+    if entry is None:
+        return False, None
+    GeocodeCache.objects.filter(pk=entry.pk).update(hits=F('hits') + 1)
+    return True, None if entry.is_negative else (entry.latitude, entry.longitude)
+
+
+def store_position(query, position, provider, countrycodes=None):
+    """Enregistre le résultat (éventuellement négatif) d'un appel au fournisseur."""
+    key = normalize_query(query, countrycodes)
+    now = timezone.now()
+    latitude, longitude = position if position is not None else (None, None)
+    entry, created = GeocodeCache.objects.get_or_create(query_key=key, defaults={
+        'query': query[:255], 'latitude': latitude, 'longitude': longitude, 'provider': provider,
+        'created_at': now, 'expires_at': now + (POSITIVE_TTL if position else NEGATIVE_TTL), 'misses': 1,
+    })
+    if not created:
+        GeocodeCache.objects.filter(pk=entry.pk).update(
+            query=query[:255], latitude=latitude, longitude=longitude, provider=provider,
+            created_at=now, expires_at=now + (POSITIVE_TTL if position else NEGATIVE_TTL),
+            misses=F('misses') + 1,
+        )
+
+
+def lookup(query, countrycodes=None):
+    """
+    Position connue sans requête réseau (gazetteer, puis cache):
+    (True, position) si la requête est connue (position None si introuvable),
+    (False, None) sinon.
+    """
+    position = resolve(query, countrycodes)
+    if position is not None:
+        return True, position
+    found, position = cached_position(query, countrycodes)
+    if found and position is None:
+        # Adresse introuvable: position de sa ville, si elle est reconnue
+        position = resolve(query, countrycodes, city_level_only=False)
+    return found, position
+
+
+def geocode(query, countrycodes=None, provider=nominatim):
+    """
+    (latitude, longitude) d'une adresse, ou None si elle est introuvable.
+    Le fournisseur n'est appelé que si la requête n'est ni résolue localement
+    ni (ou plus) en cache; ses erreurs (requests.RequestException) sont
+    propagées et non conservées.
+    """
+    if not query or not normalize(query):
+        return None
+    found, position = lookup(query, countrycodes)
+    if found:
+        return position
+    position = provider(query, countrycodes)
+    store_position(query, position, provider.__name__, countrycodes)
+    if position is None:
+        position = resolve(query, countrycodes, city_level_only=False)
+    return position
+
+
+def geocode_stats():
+    """Nombre d'entrées (valides, négatives) et taux de succès du cache."""
+    now = timezone.now()
+    totals = GeocodeCache.objects.aggregate(hits=Sum('hits'), misses=Sum('misses'))
+    hits, misses = totals['hits'] or 0, totals['misses'] or 0
+    valid = GeocodeCache.objects.filter(expires_at__gt=now)
+    return {
+        'entries': GeocodeCache.objects.count(),
+        'valid': valid.count(),
+        'negative': valid.filter(latitude__isnull=True).count(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+    }
+
+
+def purge_expired():
+    """Supprime les entrées expirées et retourne leur nombre."""
+    deleted, _ = GeocodeCache.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
+
+
+def _due(now):
+    return Location.objects.filter(geocoding_status=Location.GEOCODING_PENDING).filter(
+        Q(geocoding_next_attempt__isnull=True) | Q(geocoding_next_attempt__lte=now)
+    )
+
+
+def pending_locations(batch_size=QUEUE_BATCH_SIZE):
+    """Prochaines localisations en attente de géocodage dont la tentative est due."""
+    return list(_due(timezone.now()).order_by('geocoding_next_attempt', 'pk')[:batch_size])
+
+
+def claim_pending(batch_size=QUEUE_BATCH_SIZE):
+    """
+    Réserve les prochaines localisations dues: leur prochaine tentative est
+    repoussée de CLAIM_TIMEOUT par une mise à jour conditionnelle (encore due),
+    si bien qu'un autre worker ne peut pas réserver la même localisation.
+    """
+    now = timezone.now()
+    claimed = []
+    for location in pending_locations(batch_size):
+        if _due(now).filter(pk=location.pk).update(geocoding_next_attempt=now + CLAIM_TIMEOUT):
+            location.geocoding_next_attempt = now + CLAIM_TIMEOUT
+            claimed.append(location)
+    return claimed
+
+
+def process_pending(batch_size=QUEUE_BATCH_SIZE, provider=nominatim):
+    """
+    Géocode un lot réservé de localisations en attente. Les adresses
+    identiques du lot ne sont géocodées qu'une fois; une erreur du fournisseur
+    reporte la localisation (délai doublé à chaque tentative) jusqu'à
+    MAX_ATTEMPTS, ainsi que les localisations suivantes du lot de même
+    adresse, sans nouvel appel.
+    Les localisations résolues (trouvées ou introuvables) sont écrites en une
+    fois à la fin du lot (voir write_resolved).
+    Retourne le nombre de localisations par état: {'done', 'failed', 'retry'}.
+    """
+    counts = {'done': 0, 'failed': 0, 'retry': 0}
+    positions = {}
+    errors = set()
+    resolved = []
+    for location in claim_pending(batch_size):
+        key = normalize_query(location.full_address or '', 'fr')
+        if key not in positions and key not in errors:
+            try:
+                positions[key] = geocode(location.full_address, countrycodes='fr', provider=provider)
+            except requests.RequestException:
+                errors.add(key)
+
+        if key in errors:
+            location.geocoding_attempts += 1
+            if location.geocoding_attempts >= MAX_ATTEMPTS:
+                location.geocoding_status = Location.GEOCODING_FAILED
+                location.geocoding_next_attempt = None
+                counts['failed'] += 1
+            else:
+                delay = RETRY_DELAY * 2 ** (location.geocoding_attempts - 1)
+                location.geocoding_next_attempt = timezone.now() + delay
+                counts['retry'] += 1
+            location.save(update_fields=['geocoding_status', 'geocoding_attempts', 'geocoding_next_attempt'])
+            continue
+
+        position = positions[key]
+        location.geocoding_attempts += 1
+        location.geocoding_next_attempt = None
+        if position is None:
+            location.geocoding_status = Location.GEOCODING_FAILED
+            counts['failed'] += 1
+        else:
+            location.latitude, location.longitude = position
+            location.geocoding_status = Location.GEOCODING_DONE
+            counts['done'] += 1
+        resolved.append(location)
+
+    write_resolved(resolved)
+    return counts
+
+
+def write_resolved(locations):
+    """
+    Enregistre les localisations résolues d'un lot sans un save() par ligne:
+    une mise à jour groupée, puis l'index spatial, une synchronisation des
+    points de la carte et une seule incrémentation des versions du catalogue.
+    """
+    if not locations:
+        return
+    # Importé ici: l'application Map dépend des modèles de Creators
+    from neads.map.points import sync_map_points
+
+    located = [location for location in locations if location.latitude is not None]
+    with transaction.atomic():
+        Location.objects.bulk_update(locations, RESOLVED_FIELDS)
+        for location in located:
+            update_location_index(location)
+        sync_map_points(Creator.objects.filter(location__in=located).values_list('pk', flat=True))
+    bump_data_version()
+    if located:
+        bump_positions_version()
+
+
+def queue_length():
+    """Nombre de localisations en attente de géocodage."""
+    return Location.objects.filter(geocoding_status=Location.GEOCODING_PENDING).count()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.models import Creator
+
+
+class Command(BaseCommand):
+    help = "Recalcule l'image de couverture dénormalisée de tous les créateurs"
+
+    def handle(self, *args, **options):
+        creators = Creator.objects.only(
+            'id', 'featured_image', 'cover_url', 'cover_width', 'cover_height'
+        ).iterator(chunk_size=1000)
+
+        total = updated = 0
+        for creator in creators:
+            total += 1
+            if creator.refresh_cover():
+                updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} créateurs traités, {updated} couvertures mises à jour."
+        ))
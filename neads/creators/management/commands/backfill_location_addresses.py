@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.addresses import ADDRESS_FIELDS, parse_address
+from neads.creators.cache import bump_data_version
+from neads.creators.models import Location
+from neads.map.points import refresh_map_point_areas
+
+
+class Command(BaseCommand):
+    help = "Décompose les adresses existantes en colonnes structurées (rue, code postal, ville, département, pays)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Localisations mises à jour par lot")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch, updated = [], 0
+        locations = Location.objects.only('id', 'full_address', *ADDRESS_FIELDS).iterator(chunk_size=batch_size)
+        for location in locations:
+            parsed = parse_address(location.full_address)
+            if all(getattr(location, field) == value for field, value in parsed.items()):
+                continue
+            for field, value in parsed.items():
+                setattr(location, field, value)
+            batch.append(location)
+            if len(batch) >= batch_size:
+                Location.objects.bulk_update(batch, ADDRESS_FIELDS)
+                refresh_map_point_areas(location.pk for location in batch)
+                updated += len(batch)
+                batch = []
+        if batch:
+            Location.objects.bulk_update(batch, ADDRESS_FIELDS)
+            refresh_map_point_areas(location.pk for location in batch)
+            updated += len(batch)
+
+        # Mise à jour sans signaux: les points de la carte sont recopiés par lot,
+        # les autres valeurs dérivées (villes, facettes) sont invalidées
+        bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f"{updated} localisations mises à jour."))
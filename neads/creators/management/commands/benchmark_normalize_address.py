@@ -0,0 +1,51 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from neads.creators.addresses import POSTAL_CORRECTIONS, normalize_address, normalize_many
+from neads.creators.models import Location
+
+# Adresses de l'échantillon synthétique (sans base de données)
+SAMPLE_CITIES = [name for _, names in POSTAL_CORRECTIONS for name, _ in names] + [
+    'Paris', 'Saint-Étienne', 'Nice', 'Rennes', 'Clermont-Ferrand', 'Lillebonne',
+]
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de normalisation des adresses (normalize_address et normalize_many)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help="Nombre d'adresses de l'échantillon")
+        parser.add_argument('--repeat', type=int, default=5, help="Nombre de mesures (la meilleure est retenue)")
+        parser.add_argument(
+            '--stored', action='store_true',
+            help="Utilise les adresses enregistrées plutôt qu'un échantillon synthétique",
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        if options['stored']:
+            addresses = list(Location.objects.exclude(full_address__isnull=True).values_list(
+                'full_address', flat=True,
+            )[:count])
+        else:
+            generator = random.Random(0)
+            addresses = [
+                f"{generator.randint(1, 200)} rue de la République, "
+                f"{generator.randint(1000, 97999):05d} {generator.choice(SAMPLE_CITIES)}, France"
+                for _ in range(count)
+            ]
+        if not addresses:
+            self.stdout.write(self.style.WARNING("Aucune adresse à mesurer."))
+            return
+
+        for label, run in (
+            ('normalize_address', lambda: [normalize_address(address) for address in addresses]),
+            ('normalize_many', lambda: normalize_many(addresses)),
+        ):
+            best = min(timeit.repeat(run, number=1, repeat=options['repeat']))
+            self.stdout.write(
+                f"{label}: {best * 1e6 / len(addresses):.2f} µs par adresse "
+                f"({len(addresses)} adresses, {best * 1000:.1f} ms)"
+            )
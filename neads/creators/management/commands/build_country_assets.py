@@ -0,0 +1,31 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from neads.creators.countries import asset_path, brotli, build_asset
+
+
+class Command(BaseCommand):
+    help = "Compile la liste des pays et villes en fichier statique versionné et précompressé"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=settings.STATICFILES_DIRS[0],
+            help="Répertoire des fichiers statiques de destination",
+        )
+
+    def handle(self, *args, **options):
+        for path in build_asset(options['output']):
+            size = os.path.getsize(path)
+            self.stdout.write(f"{os.path.relpath(path, options['output'])} ({size // 1024} Ko)")
+        asset_path.cache_clear()
+
+        if brotli is None:
+            self.stdout.write(self.style.WARNING(
+                "Module brotli absent: seule la version gzip a été générée."
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            "Fichier compilé. Exécutez collectstatic pour le publier."
+        ))
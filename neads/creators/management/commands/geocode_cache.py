@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.geocoding import geocode_stats, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Affiche le taux de succès du cache de géocodage et purge les entrées expirées"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge', action='store_true',
+            help="Supprime les entrées expirées avant d'afficher les statistiques",
+        )
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            self.stdout.write(f"{purge_expired()} entrées expirées supprimées.")
+
+        stats = geocode_stats()
+        self.stdout.write(
+            f"{stats['entries']} entrées ({stats['valid']} valides, dont {stats['negative']} négatives)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Taux de succès: {stats['hit_rate']:.1%} "
+            f"({stats['hits']} lectures en cache, {stats['misses']} appels au fournisseur)"
+        ))
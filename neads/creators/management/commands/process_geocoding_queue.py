@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from neads.creators.geocoding import QUEUE_BATCH_SIZE, process_pending, queue_length
+
+
+class Command(BaseCommand):
+    help = "Géocode les localisations en attente (Nominatim, 1 requête/s, nouvelles tentatives en cas d'erreur)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=QUEUE_BATCH_SIZE,
+            help="Nombre de localisations traitées par lot",
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help="Traite la file en continu (worker) au lieu d'un seul passage; "
+                 "un seul worker à la fois (limite de 1 requête/s par processus)",
+        )
+        parser.add_argument(
+            '--idle-sleep', type=float, default=5.0,
+            help="Attente (secondes) lorsque la file est vide, avec --loop",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = process_pending(options['batch_size'])
+            processed = sum(counts.values())
+            if processed:
+                self.stdout.write(
+                    f"{counts['done']} géocodées, {counts['failed']} introuvables, "
+                    f"{counts['retry']} reportées ({queue_length()} en attente)"
+                )
+            if not options['loop']:
+                if not processed:
+                    self.stdout.write(self.style.SUCCESS("Aucune localisation à géocoder."))
+                return
+            if not processed:
+                time.sleep(options['idle_sleep'])
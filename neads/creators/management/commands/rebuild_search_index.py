@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.models import Creator
+from neads.creators.search import SEARCH_FIELDS, is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte des créateurs"
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(self.style.WARNING(
+                "Moteur de base de données sans index plein texte, rien à faire."
+            ))
+            return
+
+        creators = Creator.objects.only('id', *SEARCH_FIELDS).iterator(chunk_size=1000)
+        count = rebuild_index(creators)
+        self.stdout.write(self.style.SUCCESS(f"{count} créateurs indexés."))
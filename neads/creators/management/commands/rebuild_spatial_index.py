@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.models import Location
+from neads.creators.spatial import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index spatial (R*Tree) des localisations"
+
+    def handle(self, *args, **options):
+        if not is_supported():
+            self.stdout.write(self.style.WARNING(
+                "Moteur de base de données sans R*Tree: l'index (latitude, longitude) est utilisé, rien à faire."
+            ))
+            return
+
+        locations = Location.objects.filter(
+            latitude__isnull=False, longitude__isnull=False,
+        ).only('id', 'latitude', 'longitude').iterator(chunk_size=1000)
+        count = rebuild_index(locations)
+        self.stdout.write(self.style.SUCCESS(f"{count} localisations indexées."))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.addresses import ADDRESS_FIELDS, normalize_many, parse_address
+from neads.creators.cache import bump_data_version
+from neads.creators.models import Location
+from neads.map.points import refresh_map_point_areas
+
+
+class Command(BaseCommand):
+    help = "Normalise à nouveau les adresses enregistrées (codes postaux) par lots, et leurs colonnes structurées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Localisations traitées par lot")
+        parser.add_argument('--dry-run', action='store_true', help="Compte les adresses modifiées sans les enregistrer")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        locations = Location.objects.exclude(full_address__isnull=True).exclude(full_address='').order_by('pk')
+        last_pk, changed = 0, 0
+        while True:
+            # Pagination par clé primaire: les lots restent stables pendant la mise à jour
+            batch = list(locations.filter(pk__gt=last_pk).only('id', 'full_address', *ADDRESS_FIELDS)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            updated = []
+            for location, address in zip(batch, normalize_many(location.full_address for location in batch)):
+                if address == location.full_address:
+                    continue
+                location.full_address = address
+                for field, value in parse_address(address).items():
+                    setattr(location, field, value)
+                updated.append(location)
+            changed += len(updated)
+            if updated and not options['dry_run']:
+                Location.objects.bulk_update(updated, ['full_address', *ADDRESS_FIELDS])
+                refresh_map_point_areas(location.pk for location in updated)
+
+        if options['dry_run']:
+            self.stdout.write(f"{changed} adresses seraient modifiées.")
+            return
+        if changed:
+            # Mise à jour sans signaux: les points de la carte sont recopiés par lot,
+            # les autres valeurs dérivées (villes, facettes) sont invalidées
+            bump_data_version()
+        self.stdout.write(self.style.SUCCESS(f"{changed} adresses normalisées."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from neads.creators.ratings import rating_drift, repair_drift
+
+
+class Command(BaseCommand):
+    help = "Recalcule les agrégats de notation des créateurs et signale les écarts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', '--repair', action='store_true', dest='fix',
+            help="Réécrit les agrégats recalculés des créateurs en écart",
+        )
+
+    def handle(self, *args, **options):
+        drifts = rating_drift()
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS("Aucun écart: les agrégats de notation sont à jour."))
+            return
+
+        for drift in drifts:
+            self.stdout.write(
+                f"Créateur #{drift.creator_id}: "
+                f"somme {drift.rating_sum} (attendu {drift.expected_sum}), "
+                f"avis {drift.total_ratings} (attendu {drift.expected_total}), "
+                f"moyenne {drift.average_rating} (attendu {drift.expected_average})"
+            )
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"{repair_drift(drifts)} créateurs corrigés."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"{len(drifts)} créateurs en écart (relancer avec --fix pour corriger)."
+            ))
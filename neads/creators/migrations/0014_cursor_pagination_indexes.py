@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 19:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0013_creator_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='creator',
+            index=models.Index(fields=['-average_rating', 'full_name', 'id'], name='creator_rating_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='creator',
+            index=models.Index(fields=['-created_at', 'id'], name='creator_created_idx'),
+        ),
+    ]
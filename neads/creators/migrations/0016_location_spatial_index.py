@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+
+SPATIAL_TABLE = 'creators_location_rtree'
+
+
+def create_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SPATIAL_TABLE} "
+        f"USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+    )
+
+    # Indexer les localisations existantes
+    Location = apps.get_model('creators', 'Location')
+    located = Location.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    for pk, latitude, longitude in located.values_list('id', 'latitude', 'longitude').iterator():
+        schema_editor.execute(
+            f"INSERT INTO {SPATIAL_TABLE} (id, min_lat, max_lat, min_lng, max_lng) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [pk, latitude, latitude, longitude, longitude],
+        )
+
+
+def drop_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SPATIAL_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0015_creator_cover'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['latitude', 'longitude'], name='location_position_idx'),
+        ),
+        migrations.RunPython(create_spatial_index, drop_spatial_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0016_location_spatial_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query_key', models.CharField(max_length=255, unique=True, verbose_name='Clé normalisée')),
+                ('query', models.CharField(max_length=255, verbose_name="Requête d'origine")),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('provider', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField(verbose_name='Date du géocodage')),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('misses', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Géocodage en cache',
+                'verbose_name_plural': 'Géocodages en cache',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 20:23
+
+from django.db import migrations, models
+
+
+def backfill_geocoding_status(apps, schema_editor):
+    Location = apps.get_model('creators', 'Location')
+    Location.objects.filter(latitude__isnull=False, longitude__isnull=False).update(geocoding_status='done')
+    # Adresses jamais géocodées: traitées par process_geocoding_queue
+    Location.objects.filter(
+        models.Q(latitude__isnull=True) | models.Q(longitude__isnull=True),
+        full_address__gt='',
+    ).update(geocoding_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0017_geocode_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='geocoding_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='geocoding_next_attempt',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='geocoding_status',
+            field=models.CharField(blank=True, choices=[('', 'Sans adresse'), ('pending', 'En attente de géocodage'), ('done', 'Géocodée'), ('failed', 'Géocodage impossible')], default='', max_length=10, verbose_name='État du géocodage'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['geocoding_status', 'geocoding_next_attempt'], name='location_geocoding_idx'),
+        ),
+        migrations.RunPython(backfill_geocoding_status, migrations.RunPython.noop),
+    ]
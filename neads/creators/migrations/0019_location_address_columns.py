@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0018_location_geocoding_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='city',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='Ville'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='country_iso2',
+            field=models.CharField(blank=True, default='', max_length=2, verbose_name='Pays (ISO2)'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='department',
+            field=models.CharField(blank=True, default='', max_length=3, verbose_name='Département'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='postcode',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='Code postal'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='street',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Rue'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['country_iso2', 'city'], name='location_country_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['city'], name='location_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['postcode'], name='location_postcode_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['department'], name='location_department_idx'),
+        ),
+    ]
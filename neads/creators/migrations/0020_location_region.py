@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0019_location_address_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='region',
+            field=models.CharField(blank=True, default='', max_length=2, verbose_name='Région'),
+        ),
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['region'], name='location_region_idx'),
+        ),
+    ]
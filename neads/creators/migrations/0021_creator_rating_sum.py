@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 20:43
+
+from django.db import migrations, models
+
+
+def backfill_rating_sum(apps, schema_editor):
+    Creator = apps.get_model('creators', 'Creator')
+    Rating = apps.get_model('creators', 'Rating')
+    totals = Rating.objects.values('creator_id').annotate(
+        rating_sum=models.Sum('rating'), total_ratings=models.Count('id'),
+    ).values_list('creator_id', 'rating_sum', 'total_ratings')
+    creators = []
+    for creator_id, rating_sum, total_ratings in totals:
+        creators.append(Creator(
+            pk=creator_id, rating_sum=rating_sum, total_ratings=total_ratings,
+            average_rating=round(rating_sum / total_ratings, 2),
+        ))
+    Creator.objects.bulk_update(creators, ['rating_sum', 'total_ratings', 'average_rating'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0020_location_region'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='creator',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Somme des notes'),
+        ),
+        migrations.RunPython(backfill_rating_sum, migrations.RunPython.noop),
+    ]
@@ -13,6 +13,7 @@ Modèles principaux:
 - Media: Fichiers médias (images/vidéos) constituant le portfolio
 - Rating: Évaluations et commentaires sur les créateurs
 - Favorite: Sauvegarde de créateurs favoris par utilisateur
+- GeocodeCache: Résultats de géocodage partagés (voir geocoding.py)
 
 Relations principales:
 - Creator peut être lié à un User (relation one-to-one facultative)
@@ -21,12 +22,23 @@ Relations principales:
 - Creator a plusieurs Media, Rating et Favorite (relations one-to-many)
 - Creator est lié à un MapPoint dans l'application Map (relation one-to-one)
 
+Les agrégats de notation du créateur (rating_sum, total_ratings,
+average_rating) sont tenus à jour de façon incrémentale par chaque écriture
+d'un avis (Rating.save, suppression via le signal pre_delete): une seule
+requête UPDATE avec F(), sans relire les avis. `python manage.py
+verify_ratings` les recalcule et signale les écarts (voir ratings.py).
+
 Voir README.md pour plus de détails sur l'architecture et l'utilisation.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+from django.core.files.images import get_image_dimensions
 from django.core.validators import MinValueValidator, MaxValueValidator
 from neads.core.models import User
+from .search import INDEXED_SOURCE_FIELDS, update_creator_index, remove_creator_index
+from .spatial import remove_location_index, update_location_index
 from django.utils import timezone
 import os
 
@@ -64,9 +76,35 @@ class Domain(models.Model):
 
 
 class Location(models.Model):
+    # États du géocodage (file d'attente traitée par process_geocoding_queue, voir geocoding.py)
+    GEOCODING_NONE = ''
+    GEOCODING_PENDING = 'pending'
+    GEOCODING_DONE = 'done'
+    GEOCODING_FAILED = 'failed'
+    GEOCODING_STATUS_CHOICES = [
+        (GEOCODING_NONE, 'Sans adresse'),
+        (GEOCODING_PENDING, 'En attente de géocodage'),
+        (GEOCODING_DONE, 'Géocodée'),
+        (GEOCODING_FAILED, 'Géocodage impossible'),
+    ]
+    
     full_address = models.CharField(max_length=255, verbose_name="Adresse complète", blank=True, null=True)
     latitude = models.FloatField(blank=True, null=True)
     longitude = models.FloatField(blank=True, null=True)
+    geocoding_status = models.CharField(
+        max_length=10, choices=GEOCODING_STATUS_CHOICES, default=GEOCODING_NONE, blank=True,
+        verbose_name="État du géocodage",
+    )
+    geocoding_attempts = models.PositiveSmallIntegerField(default=0)
+    geocoding_next_attempt = models.DateTimeField(blank=True, null=True)
+    
+    # Adresse décomposée à l'écriture (voir addresses.py), pour les filtres exacts
+    street = models.CharField(max_length=255, blank=True, default='', verbose_name="Rue")
+    postcode = models.CharField(max_length=10, blank=True, default='', verbose_name="Code postal")
+    city = models.CharField(max_length=100, blank=True, default='', verbose_name="Ville")
+    department = models.CharField(max_length=3, blank=True, default='', verbose_name="Département")
+    region = models.CharField(max_length=2, blank=True, default='', verbose_name="Région")
+    country_iso2 = models.CharField(max_length=2, blank=True, default='', verbose_name="Pays (ISO2)")
     
     def __str__(self):
         if self.full_address:
@@ -76,15 +114,54 @@ class Location(models.Model):
         else:
             return "Localisation inconnue"
     
+    class Meta:
+        indexes = [
+            # Préfiltre des recherches par emprise hors SQLite (voir spatial.py)
+            models.Index(fields=['latitude', 'longitude'], name='location_position_idx'),
+            # File d'attente du géocodage
+            models.Index(fields=['geocoding_status', 'geocoding_next_attempt'], name='location_geocoding_idx'),
+            # Filtres par pays et ville, par code postal et par département
+            models.Index(fields=['country_iso2', 'city'], name='location_country_city_idx'),
+            models.Index(fields=['city'], name='location_city_idx'),
+            models.Index(fields=['postcode'], name='location_postcode_idx'),
+            models.Index(fields=['department'], name='location_department_idx'),
+            models.Index(fields=['region'], name='location_region_idx'),
+        ]
+    
     def save(self, *args, **kwargs):
-        # Importer la fonction de normalisation ici pour éviter l'import circulaire
-        from .views import normalize_address
+        # Importer les fonctions de normalisation ici pour éviter l'import circulaire
+        from .addresses import ADDRESS_FIELDS, normalize_address, parse_address
         
-        # Normaliser l'adresse avant sauvegarde si elle existe
-        if self.full_address:
-            self.full_address = normalize_address(self.full_address)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'full_address' in update_fields:
+            # Normaliser l'adresse avant sauvegarde si elle existe
+            if self.full_address:
+                self.full_address = normalize_address(self.full_address)
+            # Colonnes structurées (rue, code postal, ville, département, région, pays)
+            for field, value in parse_address(self.full_address).items():
+                setattr(self, field, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *ADDRESS_FIELDS}
+        
+        # Une adresse sans coordonnées est mise en file d'attente de géocodage
+        if self.latitude is not None and self.longitude is not None:
+            self.geocoding_status = self.GEOCODING_DONE
+        elif not self.full_address:
+            self.geocoding_status = self.GEOCODING_NONE
+        elif self.geocoding_status != self.GEOCODING_FAILED:
+            self.geocoding_status = self.GEOCODING_PENDING
             
         super().save(*args, **kwargs)
+        
+        # Maintenir l'index spatial (inutile si les coordonnées ne changent pas)
+        if update_fields is None or {'latitude', 'longitude'}.intersection(update_fields):
+            update_location_index(self)
+    
+    def delete(self, *args, **kwargs):
+        location_id = self.pk
+        result = super().delete(*args, **kwargs)
+        remove_location_index(location_id)
+        return result
 
 
 class LocationNew(models.Model):
@@ -106,7 +183,7 @@ class LocationNew(models.Model):
             
     def save(self, *args, **kwargs):
         # Importer la fonction de normalisation ici pour éviter l'import circulaire
-        from .views import normalize_address
+        from .addresses import normalize_address
         
         # Normaliser l'adresse avant sauvegarde si elle existe
         if self.full_address:
@@ -136,6 +213,11 @@ class Creator(models.Model):
     # Image mise en avant (image principale du profil)
     featured_image = models.ImageField(upload_to=featured_image_upload_path, blank=True, null=True, verbose_name="Image mise en avant")
     
+    # Image de couverture dénormalisée (maintenue par les signaux, voir signals.py)
+    cover_url = models.CharField(max_length=500, blank=True, default='')
+    cover_width = models.PositiveIntegerField(blank=True, null=True)
+    cover_height = models.PositiveIntegerField(blank=True, null=True)
+    
     # Réseaux sociaux
     youtube_link = models.URLField(max_length=255, blank=True, null=True, verbose_name="Chaîne YouTube")
     tiktok_link = models.URLField(max_length=255, blank=True, null=True, verbose_name="Profil TikTok")
@@ -159,31 +241,111 @@ class Creator(models.Model):
     can_invoice = models.BooleanField(default=False)
     previous_clients = models.TextField(blank=True, null=True)
     
-    # Métriques et notation
+    # Métriques et notation (agrégats incrémentaux des avis, voir apply_rating_change)
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)
     total_ratings = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0, verbose_name="Somme des notes")
     
     # Timestamps et métadonnées
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_activity = models.DateTimeField(blank=True, null=True)
     
+    class Meta:
+        indexes = [
+            # Tri de la galerie et de la recherche (pagination par curseur)
+            models.Index(fields=['-average_rating', 'full_name', 'id'], name='creator_rating_name_idx'),
+            # Tri des listes d'administration
+            models.Index(fields=['-created_at', 'id'], name='creator_created_idx'),
+        ]
+    
     def __str__(self):
         return self.full_name or f"{self.first_name} {self.last_name}"
     
     def save(self, *args, **kwargs):
         self.full_name = f"{self.first_name} {self.last_name}"
         super().save(*args, **kwargs)
-    
+        
+        # Maintenir l'index plein texte (inutile si seuls d'autres champs changent)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or INDEXED_SOURCE_FIELDS.intersection(update_fields):
+            update_creator_index(self)
+    
+    def delete(self, *args, **kwargs):
+        creator_id = self.pk
+        result = super().delete(*args, **kwargs)
+        remove_creator_index(creator_id)
+        return result
+    
+    @staticmethod
+    def apply_rating_change(creator_id, sum_delta, count_delta):
+        """
+        Ajoute `sum_delta` à la somme des notes et `count_delta` au nombre
+        d'avis d'un créateur, et recalcule la moyenne dans la même requête
+        UPDATE (F(), sans relire les avis ni les autres colonnes).
+        """
+        rating_sum = F('rating_sum') + sum_delta
+        total_ratings = F('total_ratings') + count_delta
+        Creator.objects.filter(pk=creator_id).update(
+            rating_sum=rating_sum,
+            total_ratings=total_ratings,
+            average_rating=Coalesce(
+                Round(Cast(rating_sum, FloatField()) / NullIf(total_ratings, 0), 2), Value(0.0),
+            ),
+        )
+
     def update_ratings(self):
-        # Prendre en compte tous les avis (plus de filtre is_verified)
-        ratings = self.ratings.all()
-        if ratings.exists():
-            avg = ratings.aggregate(models.Avg('rating'))['rating__avg']
-            count = ratings.count()
-            self.average_rating = round(avg, 2)
-            self.total_ratings = count
-            self.save()
+        """Recalcule entièrement les agrégats de notation à partir des avis (réparation)."""
+        totals = self.ratings.aggregate(rating_sum=models.Sum('rating'), total_ratings=models.Count('id'))
+        self.rating_sum = totals['rating_sum'] or 0
+        self.total_ratings = totals['total_ratings']
+        self.average_rating = round(self.rating_sum / self.total_ratings, 2) if self.total_ratings else 0
+        self.save(update_fields=['rating_sum', 'total_ratings', 'average_rating'])
+    
+    def compute_cover(self):
+        """
+        Calcule l'image de couverture (url, largeur, hauteur) dans cet ordre de priorité:
+        1. Image mise en avant (featured_image)
+        2. Première image du portfolio dont le fichier existe
+        3. Aucune image: ('', None, None)
+        """
+        candidates = []
+        if self.featured_image and self.featured_image.name:
+            candidates.append(self.featured_image)
+        candidates.extend(
+            media.file for media in self.media.filter(media_type='image')
+            if media.file and media.file.name
+        )
+        for file in candidates:
+            try:
+                if not file.storage.exists(file.name):
+                    continue
+                url = file.url
+            except Exception:
+                continue
+            try:
+                with file.storage.open(file.name) as image:
+                    width, height = get_image_dimensions(image)
+            except Exception:
+                width, height = None, None
+            return url, width, height
+        return '', None, None
+    
+    def refresh_cover(self):
+        """
+        Recalcule l'image de couverture et l'enregistre si elle a changé.
+        L'écriture passe par update() pour ne pas redéclencher les signaux de Creator.
+        """
+        cover = self.compute_cover()
+        if cover == (self.cover_url, self.cover_width, self.cover_height):
+            return False
+        self.cover_url, self.cover_width, self.cover_height = cover
+        Creator.objects.filter(pk=self.pk).update(
+            cover_url=self.cover_url,
+            cover_width=self.cover_width,
+            cover_height=self.cover_height,
+        )
+        return True
     
     def get_image_count(self):
         return self.media.filter(media_type='image').count()
@@ -254,8 +416,21 @@ class Rating(models.Model):
         return f"Note de {self.rating} pour {self.creator} par {self.user}"
     
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.creator.update_ratings()
+        # Agrégats du créateur mis à jour avec la note précédente de l'avis (modification)
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Rating.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'creator_id', 'rating',
+                ).first()
+            if previous is None:
+                Creator.apply_rating_change(self.creator_id, self.rating, 1)
+            elif previous[0] != self.creator_id:
+                Creator.apply_rating_change(previous[0], -previous[1], -1)
+                Creator.apply_rating_change(self.creator_id, self.rating, 1)
+            elif previous[1] != self.rating:
+                Creator.apply_rating_change(self.creator_id, self.rating - previous[1], 0)
+            super().save(*args, **kwargs)
 
 
 class Favorite(models.Model):
@@ -268,4 +443,36 @@ class Favorite(models.Model):
         unique_together = ('creator', 'user')
     
     def __str__(self):
-        return f"{self.creator} favori de {self.user}"
\ No newline at end of file
+        return f"{self.creator} favori de {self.user}"
+
+
+class GeocodeCache(models.Model):
+    """
+    Résultat de géocodage d'une adresse, partagé par le formulaire de
+    localisation, l'import CSV et tout autre géocodage (voir geocoding.py).
+    Une entrée sans coordonnées est un résultat négatif (adresse introuvable).
+    """
+    query_key = models.CharField(max_length=255, unique=True, verbose_name="Clé normalisée")
+    query = models.CharField(max_length=255, verbose_name="Requête d'origine")
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+    provider = models.CharField(max_length=50)
+    created_at = models.DateTimeField(verbose_name="Date du géocodage")
+    expires_at = models.DateTimeField(db_index=True)
+
+    # Métriques: lectures servies par le cache et appels au fournisseur
+    hits = models.PositiveIntegerField(default=0)
+    misses = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Géocodage en cache"
+        verbose_name_plural = "Géocodages en cache"
+
+    def __str__(self):
+        if self.is_negative:
+            return f"{self.query} (introuvable)"
+        return f"{self.query} ({self.latitude}, {self.longitude})"
+
+    @property
+    def is_negative(self):
+        return self.latitude is None or self.longitude is None
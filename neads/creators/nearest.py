@@ -0,0 +1,198 @@
+"""
+Recherche des créateurs les plus proches d'une position (k plus proches voisins).
+
+Les créateurs localisés sont projetés sur la sphère unité (vecteurs x, y, z)
+et rangés dans un arbre k-d construit avec NumPy: une recherche des k plus
+proches ne parcourt que les feuilles dont la boîte peut encore contenir un
+créateur plus proche que le k-ième trouvé, sans rayon à deviner. La distance
+euclidienne entre vecteurs (corde) varie comme la distance orthodromique, qui
+est calculée à la fin pour les seuls résultats.
+
+L'index est conservé en mémoire par processus. Lorsque la version des
+positions change (écriture d'une localisation, voir cache.py), les positions
+sont relues en une requête et l'arbre n'est reconstruit que si elles ont
+effectivement changé; les autres écritures du catalogue (avis, médias...)
+ne le touchent pas.
+
+Exemple d'utilisation:
+    for creator_id, distance_km in nearest(48.85, 2.35, k=10):
+        ...
+"""
+
+import heapq
+import threading
+
+import numpy as np
+
+from .cache import positions_version
+from .query import located_creators
+from .results import CreatorResults
+from .spatial import EARTH_RADIUS_KM
+
+# Nombre maximal de créateurs par feuille de l'arbre
+LEAF_SIZE = 32
+
+
+def to_vectors(latitudes, longitudes):
+    """Vecteurs unitaires (n, 3) de positions en degrés."""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lng = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_to_km(chord):
+    """Distance orthodromique (km) correspondant à une corde de la sphère unité."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord) / 2, 0, 1))
+
+
+def haversine_many(latitude, longitude, latitudes, longitudes):
+    """Distances (km, tableau NumPy) d'une position à un lot de positions en degrés."""
+    lat1, lng1 = np.radians(latitude), np.radians(longitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lng2 = np.radians(np.asarray(longitudes, dtype=np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class KDTree:
+    """
+    Arbre k-d statique sur des points (n, d). Les points sont réordonnés de
+    sorte que chaque nœud couvre un intervalle [début, fin) contigu.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.points = np.asarray(points, dtype=np.float64)
+        # Nœuds: (début, fin, gauche, droite, boîte min, boîte max); -1 pour une feuille
+        self.nodes = []
+        if len(points):
+            self._build(0, len(points))
+        self.points = self.points[self.order]
+
+    def _build(self, start, end):
+        index = len(self.nodes)
+        subset = self.points[self.order[start:end]]
+        lower, upper = subset.min(axis=0), subset.max(axis=0)
+        self.nodes.append([start, end, -1, -1, lower, upper])
+        if end - start > self.leaf_size:
+            # Découpe à la médiane de la dimension la plus étendue
+            axis = int(np.argmax(upper - lower))
+            middle = (end - start) // 2
+            partition = np.argpartition(subset[:, axis], middle)
+            self.order[start:end] = self.order[start:end][partition]
+            self.nodes[index][2] = self._build(start, start + middle)
+            self.nodes[index][3] = self._build(start + middle, end)
+        return index
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, point, k, mask=None):
+        """
+        Positions (dans l'ordre d'origine) et distances des k points les plus
+        proches de `point`, parmi ceux autorisés par `mask` (booléens, ordre d'origine).
+        """
+        if not self.nodes or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        point = np.asarray(point, dtype=np.float64)
+        allowed = mask[self.order] if mask is not None else None
+
+        best = []  # tas max des k meilleurs: (-distance², position)
+        queue = [(0.0, 0)]  # tas min des nœuds: (distance² minimale de la boîte, nœud)
+        while queue:
+            bound, index = heapq.heappop(queue)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            start, end, left, right, _, _ = self.nodes[index]
+            if left < 0:
+                candidates = np.arange(start, end)
+                if allowed is not None:
+                    candidates = candidates[allowed[start:end]]
+                distances = ((self.points[candidates] - point) ** 2).sum(axis=1)
+                for distance, position in zip(distances.tolist(), candidates.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, position))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, position))
+                continue
+            for child in (left, right):
+                _, _, _, _, lower, upper = self.nodes[child]
+                gap = np.maximum(0, np.maximum(lower - point, point - upper))
+                heapq.heappush(queue, (float((gap ** 2).sum()), child))
+
+        best.sort(key=lambda item: -item[0])
+        positions = np.array([position for _, position in best], dtype=np.int64)
+        distances = np.sqrt([-distance for distance, _ in best])
+        return self.order[positions], distances
+
+
+class NearestIndex:
+    """Arbre k-d des créateurs localisés pour une version des positions."""
+
+    def __init__(self, version, ids, latitudes, longitudes):
+        self.version = version
+        self.ids = ids
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.tree = KDTree(to_vectors(latitudes, longitudes))
+
+    @staticmethod
+    def read_positions():
+        rows = list(located_creators().order_by('pk').values_list(
+            'pk', 'location__latitude', 'location__longitude'
+        ))
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        latitudes = np.array([row[1] for row in rows], dtype=np.float64)
+        longitudes = np.array([row[2] for row in rows], dtype=np.float64)
+        return ids, latitudes, longitudes
+
+    def same_positions(self, ids, latitudes, longitudes):
+        return (
+            np.array_equal(self.ids, ids)
+            and np.array_equal(self.latitudes, latitudes)
+            and np.array_equal(self.longitudes, longitudes)
+        )
+
+    def nearest(self, latitude, longitude, k, allowed_ids=None):
+        """Liste de (identifiant du créateur, distance en km), du plus proche au plus éloigné."""
+        mask = None
+        if allowed_ids is not None:
+            mask = np.isin(self.ids, np.fromiter(allowed_ids, dtype=np.int64))
+        positions, chords = self.tree.query(to_vectors([latitude], [longitude])[0], k, mask)
+        return list(zip(self.ids[positions].tolist(), chord_to_km(chords).tolist()))
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def nearest_index():
+    """Index courant, relu si les positions des créateurs ont changé."""
+    global _index
+    version = positions_version()
+    index = _index
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                positions = NearestIndex.read_positions()
+                if _index is not None and _index.same_positions(*positions):
+                    # Positions inchangées (localisation réenregistrée): l'arbre est conservé
+                    _index.version = version
+                else:
+                    _index = NearestIndex(version, *positions)
+            index = _index
+    return index
+
+
+def nearest(latitude, longitude, k=10, filters=None, user=None):
+    """
+    Les k créateurs localisés les plus proches de la position, restreints aux
+    résultats de la recherche `filters` (CreatorQuery) si elle est fournie.
+    Retourne une liste de (identifiant du créateur, distance en km).
+    """
+    allowed_ids = None
+    if filters:
+        allowed_ids = CreatorResults(filters, user=user, located=True).ids
+    return nearest_index().nearest(latitude, longitude, k, allowed_ids)
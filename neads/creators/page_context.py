@@ -0,0 +1,72 @@
+"""
+Contextes de page précompilés de la galerie et de la carte.
+
+Les éléments du contexte qui ne dépendent pas de la requête (domaines, bornes
+d'âge des filtres, nombre de créateurs) sont construits une fois par version
+des données du catalogue et mis en cache (voir cache.py): une écriture sur un
+créateur, un domaine ou une localisation les invalide. Les réponses AJAX n'en ont pas besoin et ne doivent pas les
+demander.
+
+La liste des pays est une donnée statique (voir countries.py): elle est
+chargée une seule fois par processus plutôt que lue dans le cache, comme les
+départements et régions (voir departments.py).
+"""
+
+from django.db.models import Count, Max, Min
+
+from .cache import get_or_build
+from .countries import all_countries, asset_url
+from .departments import department_choices, region_choices
+from .models import Creator, Domain
+from .query import located_creators
+
+
+def countries_context():
+    """
+    Pays, départements et régions pour les sélecteurs de lieu. Les villes ne
+    sont plus incluses dans la page: elles sont chargées depuis le fichier
+    statique compilé (s'il existe) ou pays par pays depuis l'API.
+    """
+    return {
+        'countries': all_countries(),
+        'country_cities_url': asset_url(),
+        'departments': department_choices(),
+        'regions': region_choices(),
+    }
+
+
+def _age_bounds(creators, default_max):
+    ages = creators.aggregate(min_age=Min('age'), max_age=Max('age'))
+    return {
+        'min_creator_age': ages['min_age'] or 18,
+        'max_creator_age': ages['max_age'] or default_max,
+    }
+
+
+def gallery_page_context():
+    """Contexte indépendant de la requête de la galerie."""
+    def build():
+        all_domains = list(Domain.objects.all().order_by('name'))
+        # Les 6 domaines les plus utilisés
+        top_domains = list(Domain.objects.annotate(
+            creator_count=Count('creators')
+        ).order_by('-creator_count')[:6])
+        return {
+            'domains': all_domains,
+            'all_domains': all_domains,
+            'top_domains': top_domains,
+            **_age_bounds(Creator.objects.all(), 65),
+        }
+
+    return {**get_or_build('page:gallery', build), **countries_context()}
+
+
+def map_page_context():
+    """Contexte indépendant de la requête de la carte."""
+    def build():
+        return {
+            'total_creators': located_creators().count(),
+            **_age_bounds(Creator.objects.all(), 80),
+        }
+
+    return {**get_or_build('page:map', build), **countries_context()}
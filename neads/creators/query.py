@@ -0,0 +1,237 @@
+"""
+Moteur de filtrage des créateurs du projet NEADS.
+
+Ce module centralise la traduction des critères de recherche (CreatorSearchForm)
+en requêtes sur le modèle Creator. Il est partagé par la galerie, la recherche,
+la carte et les endpoints JSON afin que tous appliquent exactement la même
+sémantique de filtrage.
+
+Principes:
+- Les critères sont normalisés en une spécification canonique et hashable
+  (tuple trié de paires clé/valeur), indépendante de l'utilisateur courant
+- La spécification fournit une clé de cache stable réutilisable pour la mise
+  en cache des résultats
+- Les filtres sur relations multiples (domaines, favoris) sont compilés en
+  sous-requêtes EXISTS, ce qui évite les jointures suivies d'un DISTINCT
+"""
+
+import hashlib
+
+from django.db.models import Exists, OuterRef, Q
+
+from .cities import city_names, country_code
+from .forms import CreatorSearchForm
+from .models import Creator, Favorite
+from .search import search_q, search_rank
+
+
+class CreatorQuery:
+    """
+    Spécification canonique d'une recherche de créateurs.
+
+    Exemple d'utilisation:
+        creator_query = CreatorQuery.from_request(request)
+        creators = creator_query.queryset(user=request.user)
+        key = creator_query.cache_key()
+    """
+
+    # Tri par défaut des listes de créateurs (l'id garantit un ordre total)
+    ORDERING = ('-average_rating', 'full_name', 'id')
+
+    # Champs de CreatorSearchForm pris en compte dans la spécification.
+    # `verified_only` est volontairement absent: le champ verified_by_neads
+    # a été supprimé du modèle Creator (migration 0011).
+    FIELDS = (
+        'query', 'domains', 'min_age', 'max_age', 'gender', 'min_rating',
+        'can_invoice', 'favorites_only', 'country', 'city', 'department', 'region',
+    )
+
+    def __init__(self, **criteria):
+        spec = []
+        for field in self.FIELDS:
+            value = self._normalize(field, criteria.get(field))
+            if value not in (None, '', (), False):
+                spec.append((field, value))
+        self.spec = tuple(spec)
+
+    @staticmethod
+    def _normalize(field, value):
+        """Ramène une valeur de critère à une forme canonique et hashable."""
+        if value is None:
+            return None
+        if field == 'domains':
+            # Accepte un queryset, une liste d'objets Domain ou d'identifiants
+            return tuple(sorted({int(getattr(d, 'pk', d)) for d in value}))
+        if field in ('can_invoice', 'favorites_only'):
+            return bool(value)
+        if field in ('min_age', 'max_age', 'min_rating'):
+            return int(value)
+        return ' '.join(str(value).split())
+
+    @classmethod
+    def from_form(cls, form):
+        """
+        Construit la spécification à partir d'un CreatorSearchForm lié. Un
+        paramètre invalide est ignoré seul: les autres critères s'appliquent.
+        """
+        form.is_valid()
+        return cls(**{
+            field: value for field, value in form.cleaned_data.items() if field not in form.errors
+        })
+
+    @classmethod
+    def from_request(cls, request):
+        """
+        Construit la spécification à partir des paramètres GET de la requête.
+        Les domaines peuvent être passés en paramètres répétés
+        (?domains=1&domains=2) ou séparés par des virgules (?domains=1,2).
+        """
+        return cls.from_form(CreatorSearchForm(cls.normalize_params(request.GET)))
+
+    @staticmethod
+    def normalize_params(params):
+        """Éclate les listes de domaines séparées par des virgules."""
+        params = params.copy()
+        domains = []
+        for value in params.getlist('domains'):
+            domains.extend(part for part in value.split(',') if part.strip().isdigit())
+        params.setlist('domains', domains)
+        return params
+
+    def __bool__(self):
+        return bool(self.spec)
+
+    def __eq__(self, other):
+        return isinstance(other, CreatorQuery) and self.spec == other.spec
+
+    def __hash__(self):
+        return hash(self.spec)
+
+    def __repr__(self):
+        return f"CreatorQuery({dict(self.spec)!r})"
+
+    def get(self, field, default=None):
+        return dict(self.spec).get(field, default)
+
+    def without(self, *fields):
+        """Copie de la spécification sans les critères indiqués."""
+        clone = CreatorQuery()
+        clone.spec = tuple((field, value) for field, value in self.spec if field not in fields)
+        return clone
+
+    def cache_key(self, prefix='creators'):
+        """Clé de cache stable (entre processus) dérivée de la spécification."""
+        digest = hashlib.sha1(repr(self.spec).encode('utf-8')).hexdigest()
+        return f"{prefix}:{digest}"
+
+    def filter_q(self):
+        """Traduit les critères indépendants de l'utilisateur en un objet Q."""
+        criteria = dict(self.spec)
+        q = Q()
+
+        # Recherche plein texte (noms, bio, équipement, anciens clients)
+        if 'query' in criteria:
+            q &= search_q(criteria['query'])
+
+        # Filtre par domaines (au moins un des domaines demandés)
+        if 'domains' in criteria:
+            q &= Q(Exists(Creator.domains.through.objects.filter(
+                creator_id=OuterRef('pk'),
+                domain_id__in=criteria['domains'],
+            )))
+
+        # Filtres par âge
+        if 'min_age' in criteria:
+            q &= Q(age__gte=criteria['min_age'])
+        if 'max_age' in criteria:
+            q &= Q(age__lte=criteria['max_age'])
+
+        # Filtre par genre
+        if 'gender' in criteria:
+            q &= Q(gender=criteria['gender'])
+
+        # Filtres géographiques: recherches exactes sur les colonnes indexées de Location (addresses.py)
+        iso2 = None
+        if 'country' in criteria:
+            iso2 = country_code(criteria['country'])
+            q &= Q(location__country_iso2=iso2) if iso2 else Q(pk__in=[])
+        if 'city' in criteria:
+            q &= Q(location__city__in=city_names(criteria['city'], iso2) or [criteria['city']])
+        if 'department' in criteria:
+            q &= Q(location__department=criteria['department'])
+        if 'region' in criteria:
+            q &= Q(location__region=criteria['region'])
+
+        # Filtre par note minimale
+        if 'min_rating' in criteria:
+            q &= Q(average_rating__gte=criteria['min_rating'])
+
+        # Autres filtres spécifiques
+        if criteria.get('can_invoice'):
+            q &= Q(can_invoice=True)
+
+        return q
+
+    def queryset(self, base=None, user=None, ordered=True, ranked=False):
+        """
+        Retourne le queryset filtré.
+
+        `base` permet de partir d'un queryset restreint (ex: créateurs localisés),
+        `user` est nécessaire pour appliquer le filtre des favoris et `ranked`
+        trie d'abord par pertinence lorsqu'une recherche textuelle est présente.
+        """
+        creators = base if base is not None else Creator.objects.all()
+        creators = creators.filter(self.filter_q())
+
+        # Filtre des favoris (dépend de l'utilisateur, hors clé de cache)
+        if self.get('favorites_only'):
+            if user is not None and user.is_authenticated:
+                creators = creators.filter(Exists(Favorite.objects.filter(
+                    user=user,
+                    creator_id=OuterRef('pk'),
+                )))
+
+        if ordered:
+            rank = search_rank(self.get('query')) if ranked else None
+            if rank is not None:
+                creators = creators.annotate(search_rank=rank)
+                creators = creators.order_by('search_rank', *self.ORDERING)
+            else:
+                creators = creators.order_by(*self.ORDERING)
+        return creators
+
+
+def located_creators():
+    """Créateurs disposant de coordonnées, base commune des endpoints carte."""
+    return Creator.objects.filter(
+        location__latitude__isnull=False,
+        location__longitude__isnull=False,
+    )
+
+
+# Champs texte volumineux inutiles à l'affichage des cartes de créateurs
+CARD_DEFERRED_FIELDS = ('bio', 'previous_clients', 'equipment')
+
+
+def with_card_data(creators):
+    """
+    Chemin de lecture groupé pour l'affichage des cartes de créateurs.
+
+    Charge la localisation par jointure et les domaines en une requête
+    supplémentaire, quel que soit le nombre de créateurs de la page, et diffère
+    les champs texte volumineux. L'image de couverture est lue directement sur
+    le créateur (cover_url), sans accès aux médias.
+    """
+    return creators.select_related('location').defer(*CARD_DEFERRED_FIELDS).prefetch_related('domains')
+
+
+# Colonnes nécessaires aux points de la carte
+MAP_POINT_FIELDS = (
+    'id', 'first_name', 'last_name', 'full_name', 'average_rating', 'cover_url',
+    'location__latitude', 'location__longitude',
+)
+
+
+def with_map_data(creators):
+    """Chemin de lecture des points de carte: localisation par jointure, colonnes utiles uniquement."""
+    return creators.select_related('location').only(*MAP_POINT_FIELDS)
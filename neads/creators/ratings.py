@@ -0,0 +1,67 @@
+"""
+Vérification des agrégats de notation des créateurs du projet NEADS.
+
+Les colonnes rating_sum, total_ratings et average_rating de Creator sont
+tenues à jour de façon incrémentale à chaque écriture d'un avis (voir
+Creator.apply_rating_change). Une écriture qui contourne Rating.save et les
+signaux (update() ou bulk_create sur les avis, modification manuelle en base)
+les fait dériver: `rating_drift()` les recalcule tous en une seule requête
+GROUP BY et retourne les créateurs dont les valeurs diffèrent.
+
+Exemple d'utilisation:
+    drifts = rating_drift()
+    repair_drift(drifts)  # ou: python manage.py verify_ratings --fix
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from .models import Creator
+
+# Écart toléré sur la moyenne (arrondie à 2 décimales)
+AVERAGE_TOLERANCE = Decimal('0.005')
+
+RatingDrift = namedtuple('RatingDrift', (
+    'creator_id', 'rating_sum', 'total_ratings', 'average_rating',
+    'expected_sum', 'expected_total', 'expected_average',
+))
+
+
+def rating_drift():
+    """Créateurs dont les agrégats stockés diffèrent de ceux recalculés à partir des avis."""
+    rows = Creator.objects.order_by('pk').annotate(
+        expected_sum=Sum('ratings__rating'), expected_total=Count('ratings'),
+    ).values_list('pk', 'rating_sum', 'total_ratings', 'average_rating', 'expected_sum', 'expected_total')
+
+    drifts = []
+    for creator_id, rating_sum, total_ratings, average_rating, expected_sum, expected_total in rows:
+        expected_sum = expected_sum or 0
+        expected_average = (
+            (Decimal(expected_sum) / expected_total).quantize(Decimal('0.01')) if expected_total else Decimal('0.00')
+        )
+        if (rating_sum != expected_sum or total_ratings != expected_total
+                or abs(Decimal(average_rating) - expected_average) > AVERAGE_TOLERANCE):
+            drifts.append(RatingDrift(
+                creator_id, rating_sum, total_ratings, average_rating,
+                expected_sum, expected_total, expected_average,
+            ))
+    return drifts
+
+
+def repair_drift(drifts):
+    """
+    Réécrit les agrégats recalculés des créateurs concernés. Chaque créateur
+    est enregistré (save) pour que la carte et les caches suivent.
+    """
+    creators = Creator.objects.in_bulk([drift.creator_id for drift in drifts])
+    for drift in drifts:
+        creator = creators.get(drift.creator_id)
+        if creator is None:
+            continue
+        creator.rating_sum = drift.expected_sum
+        creator.total_ratings = drift.expected_total
+        creator.average_rating = drift.expected_average
+        creator.save(update_fields=['rating_sum', 'total_ratings', 'average_rating'])
+    return len(drifts)
@@ -0,0 +1,120 @@
+"""
+Cache partagé des résultats de recherche de créateurs.
+
+Une combinaison de filtres donnée (spécification CreatorQuery) produit la même
+liste de créateurs pour tous les utilisateurs, à l'exception du filtre des
+favoris. La liste ordonnée des identifiants est donc mise en cache par
+spécification et par version des données du catalogue (voir cache.py), dans
+le cache partagé entre les workers (CACHES), puis:
+- le filtre `favorites_only` est appliqué en mémoire par intersection avec
+  l'ensemble (lui aussi en cache) des favoris de l'utilisateur
+- seuls les créateurs de la page affichée sont lus en base, par clé primaire,
+  et un parcours complet (carte) les lit par lots
+
+CreatorResults se comporte comme une séquence et peut être passé directement
+au Paginator de Django.
+"""
+
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+from .cache import get_or_build
+from .models import Creator, Favorite
+from .query import located_creators, with_card_data
+
+# Durée de conservation des favoris d'un utilisateur (invalidés à chaque modification)
+FAVORITES_TIMEOUT = 60 * 60
+
+
+def favorites_key(user_id):
+    return f"favorites:{user_id}"
+
+
+def favorite_ids(user):
+    """Identifiants des créateurs favoris de l'utilisateur (frozenset en cache)."""
+    key = favorites_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Favorite.objects.filter(user=user).values_list('creator_id', flat=True))
+        cache.set(key, ids, FAVORITES_TIMEOUT)
+    return ids
+
+
+def invalidate_favorites(user_id):
+    cache.delete(favorites_key(user_id))
+
+
+class CreatorResults:
+    """
+    Résultats d'une recherche de créateurs servis depuis le cache partagé.
+
+    Exemple d'utilisation:
+        results = CreatorResults(CreatorQuery.from_form(form), user=request.user)
+        paginator = Paginator(results, 12)
+        page_obj = paginator.get_page(request.GET.get('page', 1))
+    """
+
+    # Nombre de créateurs lus par requête lors d'un parcours complet
+    CHUNK_SIZE = 2000
+
+    def __init__(self, creator_query, user=None, located=False, ranked=False, prepare=with_card_data):
+        self.creator_query = creator_query
+        self.user = user
+        self.located = located
+        self.ranked = ranked
+        # Préparation du queryset de lecture des créateurs (jointures, colonnes)
+        self.prepare = prepare
+
+    def _shared_ids(self):
+        """Identifiants ordonnés, indépendants de l'utilisateur (hors favoris)."""
+        shared_query = self.creator_query.without('favorites_only')
+        prefix = 'results'
+        if self.located:
+            prefix += ':located'
+        if self.ranked:
+            prefix += ':ranked'
+
+        def build():
+            base = located_creators() if self.located else None
+            creators = shared_query.queryset(base=base, ranked=self.ranked)
+            return list(creators.values_list('pk', flat=True))
+
+        return get_or_build(shared_query.cache_key(prefix=prefix), build)
+
+    @cached_property
+    def ids(self):
+        ids = self._shared_ids()
+        if self.creator_query.get('favorites_only'):
+            if self.user is not None and self.user.is_authenticated:
+                favorites = favorite_ids(self.user)
+                ids = [pk for pk in ids if pk in favorites]
+        return ids
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def fetch(self, ids):
+        """Créateurs correspondant aux identifiants, dans le même ordre."""
+        creators = Creator.objects.filter(pk__in=ids)
+        if self.prepare is not None:
+            creators = self.prepare(creators)
+        by_id = {creator.pk: creator for creator in creators}
+        return [by_id[pk] for pk in ids if pk in by_id]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.fetch(self.ids[index])
+        return self.fetch([self.ids[index]])[0]
+
+    def __iter__(self):
+        return self.iterator()
+
+    def iterator(self, chunk_size=None):
+        """Parcourt tous les résultats par lots, sans les charger tous en mémoire."""
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        ids = self.ids
+        for start in range(0, len(ids), chunk_size):
+            yield from self.fetch(ids[start:start + chunk_size])
@@ -0,0 +1,153 @@
+"""
+Index plein texte des créateurs du projet NEADS.
+
+Remplace les recherches `icontains` chaînées (parcours complet de la table à
+chaque frappe) par un véritable index plein texte:
+- SQLite: table virtuelle FTS5 (tokenizer unicode61 sans diacritiques),
+  classement BM25
+- PostgreSQL: table de documents `tsvector` (configuration french + unaccent)
+  avec index GIN, classement ts_rank
+
+L'index couvre le nom complet, la bio, l'équipement et les anciens clients.
+Il est maintenu de façon incrémentale à chaque Creator.save() et peut être
+reconstruit avec la commande `python manage.py rebuild_search_index`.
+Sur un autre moteur de base de données, la recherche retombe sur `icontains`.
+"""
+
+import logging
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# Table de l'index (virtuelle FTS5 sur SQLite, table tsvector sur PostgreSQL)
+SEARCH_TABLE = 'creators_creator_search'
+
+# Champs indexés et poids associés pour le classement
+SEARCH_FIELDS = ('full_name', 'bio', 'equipment', 'previous_clients')
+BM25_WEIGHTS = (10.0, 1.0, 2.0, 2.0)
+TSVECTOR_WEIGHTS = ('A', 'C', 'B', 'B')
+
+# Champs dont la modification impose une réindexation
+INDEXED_SOURCE_FIELDS = frozenset(SEARCH_FIELDS) | {'first_name', 'last_name'}
+
+
+def fold(text):
+    """Minuscules et suppression des accents ("Hélène" -> "helene")."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Découpe une saisie utilisateur en termes normalisés (les élisions "l'" sont ignorées)."""
+    return [t for t in re.findall(r'\w+', fold(text)) if len(t) > 1 or t.isdigit()]
+
+
+def is_supported():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def _document(creator):
+    return [getattr(creator, field) or '' for field in SEARCH_FIELDS]
+
+
+def update_creator_index(creator):
+    """Insère ou met à jour le document d'un créateur dans l'index."""
+    if not is_supported():
+        return
+    values = _document(creator)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [creator.pk])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(SEARCH_FIELDS))})",
+                [creator.pk, *values],
+            )
+        else:
+            document = ' || '.join(
+                f"setweight(to_tsvector('french', unaccent(%s)), '{weight}')"
+                for weight in TSVECTOR_WEIGHTS
+            )
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (creator_id, document) VALUES (%s, {document}) "
+                f"ON CONFLICT (creator_id) DO UPDATE SET document = EXCLUDED.document",
+                [creator.pk, *values],
+            )
+
+
+def remove_creator_index(creator_id):
+    """Retire un créateur de l'index."""
+    if not is_supported():
+        return
+    column = 'rowid' if connection.vendor == 'sqlite' else 'creator_id'
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {column} = %s", [creator_id])
+
+
+def rebuild_index(creators):
+    """Vide puis reconstruit l'index à partir d'un itérable de créateurs."""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    count = 0
+    for creator in creators:
+        update_creator_index(creator)
+        count += 1
+    return count
+
+
+def _match_expression(terms):
+    """Requête FTS5 (SQLite) ou tsquery (PostgreSQL): tous les termes, en préfixe."""
+    if connection.vendor == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms)
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search_q(text):
+    """
+    Filtre Q restreignant les créateurs à ceux qui correspondent à la saisie.
+    Retombe sur des `icontains` si le moteur ne dispose pas de l'index.
+    """
+    terms = tokenize(text)
+    if not terms:
+        return Q()
+    if not is_supported():
+        return (
+            Q(first_name__icontains=text) |
+            Q(last_name__icontains=text) |
+            Q(full_name__icontains=text) |
+            Q(bio__icontains=text)
+        )
+    if connection.vendor == 'sqlite':
+        sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    else:
+        sql = f"SELECT creator_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('french', %s)"
+    return Q(pk__in=RawSQL(sql, [_match_expression(terms)]))
+
+
+def search_rank(text):
+    """
+    Expression de pertinence (plus petite = plus pertinente) à annoter sur un
+    queryset de créateurs déjà filtré par search_q().
+    """
+    terms = tokenize(text)
+    if not terms or not is_supported():
+        return None
+    if connection.vendor == 'sqlite':
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+        sql = (
+            f"SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s AND rowid = creators_creator.id"
+        )
+    else:
+        sql = (
+            f"SELECT -ts_rank(document, to_tsquery('french', %s)) FROM {SEARCH_TABLE} "
+            f"WHERE creator_id = creators_creator.id"
+        )
+    return RawSQL(sql, [_match_expression(terms)])
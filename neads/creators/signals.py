@@ -0,0 +1,95 @@
+"""
+Signaux de l'application Creators du projet NEADS.
+
+- Maintiennent l'image de couverture dénormalisée des créateurs (cover_url,
+  cover_width, cover_height) afin que les listes et endpoints JSON n'aient
+  jamais à lire les médias ni à interroger le stockage. Les écritures qui ne
+  déclenchent pas de signaux (bulk_create, update) sont rattrapées par la
+  commande `python manage.py backfill_creator_covers`.
+- Incrémentent la version des données du catalogue (voir cache.py) à chaque
+  écriture sur un créateur, un domaine, une localisation, un média ou un avis,
+  et celle des positions à chaque écriture pouvant déplacer un créateur.
+- Invalident l'ensemble des favoris en cache d'un utilisateur (voir results.py).
+- Retirent un avis supprimé des agrégats de notation de son créateur
+  (l'ajout et la modification passent par Rating.save).
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_data_version, bump_positions_version
+from .models import Creator, Domain, Favorite, Location, Media, Rating
+from .results import invalidate_favorites
+
+
+def refresh_creator_cover(creator_id):
+    creator = Creator.objects.filter(pk=creator_id).first()
+    if creator is not None:
+        creator.refresh_cover()
+
+
+@receiver(post_save, sender=Creator)
+def creator_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Seul un changement de l'image mise en avant peut modifier la couverture
+    if raw or (update_fields is not None and 'featured_image' not in update_fields):
+        return
+    instance.refresh_cover()
+
+
+@receiver(post_save, sender=Media)
+def media_saved(sender, instance, raw=False, **kwargs):
+    if raw or instance.media_type != 'image':
+        return
+    refresh_creator_cover(instance.creator_id)
+
+
+@receiver(post_delete, sender=Media)
+def media_deleted(sender, instance, **kwargs):
+    if instance.media_type != 'image':
+        return
+    refresh_creator_cover(instance.creator_id)
+
+
+@receiver(pre_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    # Dans la transaction de suppression (y compris la cascade d'un créateur supprimé)
+    Creator.apply_rating_change(instance.creator_id, -instance.rating, -1)
+
+
+@receiver(post_save, sender=Creator)
+@receiver(post_delete, sender=Creator)
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+@receiver(m2m_changed, sender=Creator.domains.through)
+def catalog_changed(sender, raw=False, action=None, **kwargs):
+    if raw or (action is not None and not action.startswith('post_')):
+        return
+    bump_data_version()
+
+
+@receiver(post_save, sender=Creator)
+@receiver(post_delete, sender=Creator)
+def creator_position_changed(sender, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'location' not in update_fields):
+        return
+    bump_positions_version()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_position_changed(sender, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not {'latitude', 'longitude'} & set(update_fields)):
+        return
+    bump_positions_version()
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def favorite_changed(sender, instance, **kwargs):
+    invalidate_favorites(instance.user_id)
@@ -0,0 +1,134 @@
+"""
+Index spatial des localisations du projet NEADS.
+
+Les recherches par rayon et par emprise (api_map_search) ne parcourent plus
+tous les créateurs localisés: une requête sur l'index spatial retourne les
+seuls candidats situés dans le rectangle englobant, et la distance exacte
+(haversine, voir nearest.py) n'est calculée que pour eux.
+- SQLite: table virtuelle R*Tree (une boîte réduite à un point par
+  localisation), maintenue à chaque Location.save()
+- autres moteurs (PostgreSQL): index composite (latitude, longitude) sur
+  Location, interrogé par intervalles
+
+L'index R*Tree peut être reconstruit avec la commande
+`python manage.py rebuild_spatial_index`.
+"""
+
+import math
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Table virtuelle R*Tree (SQLite)
+SPATIAL_TABLE = 'creators_location_rtree'
+
+EARTH_RADIUS_KM = 6371
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def update_location_index(location):
+    """Insère, met à jour ou retire (sans coordonnées) une localisation de l'index."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SPATIAL_TABLE} WHERE id = %s", [location.pk])
+        if location.latitude is not None and location.longitude is not None:
+            cursor.execute(
+                f"INSERT INTO {SPATIAL_TABLE} (id, min_lat, max_lat, min_lng, max_lng) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                [location.pk, location.latitude, location.latitude, location.longitude, location.longitude],
+            )
+
+
+def remove_location_index(location_id):
+    """Retire une localisation de l'index."""
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SPATIAL_TABLE} WHERE id = %s", [location_id])
+
+
+def rebuild_index(locations):
+    """Vide puis reconstruit l'index à partir d'un itérable de localisations."""
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SPATIAL_TABLE}")
+    count = 0
+    for location in locations:
+        update_location_index(location)
+        count += 1
+    return count
+
+
+def parse_bbox(value):
+    """Emprise "ouest,sud,est,nord" (format Leaflet toBBoxString) ou ValueError."""
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (math.isfinite(west) and math.isfinite(east)):
+        raise ValueError("Invalid bbox longitudes")
+    if not (-90 <= south <= north <= 90):
+        raise ValueError("Invalid bbox latitudes")
+    return west, south, east, north
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Emprise (ouest, sud, est, nord) englobant le cercle de rayon donné."""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = latitude - delta_lat, latitude + delta_lat
+    if south <= -90 or north >= 90:
+        # Le cercle contient un pôle: toutes les longitudes
+        return -180, max(south, -90), 180, min(north, 90)
+    delta_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    if delta_lng >= 180:
+        return -180, south, 180, north
+    return longitude - delta_lng, south, longitude + delta_lng, north
+
+
+def longitude_ranges(west, east):
+    """Intervalles de longitudes d'une emprise, découpée si elle traverse l'antiméridien."""
+    if east - west >= 360:
+        return [(-180, 180)]
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180), (-180, east)]
+
+
+def in_bbox(latitude, longitude, bbox):
+    west, south, east, north = bbox
+    return south <= latitude <= north and any(
+        low <= longitude <= high for low, high in longitude_ranges(west, east)
+    )
+
+
+def range_q(bbox, prefix=''):
+    """Filtre Q par intervalles de latitude et de longitude (champs `latitude`/`longitude`)."""
+    west, south, east, north = bbox
+    condition = Q()
+    for low, high in longitude_ranges(west, east):
+        condition |= Q(**{f'{prefix}longitude__gte': low, f'{prefix}longitude__lte': high})
+    return Q(**{f'{prefix}latitude__gte': south, f'{prefix}latitude__lte': north}) & condition
+
+
+def bbox_q(bbox, prefix='location__'):
+    """
+    Filtre Q restreignant un queryset (de créateurs par défaut) aux positions
+    situées dans l'emprise (ouest, sud, est, nord).
+    """
+    if not is_supported():
+        return range_q(bbox, prefix)
+    west, south, east, north = bbox
+    ranges = longitude_ranges(west, east)
+    conditions = ' OR '.join('(max_lng >= %s AND min_lng <= %s)' for _ in ranges)
+    sql = (
+        f"SELECT id FROM {SPATIAL_TABLE} "
+        f"WHERE max_lat >= %s AND min_lat <= %s AND ({conditions})"
+    )
+    params = [south, north] + [bound for low_high in ranges for bound in low_high]
+    return Q(**{f'{prefix}id__in': RawSQL(sql, params)})
+
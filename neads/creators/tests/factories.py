@@ -2,7 +2,7 @@ import factory
 from factory.django import DjangoModelFactory
 from django.utils import timezone
 from neads.core.models import User
-from neads.creators.models import Creator, Domain, ContentType, Location, Media, Rating, Favorite
+from neads.creators.models import Creator, Domain, Location, Media, Rating, Favorite
 
 
 class UserFactory(DjangoModelFactory):
@@ -25,20 +25,11 @@ class DomainFactory(DjangoModelFactory):
     icon = factory.Faker('word')
 
 
-class ContentTypeFactory(DjangoModelFactory):
-    class Meta:
-        model = ContentType
-
-    name = factory.Sequence(lambda n: f'ContentType {n}')
-
-
 class LocationFactory(DjangoModelFactory):
     class Meta:
         model = Location
 
-    city = factory.Faker('city')
-    country = factory.Faker('country')
-    postal_code = factory.Faker('postcode')
+    full_address = factory.Sequence(lambda n: f'{n} rue de la Paix, 75002 Paris')
     latitude = factory.Faker('latitude')
     longitude = factory.Faker('longitude')
 
@@ -55,10 +46,6 @@ class CreatorFactory(DjangoModelFactory):
     email = factory.Faker('email')
     location = factory.SubFactory(LocationFactory)
     bio = factory.Faker('paragraph')
-    average_rating = factory.Faker('pyfloat', min_value=1, max_value=5)
-    total_ratings = factory.Faker('random_int', min=0, max=100)
-    total_clients = factory.Faker('random_int', min=0, max=50)
-    verified_by_neads = factory.Faker('boolean')
     created_at = factory.LazyFunction(timezone.now)
 
     @factory.post_generation
@@ -74,18 +61,6 @@ class CreatorFactory(DjangoModelFactory):
             self.domains.add(DomainFactory())
             self.domains.add(DomainFactory())
 
-    @factory.post_generation
-    def content_types(self, create, extracted, **kwargs):
-        if not create:
-            return
-
-        if extracted:
-            for content_type in extracted:
-                self.content_types.add(content_type)
-        else:
-            # Ajouter un type de contenu par défaut
-            self.content_types.add(ContentTypeFactory())
-
 
 class MediaFactory(DjangoModelFactory):
     class Meta:
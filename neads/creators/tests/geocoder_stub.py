@@ -0,0 +1,96 @@
+"""
+Serveur de géocodage local imitant l'API de recherche de Nominatim, pour les
+tests (aucune requête ne sort de la machine).
+
+Exemple d'utilisation:
+    with StubGeocoder({'Lyon': (45.764, 4.8357)}) as stub, override_settings(NOMINATIM_URL=stub.url):
+        ...
+    stub.queries  # requêtes reçues
+
+Il peut aussi être lancé seul pour le développement (NOMINATIM_URL =
+'http://127.0.0.1:8088/search'):
+    python -m neads.creators.tests.geocoder_stub --port 8088
+"""
+
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubGeocoder:
+    """Serveur HTTP en tâche de fond répondant à /search?q=...&format=json."""
+
+    def __init__(self, positions=None, host='127.0.0.1', port=0):
+        self.positions = dict(positions or {})
+        self.queries = []
+        # Nombre de prochaines requêtes en erreur (503), pour tester les reprises
+        self.failures = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                request = urlparse(self.path)
+                if request.path != '/search':
+                    self.send_error(404)
+                    return
+                query = parse_qs(request.query).get('q', [''])[0]
+                stub.queries.append(query)
+                if stub.failures > 0:
+                    stub.failures -= 1
+                    self.send_error(503)
+                    return
+                position = stub.positions.get(query)
+                results = [] if position is None else [{
+                    'lat': str(position[0]), 'lon': str(position[1]), 'display_name': query,
+                }]
+                body = json.dumps(results).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serveur de géocodage local (API Nominatim simplifiée)")
+    parser.add_argument('--port', type=int, default=8088)
+    parser.add_argument('--positions', help="Fichier JSON {adresse: [latitude, longitude]}")
+    args = parser.parse_args()
+    positions = {}
+    if args.positions:
+        with open(args.positions, encoding='utf-8') as fp:
+            positions = json.load(fp)
+    stub = StubGeocoder(positions, port=args.port)
+    print(f"Géocodeur local: {stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,149 @@
+import pytest
+import colorlog
+import logging
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from neads.creators.addresses import department_of, normalize_address, normalize_many, parse_address
+from neads.creators.facets import compute_facets
+from neads.creators.models import Location
+from neads.creators.query import CreatorQuery
+from neads.creators.tests.test_query import make_creator
+from neads.map.areas import area_counts
+from neads.map.models import MapPoint
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_addresses_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestAddresses(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des adresses structurées")
+        self.alice = make_creator('Alice', 'Martin', address='1 rue Balay, 42000 Saint-Étienne, France')
+        self.bob = make_creator('Bob', 'Durand', address='Genève, Suisse')
+        self.chloe = make_creator('Chloe', 'Petit', address='5 rue Lothaire Strasbourg 67200 France')
+
+    def test_parse_address(self):
+        """Rue, code postal, ville, département, région et pays sont extraits de l'adresse."""
+        logger.info("Test de la décomposition des adresses")
+        self.assertEqual(parse_address('1 rue Balay, 42000 Saint-Étienne, France'), {
+            'street': '1 rue Balay', 'postcode': '42000', 'city': 'Saint-Étienne',
+            'department': '42', 'region': '84', 'country_iso2': 'FR',
+        })
+        self.assertEqual(parse_address('5 rue Lothaire Strasbourg 67200')['street'], '5 rue Lothaire')
+        self.assertEqual(parse_address('')['city'], '')
+        self.assertEqual(
+            [department_of(code) for code in ('75002', '20090', '20200', '97400', '1000')],
+            ['75', '2A', '2B', '974', ''],
+        )
+
+    def test_columns_filled_at_write_time(self):
+        """Les colonnes suivent l'adresse et sont reconstruites par la commande de rattrapage."""
+        logger.info("Test de l'écriture des colonnes")
+        location = self.bob.location
+        self.assertEqual((location.city, location.country_iso2, location.department), ('Genève', 'CH', ''))
+        location.full_address = '1 promenade des Anglais, 06000 Nice'
+        location.save(update_fields=['full_address'])
+        location.refresh_from_db()
+        self.assertEqual((location.city, location.postcode, location.country_iso2), ('Nice', '06000', 'FR'))
+
+        Location.objects.update(city='', country_iso2='')
+        call_command('backfill_location_addresses', verbosity=0)
+        self.assertEqual(Location.objects.get(pk=self.alice.location.pk).city, 'Saint-Étienne')
+
+    def test_backfill_updates_map_areas(self):
+        """Les commandes de rattrapage recopient le département et la région dans les points de la carte."""
+        logger.info("Test des agrégats de la carte après rattrapage")
+        for creator, (lat, lng) in ((self.alice, (45.43, 4.39)), (self.chloe, (48.58, 7.75))):
+            Location.objects.filter(pk=creator.location.pk).update(latitude=lat, longitude=lng)
+        call_command('rebuild_map_points', verbosity=0)
+        # Colonnes vides, comme après la migration qui les a recopiées avant le rattrapage
+        Location.objects.update(department='', region='')
+        MapPoint.objects.update(department='', region='')
+        self.assertEqual(area_counts('department'), [])
+
+        call_command('backfill_location_addresses', verbosity=0)
+        self.assertEqual([(area['code'], area['count']) for area in area_counts('department')], [('42', 1), ('67', 1)])
+
+        Location.objects.filter(pk=self.chloe.location.pk).update(full_address='Place Kléber, 67482 Strasbourg')
+        MapPoint.objects.update(department='', region='')
+        call_command('renormalize_addresses', batch_size=1, verbosity=0)
+        self.assertEqual([(area['code'], area['count']) for area in area_counts('region')], [('44', 1)])
+
+    def test_exact_filters(self):
+        """Filtres par pays (code ou nom) et par ville (sans accents) sur les colonnes."""
+        logger.info("Test des filtres exacts")
+        self.assertEqual(set(CreatorQuery(country='FR').queryset()), {self.alice, self.chloe})
+        self.assertEqual(list(CreatorQuery(country='Suisse').queryset()), [self.bob])
+        self.assertEqual(list(CreatorQuery(city='saint etienne').queryset()), [self.alice])
+        self.assertEqual(list(CreatorQuery(country='fr', city='Strasbourg').queryset()), [self.chloe])
+        # Une rue contenant le nom d'une ville ne correspond plus
+        self.assertFalse(CreatorQuery(city='Rue').queryset().exists())
+        self.assertFalse(CreatorQuery(country='Atlantide').queryset().exists())
+
+    def test_department_and_region(self):
+        """Filtres et facettes par département et région, déduits du code postal."""
+        logger.info("Test des départements et régions")
+        self.assertEqual((self.alice.location.department, self.alice.location.region), ('42', '84'))
+        self.assertEqual(self.chloe.location.region, '44')
+        self.assertEqual(list(CreatorQuery(department='42').queryset()), [self.alice])
+        self.assertEqual(list(CreatorQuery(region='44').queryset()), [self.chloe])
+        self.assertFalse(CreatorQuery(department='69').queryset().exists())
+
+        facets = compute_facets()
+        self.assertEqual(facets['departments'], [
+            {'code': '42', 'name': 'Loire', 'count': 1},
+            {'code': '67', 'name': 'Bas-Rhin', 'count': 1},
+        ])
+        self.assertEqual(
+            [(region['name'], region['count']) for region in facets['regions']],
+            [('Auvergne-Rhône-Alpes', 1), ('Grand Est', 1)],
+        )
+
+    def test_normalize_address(self):
+        """Codes postaux administratifs corrigés d'après la localité accolée au code postal."""
+        logger.info("Test de la normalisation des adresses")
+        self.assertEqual(
+            normalize_address('Place Bellecour, 69287 Lyon 2e Arrondissement'),
+            'Place Bellecour, 69002 Lyon 2e Arrondissement',
+        )
+        self.assertEqual(normalize_address('Montpellier, Hérault, 34062, France'), 'Montpellier, Hérault, 34000, France')
+        self.assertEqual(normalize_address('Marseille 10e Arrondissement 13010'), 'Marseille 10e Arrondissement 13010')
+        self.assertEqual(normalize_address('Lillebonne 76170'), 'Lillebonne 76170')
+        self.assertIsNone(normalize_address(None))
+        # Une rue au nom d'une ville ne change pas le code postal de la localité
+        self.assertEqual(normalize_address('5 rue de Lille, 75007 Paris'), '5 rue de Lille, 75007 Paris')
+        self.assertEqual(normalize_address('12 rue de Lyon, 75012 Paris'), '12 rue de Lyon, 75012 Paris')
+        self.assertEqual(
+            normalize_address('Avenue de Toulouse, 34070 Montpellier'), 'Avenue de Toulouse, 34000 Montpellier',
+        )
+        self.assertEqual(normalize_address('12 rue de Lyon 75012 Paris'), '12 rue de Lyon 75012 Paris')
+        self.assertEqual(parse_address('5 rue de Lille, 75007 Paris')['department'], '75')
+        self.assertEqual(
+            normalize_many(['Lyon 69003', 'Nice 06000', 'Lyon 69003']),
+            ['Lyon 69000', 'Nice 06000', 'Lyon 69000'],
+        )
+        call_command('benchmark_normalize_address', count=50, repeat=1, stdout=StringIO())
+
+    def test_renormalize_command(self):
+        """Les adresses enregistrées sans normalisation sont corrigées par lots."""
+        logger.info("Test de la commande de renormalisation")
+        Location.objects.filter(pk=self.chloe.location.pk).update(full_address='Place Kléber, 67482 Strasbourg')
+        call_command('renormalize_addresses', batch_size=1, verbosity=0)
+        location = Location.objects.get(pk=self.chloe.location.pk)
+        self.assertEqual((location.full_address, location.postcode), ('Place Kléber, 67000 Strasbourg', '67000'))
@@ -0,0 +1,88 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.cities import PrefixIndex, _reference_index, city_index, parse_city
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_cities_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestCityIndex(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests de l'index des villes")
+        cache.clear()
+
+    def test_parse_city(self):
+        """La ville est extraite des différents formats d'adresse rencontrés."""
+        logger.info("Test de l'extraction de la ville")
+        self.assertEqual(parse_city('5 rue Lothaire Strasbourg 67200 France'), ('Strasbourg', 'FR'))
+        self.assertEqual(parse_city('77 rue Carnot Maisons Alfort 94700 France'), ('Maisons-Alfort', 'FR'))
+        self.assertEqual(parse_city(
+            '6, Rue de la Barralerie, Centre Historique, Montpellier, Hérault, Occitanie, '
+            'France métropolitaine, 34062, France'
+        ), ('Montpellier', 'FR'))
+        self.assertEqual(parse_city(''), (None, None))
+
+    def test_prefix_index(self):
+        """La recherche par préfixe ignore les accents et peut classer par poids."""
+        logger.info("Test de l'index par préfixe")
+        index = PrefixIndex([('saint etienne', 'Saint-Étienne', 1), ('saint malo', 'Saint-Malo', 5), ('sens', 'Sens', 9)])
+        self.assertEqual(index.search('saint', 10), ['Saint-Étienne', 'Saint-Malo'])
+        self.assertEqual(index.search('s', 2, ranked=True), ['Sens', 'Saint-Malo'])
+        self.assertEqual(index.search('x', 10), [])
+
+    def test_ranking_and_refresh(self):
+        """Les villes des créateurs passent en premier et l'index suit les écritures."""
+        logger.info("Test du classement et du rafraîchissement")
+        make_creator('Alice', 'Martin', address='3 rue Carnot Saint-Malo 35400 France')
+        self.assertEqual(city_index().search('saint', limit=3)[0], 'Saint-Malo')
+        make_creator('Bob', 'Durand', address='1 place Bellecour Saint-Étienne 42000 France')
+        make_creator('Chloé', 'Petit', address='12 rue Victor Hugo Saint Etienne 42000 France')
+        self.assertEqual(city_index().search('SAINT é', limit=3)[0], 'Saint-Étienne')
+        self.assertEqual(city_index().search('saint', limit=3)[:2], ['Saint-Étienne', 'Saint-Malo'])
+
+        # Index à jour: aucune requête SQL
+        index = city_index()
+        with CaptureQueriesContext(connection) as context:
+            index.search('par')
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_api_cities(self):
+        """L'endpoint d'autocomplétion répond (il filtrait sur un champ inexistant)."""
+        logger.info("Test de l'endpoint api_cities")
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        client = Client()
+        client.login(username='consultant@example.com', password='pass')
+        response = client.get(reverse('api_cities'), {'q': 'montpel', 'country': 'fr'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0], 'Montpellier')
+        self.assertEqual(client.get(reverse('api_cities'), {'q': 'montpel', 'country': 'France'}).json()[0], 'Montpellier')
+
+        # Pays inconnu: aucune ville, et aucun index mis en cache pour la valeur reçue
+        _reference_index.cache_clear()
+        for country in ('zz', 'x' * 500):
+            response = client.get(reverse('api_cities'), {'q': 'montpel', 'country': country})
+            self.assertEqual((response.status_code, response.json()), (200, []))
+        self.assertEqual(_reference_index.cache_info().currsize, 0)
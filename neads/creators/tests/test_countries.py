@@ -0,0 +1,75 @@
+import pytest
+import colorlog
+import gzip
+import json
+import logging
+import os
+import shutil
+import tempfile
+from django.test import TestCase, Client
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.countries import build_asset, country_cities, dataset_fingerprint
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_countries_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestCountryCities(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du référentiel pays/villes")
+        self.client = Client()
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client.login(username='consultant@example.com', password='pass')
+
+    def test_build_asset(self):
+        """Le fichier compilé est nommé d'après son empreinte et précompressé."""
+        logger.info("Test de la compilation du fichier statique")
+        static_dir = tempfile.mkdtemp()
+        try:
+            build_asset(static_dir)
+            data_dir = os.path.join(static_dir, 'data')
+            with open(os.path.join(data_dir, 'country_cities.manifest.json')) as f:
+                asset = json.load(f)['file']
+            self.assertIn(dataset_fingerprint(), asset)
+            with gzip.open(os.path.join(static_dir, asset + '.gz')) as f:
+                cities = json.load(f)
+            self.assertEqual(cities['FR'], country_cities('fr'))
+        finally:
+            shutil.rmtree(static_dir)
+
+    def test_country_endpoint_etag(self):
+        """L'endpoint renvoie les villes d'un pays et répond 304 à un ETag identique."""
+        logger.info("Test de l'endpoint des villes d'un pays")
+        url = reverse('api_country_cities', args=['fr'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Paris', response.json()['cities'])
+        self.assertIn('max-age', response['Cache-Control'])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(reverse('api_country_cities', args=['zz'])).status_code, 404)
+
+    def test_gallery_does_not_inline_cities(self):
+        """La galerie n'inclut plus la liste des villes du monde entier."""
+        logger.info("Test de la taille de la page de la galerie")
+        response = self.client.get(reverse('gallery_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(response.content), 500 * 1024)
+        self.assertContains(response, reverse('api_country_cities', args=['XX']))
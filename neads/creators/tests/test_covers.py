@@ -0,0 +1,90 @@
+import pytest
+import colorlog
+import logging
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from neads.creators.models import Creator, Location, Media
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_cover_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(name, size):
+    buffer = BytesIO()
+    Image.new('RGB', size).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+@pytest.mark.django_db
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestCreatorCover(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        logger.info("Initialisation des tests de l'image de couverture")
+        self.creator = Creator.objects.create(
+            first_name='Alice', last_name='Martin', age=30, gender='F',
+            email='alice@example.com', location=Location.objects.create(),
+        )
+
+    def test_cover_follows_media(self):
+        """La couverture suit l'ajout et la suppression des images du portfolio."""
+        logger.info("Test de la couverture issue du portfolio")
+        self.assertEqual(self.creator.cover_url, '')
+        media = Media.objects.create(creator=self.creator, media_type='image', file=image_file('a.png', (40, 30)))
+        self.creator.refresh_from_db()
+        self.assertEqual(self.creator.cover_url, media.file.url)
+        self.assertEqual((self.creator.cover_width, self.creator.cover_height), (40, 30))
+
+        media.delete()
+        self.creator.refresh_from_db()
+        self.assertEqual(self.creator.cover_url, '')
+        self.assertIsNone(self.creator.cover_width)
+
+    def test_featured_image_has_priority(self):
+        """L'image mise en avant prime sur le portfolio; un fichier absent est ignoré."""
+        logger.info("Test de la priorité de l'image mise en avant")
+        Media.objects.create(creator=self.creator, media_type='image', file='creators/absent.jpg')
+        self.creator.refresh_from_db()
+        self.assertEqual(self.creator.cover_url, '')
+
+        self.creator.featured_image = image_file('featured.png', (20, 10))
+        self.creator.save()
+        self.creator.refresh_from_db()
+        self.assertIn('/featured/', self.creator.cover_url)
+        self.assertEqual(self.creator.cover_width, 20)
+
+    def test_backfill_command(self):
+        """La commande de rattrapage recalcule les couvertures écrites sans signaux."""
+        logger.info("Test de la commande backfill_creator_covers")
+        media = Media.objects.create(creator=self.creator, media_type='image', file=image_file('b.png', (8, 8)))
+        Creator.objects.filter(pk=self.creator.pk).update(cover_url='', cover_width=None, cover_height=None)
+        out = StringIO()
+        call_command('backfill_creator_covers', stdout=out)
+        self.creator.refresh_from_db()
+        self.assertEqual(self.creator.cover_url, media.file.url)
+        self.assertIn('1 couvertures mises à jour', out.getvalue())
@@ -0,0 +1,84 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.models import Favorite, Rating
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_etags_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+@pytest.mark.django_db
+class TestCatalogEtags(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des requêtes conditionnelles")
+        cache.clear()
+        self.creator = make_creator('Alice', 'Martin', lat=45.0, lng=5.0)
+        make_creator('Bob', 'Durand', lat=46.0, lng=5.0, gender='M')
+        self.user = User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client = Client()
+        self.client.login(username='consultant@example.com', password='pass')
+
+    def test_not_modified_before_query(self):
+        """Un ETag à jour reçoit une réponse 304 sans requête sur le catalogue."""
+        logger.info("Test de la réponse 304")
+        url = reverse('api_domains')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        tables = ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertNotIn('creators_', tables)
+
+        # Les filtres et le format font partie de la représentation
+        self.assertNotEqual(self.client.get(url, {'gender': 'M'})['ETag'], etag)
+
+    def test_writes_change_etag(self):
+        """Les écritures sur un avis ou un créateur changent l'ETag."""
+        logger.info("Test de l'invalidation de l'ETag")
+        url = reverse('api_facets')
+        etag = self.client.get(url)['ETag']
+        Rating.objects.create(creator=self.creator, user=self.user, rating=4)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_favorites_and_gallery(self):
+        """Le filtre des favoris dépend de l'utilisateur; seule la galerie AJAX a un ETag."""
+        logger.info("Test des ETags de la galerie")
+        url = reverse('gallery_view')
+        self.assertFalse(self.client.get(url).has_header('ETag'))
+
+        params = {'favorites_only': 'on'}
+        etag = self.client.get(url, params, **AJAX)['ETag']
+        Favorite.objects.create(creator=self.creator, user=self.user)
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag, **AJAX)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_creators'], 1)
@@ -0,0 +1,99 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from neads.creators.facets import compute_facets, creator_facets
+from neads.creators.models import Domain
+from neads.creators.query import CreatorQuery
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_facet_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestCreatorFacets(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des facettes")
+        cache.clear()
+        self.video = Domain.objects.create(name='Vidéo')
+        self.photo = Domain.objects.create(name='Photo')
+        self.alice = make_creator(
+            'Alice', 'Martin', domains=[self.video, self.photo],
+            lat=48.85, lng=2.35, age=25, average_rating=4.5,
+        )
+        self.bob = make_creator(
+            'Bob', 'Durand', domains=[self.photo], age=42, gender='M',
+            average_rating=3, can_invoice=True,
+        )
+
+    def test_counts(self):
+        """Toutes les facettes sont calculées en deux requêtes groupées."""
+        logger.info("Test des comptages des facettes")
+        with CaptureQueriesContext(connection) as context:
+            facets = compute_facets()
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(
+            {d['name']: d['count'] for d in facets['domains']},
+            {'Vidéo': 1, 'Photo': 2},
+        )
+        self.assertEqual(facets['gender'], {'M': 1, 'F': 1, 'O': 0})
+        self.assertEqual(facets['min_rating'], {1: 2, 2: 2, 3: 2, 4: 1, 5: 0})
+        self.assertEqual(
+            facets['age'],
+            [{'min': 20, 'max': 29, 'count': 1}, {'min': 40, 'max': 49, 'count': 1}],
+        )
+        self.assertEqual(facets['can_invoice'], 1)
+
+    def test_filtered_and_located(self):
+        """Les comptages reflètent la recherche en cours et la restriction aux créateurs localisés."""
+        logger.info("Test des facettes filtrées")
+        facets = creator_facets(CreatorQuery(gender='M'))
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual({d['name']: d['count'] for d in facets['domains']}, {'Vidéo': 0, 'Photo': 1})
+        self.assertEqual(creator_facets(located=True)['total'], 1)
+
+    def test_selected_dimension_keeps_other_values(self):
+        """Une dimension filtrée est comptée sans son propre critère (sélection multiple)."""
+        logger.info("Test des facettes à sélection multiple")
+        facets = creator_facets(CreatorQuery(domains=[self.video]))
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual({d['name']: d['count'] for d in facets['domains']}, {'Vidéo': 1, 'Photo': 2})
+        self.assertEqual(facets['gender'], {'M': 0, 'F': 1, 'O': 0})
+
+        facets = creator_facets(CreatorQuery(domains=[self.video], gender='M'))
+        self.assertEqual(facets['total'], 0)
+        self.assertEqual({d['name']: d['count'] for d in facets['domains']}, {'Vidéo': 0, 'Photo': 1})
+        self.assertEqual(facets['gender'], {'M': 0, 'F': 1, 'O': 0})
+
+    def test_cache_invalidated_by_writes(self):
+        """Les facettes sont servies depuis le cache jusqu'à la prochaine écriture."""
+        logger.info("Test de l'invalidation du cache des facettes")
+        self.assertEqual(creator_facets()['total'], 2)
+        with CaptureQueriesContext(connection) as context:
+            creator_facets()
+        self.assertEqual(len(context.captured_queries), 0)
+
+        self.bob.domains.remove(self.photo)
+        photo = next(d for d in creator_facets()['domains'] if d['name'] == 'Photo')
+        self.assertEqual(photo['count'], 1)
+        make_creator('Chloé', 'Petit')
+        self.assertEqual(creator_facets()['total'], 3)
@@ -0,0 +1,64 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.test import TestCase
+from neads.creators.gazetteer import country_position, resolve
+from neads.creators.geocoding import geocode
+from neads.creators.models import GeocodeCache
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_gazetteer_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+def no_provider(query, countrycodes=None):
+    raise AssertionError(f"Requête inattendue au fournisseur: {query}")
+
+
+@pytest.mark.django_db
+class TestGazetteer(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du gazetteer")
+        cache.clear()
+
+    def test_city_level_queries(self):
+        """Ville, code postal et pays sont résolus localement; une adresse à la rue ne l'est pas."""
+        logger.info("Test de la résolution des villes")
+        self.assertEqual(resolve('Strasbourg, 67000, France'), (48.58392, 7.74553))
+        self.assertEqual(resolve('saint etienne 42000'), resolve('Saint-Étienne'))
+        self.assertIsNotNone(resolve('Genève, Suisse'))
+        self.assertIsNone(resolve('Genève, Suisse', countrycodes='fr'))
+        self.assertIsNone(resolve('5 rue Lothaire, Strasbourg'))
+        self.assertEqual(resolve('5 rue Lothaire, Strasbourg', city_level_only=False), (48.58392, 7.74553))
+        self.assertIsNone(resolve('Nulle part'))
+        self.assertEqual(country_position('Allemagne'), country_position('Germany'))
+
+        # Résolu sans fournisseur ni entrée de cache
+        self.assertEqual(geocode('Lyon, 69002, France', provider=no_provider), resolve('Lyon'))
+        self.assertFalse(GeocodeCache.objects.exists())
+
+    def test_postcodes_from_our_data(self):
+        """Les codes postaux de nos adresses départagent les homonymes et se résolvent seuls."""
+        logger.info("Test des codes postaux")
+        self.assertIsNone(resolve('Saint-Sauveur'))
+        make_creator('Alice', 'Martin', address='2 rue du Moulin, 70300 Saint-Sauveur', lat=47.80, lng=6.39)
+        make_creator('Bob', 'Durand', address='8 rue du Moulin, 70300 Saint-Sauveur', lat=47.82, lng=6.37)
+        self.assertEqual(resolve('Saint-Sauveur 70300'), (47.8053, 6.38583))
+        position = resolve('70300, France')
+        self.assertAlmostEqual(position[0], 47.81)
+        self.assertAlmostEqual(position[1], 6.38)
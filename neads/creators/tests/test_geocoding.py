@@ -0,0 +1,191 @@
+import pytest
+import colorlog
+import logging
+from datetime import timedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from neads.creators.forms import LocationForm
+from neads.creators.geocoding import (
+    claim_pending, geocode, geocode_stats, normalize_query, process_pending, purge_expired, store_position,
+)
+from neads.creators.cache import data_version
+from neads.creators.models import Creator, GeocodeCache, Location
+from neads.creators.nearest import nearest
+from neads.creators.spatial import bbox_q
+from neads.creators.tests.geocoder_stub import StubGeocoder
+from neads.creators.tests.test_query import make_creator
+from neads.map.models import MapPoint
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_geocoding_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+class FakeProvider:
+    """Fournisseur de test: positions connues, compte ses appels."""
+    __name__ = 'fake'
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.calls = []
+
+    def __call__(self, query, countrycodes=None):
+        self.calls.append(query)
+        return self.positions.get(query)
+
+
+@pytest.mark.django_db
+class TestGeocodeCache(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du cache de géocodage")
+        self.provider = FakeProvider({'1 rue Balay, Saint-Étienne': (45.4397, 4.3872)})
+
+    def test_normalized_key_and_hits(self):
+        """Les variantes d'une adresse partagent une entrée; les relectures ne sortent pas."""
+        logger.info("Test des lectures en cache")
+        self.assertEqual(normalize_query('1 rue Balay, Saint-Étienne'), normalize_query(' 1 RUE BALAY saint etienne '))
+        # Requête longue: tronquée, mais pays et fin de requête distinguent les clés
+        long_query = 'rue ' * 100
+        self.assertLessEqual(len(normalize_query(long_query, 'fr')), 255)
+        self.assertTrue(normalize_query(long_query, 'fr').endswith('|fr'))
+        self.assertNotEqual(normalize_query(long_query, 'fr'), normalize_query(long_query, 'be'))
+        self.assertNotEqual(normalize_query(long_query + 'a'), normalize_query(long_query + 'b'))
+        self.assertEqual(geocode('1 rue Balay, Saint-Étienne', provider=self.provider), (45.4397, 4.3872))
+        self.assertEqual(geocode('1 RUE BALAY SAINT ETIENNE', provider=self.provider), (45.4397, 4.3872))
+        self.assertEqual(len(self.provider.calls), 1)
+
+        entry = GeocodeCache.objects.get()
+        self.assertEqual((entry.provider, entry.hits, entry.misses), ('fake', 1, 1))
+        stats = geocode_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_rate']), (1, 1, 0.5))
+
+    def test_negative_cache_and_expiry(self):
+        """Une adresse introuvable est conservée moins longtemps, puis redemandée."""
+        logger.info("Test du cache négatif")
+        self.assertIsNone(geocode('Nulle part', provider=self.provider))
+        self.assertIsNone(geocode('nulle part', provider=self.provider))
+        self.assertEqual(len(self.provider.calls), 1)
+        entry = GeocodeCache.objects.get()
+        self.assertTrue(entry.is_negative)
+        self.assertLess(entry.expires_at, timezone.now() + timedelta(days=2))
+
+        GeocodeCache.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.provider.positions['Nulle part'] = (1.0, 2.0)
+        self.assertEqual(geocode('Nulle part', provider=self.provider), (1.0, 2.0))
+        self.assertEqual(GeocodeCache.objects.get().misses, 2)
+
+        GeocodeCache.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(purge_expired(), 1)
+        call_command('geocode_cache', '--purge', verbosity=0)
+
+    def test_provider_errors_not_cached(self):
+        """Une erreur du fournisseur est propagée sans être conservée."""
+        logger.info("Test des erreurs du fournisseur")
+
+        def failing(query, countrycodes=None):
+            raise ConnectionError("indisponible")
+
+        with self.assertRaises(ConnectionError):
+            geocode('3 place Bellecour, Lyon', provider=failing)
+        self.assertFalse(GeocodeCache.objects.exists())
+
+    def test_location_form_uses_cache(self):
+        """Le formulaire de localisation lit le cache partagé (aucune requête réseau)."""
+        logger.info("Test du formulaire de localisation")
+        store_position('12 rue de la Paix, 75002 Paris', (48.8686, 2.3314), 'nominatim', countrycodes='fr')
+        form = LocationForm(data={'full_address': '12 rue de la Paix, 75002 Paris'})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual((form.cleaned_data['latitude'], form.cleaned_data['longitude']), (48.8686, 2.3314))
+        self.assertEqual(GeocodeCache.objects.get().hits, 1)
+
+    def test_location_form_queues_unknown_address(self):
+        """Une adresse inconnue du cache est enregistrée en attente, sans requête."""
+        logger.info("Test de la mise en file d'attente")
+        form = LocationForm(data={'full_address': '3 place Bellecour, Lyon'})
+        self.assertTrue(form.is_valid(), form.errors)
+        location = form.save()
+        self.assertEqual(location.geocoding_status, Location.GEOCODING_PENDING)
+        self.assertIsNone(location.latitude)
+        self.assertFalse(GeocodeCache.objects.exists())
+
+
+@pytest.mark.django_db
+@override_settings(NOMINATIM_MIN_INTERVAL=0)
+class TestGeocodingQueue(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests de la file de géocodage")
+        self.stub = StubGeocoder({'3 place Bellecour, Lyon': (45.7578, 4.832), '12 rue de la Paix, Paris': (48.8686, 2.3314)}).start()
+        self.addCleanup(self.stub.stop)
+        settings_override = override_settings(NOMINATIM_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_batch_deduplicates_and_updates_map(self):
+        """Les adresses identiques d'un lot ne sont demandées qu'une fois; la carte suit."""
+        logger.info("Test du traitement par lot")
+        alice = make_creator('Alice', 'Martin', address='3 place Bellecour, Lyon')
+        make_creator('Bob', 'Durand', address='3 place Bellecour, Lyon')
+        make_creator('Chloe', 'Petit', address='Nulle part')
+        self.assertFalse(MapPoint.objects.exists())
+
+        self.assertEqual(nearest(45.75, 4.83, k=5), [])
+
+        # Une seule incrémentation de la version des données pour tout le lot
+        version = data_version()
+        self.assertEqual(process_pending(), {'done': 2, 'failed': 1, 'retry': 0})
+        self.assertEqual(data_version(), version + 1)
+        self.assertEqual(self.stub.queries, ['3 place Bellecour, Lyon', 'Nulle part'])
+        alice.location.refresh_from_db()
+        self.assertEqual(alice.location.geocoding_status, Location.GEOCODING_DONE)
+        self.assertEqual((alice.location.latitude, alice.location.longitude), (45.7578, 4.832))
+        self.assertEqual(MapPoint.objects.count(), 2)
+        self.assertEqual(Location.objects.filter(geocoding_status=Location.GEOCODING_FAILED).count(), 1)
+        # Index spatial et plus proches créateurs à jour
+        lyon = {alice.pk, Creator.objects.get(first_name='Bob').pk}
+        self.assertEqual({pk for pk, _ in nearest(45.75, 4.83, k=5)}, lyon)
+        self.assertEqual(set(Creator.objects.filter(bbox_q((4.8, 45.7, 4.9, 45.8))).values_list('pk', flat=True)), lyon)
+        self.assertEqual(process_pending(), {'done': 0, 'failed': 0, 'retry': 0})
+
+    def test_retry_after_provider_error(self):
+        """Une erreur du fournisseur reporte la localisation, reprise à l'échéance."""
+        logger.info("Test des nouvelles tentatives")
+        location = make_creator('Alice', 'Martin', address='12 rue de la Paix, Paris').location
+        make_creator('Bob', 'Durand', address='12 rue de la Paix, Paris')
+        self.stub.failures = 1
+        # Une seule requête pour la même adresse, même en erreur
+        self.assertEqual(process_pending(), {'done': 0, 'failed': 0, 'retry': 2})
+        self.assertEqual(len(self.stub.queries), 1)
+        location.refresh_from_db()
+        self.assertEqual((location.geocoding_status, location.geocoding_attempts), (Location.GEOCODING_PENDING, 1))
+        self.assertGreater(location.geocoding_next_attempt, timezone.now())
+
+        # Pas encore dû
+        self.assertEqual(process_pending(), {'done': 0, 'failed': 0, 'retry': 0})
+        Location.objects.update(geocoding_next_attempt=timezone.now() - timedelta(seconds=1))
+        call_command('process_geocoding_queue', verbosity=0)
+        location.refresh_from_db()
+        self.assertEqual(location.geocoding_status, Location.GEOCODING_DONE)
+        self.assertEqual(self.stub.queries, ['12 rue de la Paix, Paris'] * 2)
+
+    def test_claimed_rows_not_shared(self):
+        """Un lot réservé par un worker n'est pas repris par un autre."""
+        logger.info("Test de la réservation des lots")
+        make_creator('Alice', 'Martin', address='3 place Bellecour, Lyon')
+        self.assertEqual(len(claim_pending()), 1)
+        self.assertEqual(claim_pending(), [])
+        self.assertEqual(process_pending(), {'done': 0, 'failed': 0, 'retry': 0})
+        self.assertEqual(self.stub.queries, [])
@@ -1,11 +1,13 @@
 import pytest
 import colorlog
 import logging
+from io import StringIO
+from django.core.management import call_command
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.db.utils import IntegrityError
 from neads.creators.tests.factories import (
-    CreatorFactory, DomainFactory, ContentTypeFactory, LocationFactory,
+    CreatorFactory, DomainFactory, LocationFactory,
     MediaFactory, RatingFactory, FavoriteFactory, UserFactory
 )
 from neads.creators.models import Creator, Media, Rating
@@ -33,12 +35,10 @@ class TestCreatorModel(TestCase):
     def setUp(self):
         logger.info("Initialisation des tests du modèle Creator")
         self.domain = DomainFactory()
-        self.content_type = ContentTypeFactory()
         self.location = LocationFactory()
         self.creator = CreatorFactory(
             location=self.location,
             domains=[self.domain],
-            content_types=[self.content_type]
         )
 
     def test_creator_creation(self):
@@ -48,7 +48,6 @@ class TestCreatorModel(TestCase):
         self.assertEqual(self.creator.full_name, f"{self.creator.first_name} {self.creator.last_name}")
         self.assertEqual(self.creator.location, self.location)
         self.assertIn(self.domain, self.creator.domains.all())
-        self.assertIn(self.content_type, self.creator.content_types.all())
 
     def test_age_validation(self):
         """Test la validation de l'âge (entre 13 et 100)."""
@@ -56,18 +55,18 @@ class TestCreatorModel(TestCase):
         
         # Âge trop bas (< 13)
         with self.assertRaises(ValidationError):
-            creator = CreatorFactory.build(age=10)
+            creator = CreatorFactory.build(age=10, location=self.location)
             creator.full_clean()
         
         # Âge trop élevé (> 100)
         with self.assertRaises(ValidationError):
-            creator = CreatorFactory.build(age=101)
+            creator = CreatorFactory.build(age=101, location=self.location)
             creator.full_clean()
         
         # Âges valides
-        creator_min = CreatorFactory.build(age=13)
-        creator_max = CreatorFactory.build(age=100)
-        creator_mid = CreatorFactory.build(age=30)
+        creator_min = CreatorFactory.build(age=13, location=self.location)
+        creator_max = CreatorFactory.build(age=100, location=self.location)
+        creator_mid = CreatorFactory.build(age=30, location=self.location)
         
         creator_min.full_clean()  # Ne devrait pas générer d'erreur
         creator_max.full_clean()  # Ne devrait pas générer d'erreur
@@ -213,6 +212,33 @@ class TestRatingModel(TestCase):
         self.assertNotEqual(creator_updated.average_rating, initial_avg)
         self.assertEqual(creator_updated.total_ratings, initial_count + 1)
 
+    def test_rating_edit_and_delete_match_repair(self):
+        """Les agrégats incrémentaux (modification, suppression) sont ceux recalculés par verify_ratings --repair."""
+        logger.info("Test des agrégats après modification et suppression d'avis")
+        rating = RatingFactory(creator=self.creator, user=self.user, rating=2)
+        RatingFactory(creator=self.creator, rating=5)
+        deleted = RatingFactory(creator=self.creator, rating=1)
+        rating.rating = 4
+        rating.save()
+        deleted.delete()
+
+        incremental = Creator.objects.values_list('rating_sum', 'total_ratings', 'average_rating').get(pk=self.creator.pk)
+        self.assertEqual(incremental[:2], (9, 2))
+        self.assertEqual(float(incremental[2]), 4.5)
+
+        # Aucun écart: la réparation ne change rien
+        output = StringIO()
+        call_command('verify_ratings', '--repair', stdout=output)
+        self.assertIn("Aucun écart", output.getvalue())
+
+        # Après une dérive, la réparation retrouve les valeurs incrémentales
+        Creator.objects.filter(pk=self.creator.pk).update(rating_sum=0, total_ratings=7, average_rating=1)
+        call_command('verify_ratings', '--repair', stdout=StringIO())
+        self.assertEqual(
+            Creator.objects.values_list('rating_sum', 'total_ratings', 'average_rating').get(pk=self.creator.pk),
+            incremental,
+        )
+
     def test_unique_rating_per_user(self):
         """Test qu'un utilisateur ne peut pas évaluer deux fois le même créateur."""
         logger.info("Test d'unicité des évaluations par utilisateur")
@@ -0,0 +1,109 @@
+import pytest
+import colorlog
+import logging
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.nearest import KDTree, haversine_many, nearest, nearest_index, to_vectors
+from neads.creators.models import Rating
+from neads.creators.query import CreatorQuery
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_nearest_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+class TestKDTree(TestCase):
+    def test_matches_brute_force(self):
+        """Les k plus proches de l'arbre sont ceux d'un calcul exhaustif."""
+        logger.info("Test de l'arbre k-d")
+        rng = np.random.default_rng(42)
+        latitudes = rng.uniform(-60, 70, 2000)
+        longitudes = rng.uniform(-180, 180, 2000)
+        tree = KDTree(to_vectors(latitudes, longitudes), leaf_size=16)
+        mask = rng.random(2000) < 0.3
+        for latitude, longitude in [(48.85, 2.35), (-33.9, 151.2), (0, 179.9)]:
+            distances = haversine_many(latitude, longitude, latitudes, longitudes)
+            positions, _ = tree.query(to_vectors([latitude], [longitude])[0], 5)
+            self.assertEqual(positions.tolist(), np.argsort(distances)[:5].tolist())
+
+            positions, _ = tree.query(to_vectors([latitude], [longitude])[0], 5, mask)
+            expected = [i for i in np.argsort(distances) if mask[i]][:5]
+            self.assertEqual(positions.tolist(), expected)
+
+
+@pytest.mark.django_db
+class TestNearest(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des plus proches créateurs")
+        cache.clear()
+        self.paris = make_creator('Paris', 'Nom', lat=48.8566, lng=2.3522)
+        self.versailles = make_creator('Versailles', 'Nom', lat=48.8049, lng=2.1204, gender='M')
+        self.lyon = make_creator('Lyon', 'Nom', lat=45.7640, lng=4.8357, gender='M')
+        make_creator('Sans', 'Coordonnées')
+        self.user = User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client = Client()
+        self.client.login(username='consultant@example.com', password='pass')
+
+    def test_nearest_with_filters(self):
+        """Les plus proches créateurs, filtres de recherche appliqués, distances en km."""
+        logger.info("Test de nearest()")
+        results = nearest(48.86, 2.35, k=2)
+        self.assertEqual([pk for pk, _ in results], [self.paris.id, self.versailles.id])
+        self.assertAlmostEqual(results[0][1], float(haversine_many(48.86, 2.35, [48.8566], [2.3522])[0]), 3)
+
+        results = nearest(48.86, 2.35, k=5, filters=CreatorQuery(gender='M'))
+        self.assertEqual([pk for pk, _ in results], [self.versailles.id, self.lyon.id])
+
+    def test_index_follows_positions(self):
+        """L'arbre est conservé si les positions ne changent pas, reconstruit sinon."""
+        logger.info("Test de la mise à jour de l'index")
+        index = nearest_index()
+        self.paris.bio = 'Nouvelle bio'
+        self.paris.save()
+        self.assertIs(nearest_index().tree, index.tree)
+
+        # Un avis ou une modification sans localisation ne relit pas les positions
+        self.paris.bio = 'Autre bio'
+        self.paris.save(update_fields=['bio'])
+        Rating.objects.create(creator=self.paris, user=self.user, rating=4)
+        with self.assertNumQueries(0):
+            self.assertIs(nearest_index(), index)
+
+        location = self.lyon.location
+        location.latitude, location.longitude = 48.86, 2.35
+        location.save()
+        self.assertEqual(nearest(48.86, 2.35, k=1)[0][0], self.lyon.id)
+
+    def test_api_nearest(self):
+        """L'endpoint retourne les k plus proches créateurs avec leur distance."""
+        logger.info("Test de l'endpoint api_nearest")
+        data = self.client.get(reverse('api_nearest'), {'lat': 45.75, 'lng': 4.85, 'k': 2}).json()
+        self.assertEqual([c['id'] for c in data['creators']], [self.lyon.id, self.paris.id])
+        self.assertLess(data['creators'][0]['distance'], 5)
+        self.assertEqual(self.client.get(reverse('api_nearest'), {'lat': 'x'}).status_code, 400)
+        for params in (
+            {'lat': 'nan', 'lng': 4.85},
+            {'lat': 45.75, 'lng': 'inf'},
+            {'lat': 91, 'lng': 4.85},
+            {'lat': 45.75, 'lng': -181},
+            {'lat': 45.75, 'lng': 4.85, 'k': 0},
+            {'lat': 45.75, 'lng': 4.85, 'k': 101},
+        ):
+            self.assertEqual(self.client.get(reverse('api_nearest'), params).status_code, 400)
@@ -0,0 +1,105 @@
+import pytest
+import colorlog
+import logging
+from django.http import QueryDict
+from django.test import TestCase
+from neads.core.models import User
+from neads.creators.forms import CreatorSearchForm
+from neads.creators.models import Creator, Domain, Favorite, Location
+from neads.creators.query import CreatorQuery, located_creators
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_query_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+def make_creator(first_name, last_name, domains=(), address=None, lat=None, lng=None, **kwargs):
+    location = Location.objects.create(full_address=address, latitude=lat, longitude=lng)
+    fields = {'age': 30, 'gender': 'F', 'email': f'{first_name.lower()}@example.com'}
+    fields.update(kwargs)
+    creator = Creator.objects.create(
+        first_name=first_name, last_name=last_name, location=location, **fields
+    )
+    creator.domains.set(domains)
+    return creator
+
+
+@pytest.mark.django_db
+class TestCreatorQuery(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du moteur de filtrage")
+        self.video = Domain.objects.create(name='Vidéo')
+        self.photo = Domain.objects.create(name='Photo')
+        self.alice = make_creator(
+            'Alice', 'Martin', domains=[self.video, self.photo],
+            address='Paris, France', lat=48.85, lng=2.35, age=25, average_rating=4.5,
+        )
+        self.bob = make_creator(
+            'Bob', 'Durand', domains=[self.photo],
+            address='Lyon, France', age=40, gender='M', average_rating=3, can_invoice=True,
+        )
+        self.user = User.objects.create_user(email='consultant@example.com', password='x', role='consultant')
+
+    def test_spec_is_canonical(self):
+        """Deux formulations équivalentes produisent la même spécification et la même clé."""
+        logger.info("Test de la normalisation de la spécification")
+        first = CreatorQuery(domains=[self.photo, self.video], query='  alice  ', can_invoice=False)
+        second = CreatorQuery(domains=[self.video.id, self.photo.id], query='alice')
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first.cache_key(), second.cache_key())
+        self.assertNotEqual(first.cache_key(), CreatorQuery(query='bob').cache_key())
+
+    def test_domains_use_exists_without_duplicates(self):
+        """Un créateur dans plusieurs domaines demandés n'apparaît qu'une fois."""
+        logger.info("Test du filtre par domaines")
+        creators = CreatorQuery(domains=[self.video, self.photo]).queryset()
+        self.assertEqual(list(creators), [self.alice, self.bob])
+        self.assertNotIn('DISTINCT', str(creators.query))
+
+    def test_filters(self):
+        """Les filtres d'âge, de genre, de note, de facturation et de lieu s'appliquent."""
+        logger.info("Test des filtres simples")
+        self.assertEqual(list(CreatorQuery(min_age=30).queryset()), [self.bob])
+        self.assertEqual(list(CreatorQuery(gender='F').queryset()), [self.alice])
+        self.assertEqual(list(CreatorQuery(min_rating=4).queryset()), [self.alice])
+        self.assertEqual(list(CreatorQuery(can_invoice=True).queryset()), [self.bob])
+        self.assertEqual(list(CreatorQuery(city='lyon').queryset()), [self.bob])
+        self.assertEqual(list(CreatorQuery(query='martin').queryset()), [self.alice])
+
+    def test_favorites_only(self):
+        """Le filtre des favoris dépend de l'utilisateur mais pas de la clé de cache."""
+        logger.info("Test du filtre des favoris")
+        Favorite.objects.create(creator=self.bob, user=self.user)
+        creator_query = CreatorQuery(favorites_only=True)
+        self.assertEqual(list(creator_query.queryset(user=self.user)), [self.bob])
+
+    def test_from_request_params(self):
+        """Les domaines séparés par des virgules sont acceptés et le formulaire valide les valeurs."""
+        logger.info("Test de la construction depuis les paramètres GET")
+        params = QueryDict(f'domains={self.video.id},{self.photo.id}&can_invoice=on')
+        creator_query = CreatorQuery.from_form(CreatorSearchForm(CreatorQuery.normalize_params(params)))
+        self.assertEqual(creator_query.get('domains'), tuple(sorted([self.video.id, self.photo.id])))
+        self.assertEqual(list(creator_query.queryset(base=located_creators())), [])
+        self.assertEqual(list(creator_query.queryset()), [self.bob])
+
+    def test_invalid_param_ignored_alone(self):
+        """Un paramètre invalide est ignoré sans supprimer les autres filtres."""
+        logger.info("Test d'un paramètre invalide")
+        params = QueryDict('gender=F&department=975&min_rating=9&city=Paris')
+        creator_query = CreatorQuery.from_form(CreatorSearchForm(CreatorQuery.normalize_params(params)))
+        self.assertEqual(dict(creator_query.spec), {'gender': 'F', 'city': 'Paris'})
+        self.assertEqual(list(creator_query.queryset()), [self.alice])
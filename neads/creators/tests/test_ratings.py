@@ -0,0 +1,86 @@
+import pytest
+import colorlog
+import logging
+from io import StringIO
+from decimal import Decimal
+from django.core.management import call_command
+from django.test import TestCase
+from neads.core.models import User
+from neads.creators.models import Creator, Rating
+from neads.creators.ratings import rating_drift
+from neads.creators.tests.test_query import make_creator
+from neads.map.models import MapPoint
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_ratings_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestRatingAggregates(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des agrégats de notation")
+        self.creator = make_creator('Alice', 'Martin', lat=45.0, lng=5.0)
+        self.users = [
+            User.objects.create_user(email=f'consultant{i}@example.com', password='pass', role='consultant')
+            for i in range(3)
+        ]
+
+    def aggregates(self):
+        creator = Creator.objects.get(pk=self.creator.pk)
+        return creator.rating_sum, creator.total_ratings, creator.average_rating
+
+    def test_incremental_updates(self):
+        """Ajout, modification et suppression d'avis mettent à jour les agrégats sans les relire."""
+        logger.info("Test des agrégats incrémentaux")
+        first = Rating.objects.create(creator=self.creator, user=self.users[0], rating=5)
+        Rating.objects.create(creator=self.creator, user=self.users[1], rating=4)
+        Rating.objects.create(creator=self.creator, user=self.users[2], rating=2)
+        self.assertEqual(self.aggregates(), (11, 3, Decimal('3.67')))
+
+        # Modification: la note précédente est retirée de la somme
+        first.rating = 3
+        first.save()
+        self.assertEqual(self.aggregates(), (9, 3, Decimal('3.00')))
+
+        first.delete()
+        self.assertEqual(self.aggregates(), (6, 2, Decimal('3.00')))
+        Rating.objects.filter(creator=self.creator).delete()
+        self.assertEqual(self.aggregates(), (0, 0, Decimal('0.00')))
+
+        # La note du point de la carte suit la moyenne
+        Rating.objects.create(creator=self.creator, user=self.users[0], rating=4)
+        self.assertEqual(MapPoint.objects.get(creator=self.creator).rating, 4.0)
+        self.assertEqual(rating_drift(), [])
+
+    def test_verify_command(self):
+        """Les écarts sont signalés par la commande et corrigés avec --fix."""
+        logger.info("Test de la commande de vérification")
+        Rating.objects.create(creator=self.creator, user=self.users[0], rating=5)
+        # update() contourne Rating.save: les agrégats dérivent
+        Rating.objects.update(rating=1)
+        drifts = rating_drift()
+        self.assertEqual([(drift.creator_id, drift.expected_sum) for drift in drifts], [(self.creator.pk, 1)])
+
+        out = StringIO()
+        call_command('verify_ratings', stdout=out)
+        self.assertIn(f"Créateur #{self.creator.pk}", out.getvalue())
+        self.assertEqual(self.aggregates(), (5, 1, Decimal('5.00')))
+
+        call_command('verify_ratings', '--fix', stdout=StringIO())
+        self.assertEqual(self.aggregates(), (1, 1, Decimal('1.00')))
+        self.assertEqual(MapPoint.objects.get(creator=self.creator).rating, 1.0)
+        self.assertEqual(rating_drift(), [])
@@ -0,0 +1,82 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from neads.core.models import User
+from neads.creators.models import Creator, Favorite
+from neads.creators.query import CreatorQuery
+from neads.creators.results import CreatorResults
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_results_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestCreatorResults(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du cache de résultats")
+        cache.clear()
+        self.creators = [
+            make_creator(f'Prénom{i}', 'Nom', lat=45.0, lng=5.0, average_rating=i % 5)
+            for i in range(6)
+        ]
+        self.alice = User.objects.create_user(email='alice@example.com', password='x', role='consultant')
+        self.bob = User.objects.create_user(email='bob@example.com', password='x', role='consultant')
+
+    def test_shared_between_users(self):
+        """Une même recherche n'est calculée qu'une fois pour tous les utilisateurs."""
+        logger.info("Test du partage des résultats")
+        creator_query = CreatorQuery(gender='F')
+        expected = list(creator_query.queryset().values_list('pk', flat=True))
+        self.assertEqual(CreatorResults(creator_query, user=self.alice).ids, expected)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(CreatorResults(creator_query, user=self.bob).ids, expected)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_paginator_fetches_page_only(self):
+        """Le Paginator ne lit en base que les créateurs de la page, dans l'ordre."""
+        logger.info("Test de la pagination des résultats")
+        results = CreatorResults(CreatorQuery(), prepare=None)
+        page = Paginator(results, 4).get_page(2)
+        expected = list(Creator.objects.order_by(*CreatorQuery.ORDERING))[4:]
+        self.assertEqual(list(page.object_list), expected)
+        self.assertEqual(page.paginator.count, 6)
+
+    def test_favorites_overlay(self):
+        """Le filtre des favoris est appliqué en mémoire et suit les modifications."""
+        logger.info("Test du filtre des favoris en mémoire")
+        creator_query = CreatorQuery(favorites_only=True)
+        Favorite.objects.create(user=self.alice, creator=self.creators[0])
+        self.assertEqual(CreatorResults(creator_query, user=self.alice).ids, [self.creators[0].pk])
+        self.assertEqual(CreatorResults(creator_query, user=self.bob).ids, [])
+
+        Favorite.objects.create(user=self.bob, creator=self.creators[1])
+        self.assertEqual(CreatorResults(creator_query, user=self.bob).ids, [self.creators[1].pk])
+
+    def test_invalidated_by_writes(self):
+        """Une écriture sur le catalogue invalide les résultats en cache."""
+        logger.info("Test de l'invalidation des résultats")
+        creator_query = CreatorQuery(min_rating=4)
+        self.assertEqual(len(CreatorResults(creator_query)), 1)
+        make_creator('Zoé', 'Nom', average_rating=5)
+        self.assertEqual(len(CreatorResults(creator_query)), 2)
+        self.assertEqual(len(CreatorResults(creator_query, located=True)), 1)
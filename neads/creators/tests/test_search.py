@@ -0,0 +1,73 @@
+import pytest
+import colorlog
+import logging
+from django.test import TestCase
+from neads.creators.models import Creator
+from neads.creators.query import CreatorQuery
+from neads.creators.search import fold, tokenize
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_search_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+def make_creator(first_name, last_name, **kwargs):
+    return Creator.objects.create(
+        first_name=first_name, last_name=last_name, age=30, gender='F',
+        email=f'{first_name.lower()}@example.com', **kwargs
+    )
+
+
+def search(text, ranked=False):
+    return list(CreatorQuery(query=text).queryset(ranked=ranked))
+
+
+@pytest.mark.django_db
+class TestCreatorSearchIndex(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests de l'index plein texte")
+        self.helene = make_creator('Hélène', 'Lefèvre', bio="Vidéaste spécialisée en gastronomie")
+        self.marc = make_creator('Marc', 'Dubois', equipment='Sony A7', previous_clients="L'Oréal, Décathlon")
+
+    def test_tokenize(self):
+        """La saisie est normalisée sans accents et sans élisions."""
+        logger.info("Test de la normalisation de la saisie")
+        self.assertEqual(fold('Éléonore'), 'eleonore')
+        self.assertEqual(tokenize("l'Oréal vidéo"), ['oreal', 'video'])
+
+    def test_accent_insensitive_prefix_search(self):
+        """La recherche ignore les accents et accepte les préfixes."""
+        logger.info("Test de la recherche insensible aux accents")
+        self.assertEqual(search('helene'), [self.helene])
+        self.assertEqual(search('LEFEV'), [self.helene])
+        self.assertEqual(search('gastronomie videaste'), [self.helene])
+        self.assertEqual(search('oreal'), [self.marc])
+        self.assertEqual(search('sony'), [self.marc])
+
+    def test_index_follows_save_and_delete(self):
+        """L'index est mis à jour à la sauvegarde et à la suppression."""
+        logger.info("Test de la maintenance incrémentale de l'index")
+        self.marc.bio = 'Photographe culinaire'
+        self.marc.save()
+        self.assertEqual(search('culinaire'), [self.marc])
+        self.marc.delete()
+        self.assertEqual(search('culinaire'), [])
+
+    def test_ranking_prefers_names(self):
+        """Une correspondance sur le nom est classée avant une correspondance dans la bio."""
+        logger.info("Test du classement par pertinence")
+        other = make_creator('Julie', 'Petit', bio='Collabore souvent avec Marc', average_rating=5)
+        self.assertEqual(search('marc', ranked=True), [self.marc, other])
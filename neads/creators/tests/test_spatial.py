@@ -0,0 +1,84 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.models import Creator
+from neads.creators.nearest import haversine_many
+from neads.creators.spatial import bbox_q, radius_bbox
+from neads.creators.tests.test_query import make_creator
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_spatial_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+@pytest.mark.django_db
+class TestSpatialIndex(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests de l'index spatial")
+        cache.clear()
+        self.paris = make_creator('Paris', 'Nom', lat=48.8566, lng=2.3522)
+        self.versailles = make_creator('Versailles', 'Nom', lat=48.8049, lng=2.1204)
+        self.lyon = make_creator('Lyon', 'Nom', lat=45.7640, lng=4.8357, gender='M')
+        self.fiji = make_creator('Suva', 'Nom', lat=-18.1416, lng=178.4419)
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client = Client()
+        self.client.login(username='consultant@example.com', password='pass')
+
+    def test_bbox_candidates(self):
+        """L'index retourne les localisations de l'emprise et suit leurs modifications."""
+        logger.info("Test du préfiltre par emprise")
+        box = radius_bbox(48.8566, 2.3522, 30)
+        self.assertEqual(set(Creator.objects.filter(bbox_q(box))), {self.paris, self.versailles})
+
+        # Emprise traversant l'antiméridien
+        self.assertEqual(list(Creator.objects.filter(bbox_q((170, -25, -170, -10)))), [self.fiji])
+
+        location = self.lyon.location
+        location.latitude, location.longitude = 48.85, 2.35
+        location.save()
+        self.assertIn(self.lyon, Creator.objects.filter(bbox_q(box)))
+        location.delete()
+        self.assertEqual(set(Creator.objects.filter(bbox_q(box))), {self.paris, self.versailles})
+
+    def test_api_map_search(self):
+        """Recherche par rayon et par emprise, distance exacte et tri par distance."""
+        logger.info("Test de api_map_search")
+        url = reverse('api_map_search')
+        data = self.client.get(url, {'lat': 48.8566, 'lng': 2.3522, 'radius': 30}).json()
+        self.assertEqual([c['id'] for c in data['creators']], [self.paris.id, self.versailles.id])
+        self.assertAlmostEqual(
+            data['creators'][1]['distance'], round(float(haversine_many(48.8566, 2.3522, [48.8049], [2.1204])[0]), 1)
+        )
+
+        data = self.client.get(url, {'bbox': '-5,42,8,51'}).json()
+        self.assertEqual(data['total'], 3)
+        data = self.client.get(url, {'bbox': '-5,42,8,51', 'gender': 'M'}).json()
+        self.assertEqual([c['id'] for c in data['creators']], [self.lyon.id])
+
+        self.assertEqual(self.client.get(url, {'lat': 'x'}).status_code, 400)
+        for params in (
+            {'lat': 48.8566, 'lng': 2.3522, 'radius': 0},
+            {'lat': 48.8566, 'lng': 2.3522, 'radius': -5},
+            {'lat': 48.8566, 'lng': 2.3522, 'radius': 'inf'},
+            {'lat': 'nan', 'lng': 2.3522},
+            {'lat': 48.8566, 'lng': 'inf'},
+            {'bbox': '-5,42,nan,51'},
+        ):
+            self.assertEqual(self.client.get(url, params).status_code, 400)
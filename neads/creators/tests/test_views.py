@@ -0,0 +1,130 @@
+import pytest
+import colorlog
+import logging
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.cache import versioned_key
+from neads.creators.models import Creator, Domain, Location, Media
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('creators_view_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def make_creators(count, domains):
+    for i in range(count):
+        location = Location.objects.create(full_address=f'{i} rue de Paris, Paris, France')
+        creator = Creator.objects.create(
+            first_name=f'Prénom{i}', last_name=f'Nom{i}', age=30, gender='F',
+            email=f'creator{i}@example.com', location=location, bio='Vidéaste',
+        )
+        creator.domains.set(domains)
+        for name in ('a.jpg', 'b.jpg'):
+            Media.objects.create(
+                creator=creator, media_type='image',
+                file=SimpleUploadedFile(name, b'image', content_type='image/jpeg'),
+            )
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@pytest.mark.django_db
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestCreatorListQueryBudget(TestCase):
+    # Session, utilisateur, COUNT, page, domaines (la couverture est lue sur le créateur)
+    QUERY_BUDGET = 5
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        logger.info("Initialisation des tests du budget de requêtes")
+        self.client = Client()
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client.login(username='consultant@example.com', password='pass')
+        self.domains = [Domain.objects.create(name='Vidéo'), Domain.objects.create(name='Photo')]
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params, **AJAX)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_gallery_ajax_constant_queries(self):
+        """Le nombre de requêtes de la galerie AJAX ne dépend pas de la taille de la page."""
+        logger.info("Test du budget de requêtes de la galerie")
+        make_creators(2, self.domains)
+        small, _ = self.count_queries(reverse('gallery_view'), {})
+        make_creators(10, self.domains)
+        large, data = self.count_queries(reverse('gallery_view'), {})
+        self.assertEqual(len(data['creators']), 12)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.QUERY_BUDGET)
+        self.assertIn('/images/', data['creators'][0]['thumbnail'])
+        self.assertEqual(len(data['creators'][0]['domains']), 2)
+
+    def test_search_ajax_constant_queries(self):
+        """Le nombre de requêtes de la recherche AJAX ne dépend pas de la taille de la page."""
+        logger.info("Test du budget de requêtes de la recherche")
+        make_creators(2, self.domains)
+        small, _ = self.count_queries(reverse('search_view'), {'query': 'videaste'})
+        make_creators(10, self.domains)
+        large, data = self.count_queries(reverse('search_view'), {'query': 'videaste'})
+        self.assertEqual(len(data['creators']), 12)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.QUERY_BUDGET)
+
+
+@pytest.mark.django_db
+class TestPageContextCache(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du cache de contexte de page")
+        cache.clear()
+        self.client = Client()
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client.login(username='consultant@example.com', password='pass')
+        Domain.objects.create(name='Vidéo')
+
+    def test_ajax_skips_page_context(self):
+        """Les réponses AJAX ne construisent pas le contexte de page."""
+        logger.info("Test du contexte de page ignoré en AJAX")
+        self.client.get(reverse('gallery_view'), **AJAX)
+        self.assertIsNone(cache.get(versioned_key('page:gallery')))
+
+    def test_gallery_context_cached_until_write(self):
+        """Le contexte de la galerie est réutilisé jusqu'à la prochaine écriture sur le catalogue."""
+        logger.info("Test du cache de contexte de la galerie")
+        self.client.get(reverse('gallery_view'))
+        self.assertIsNotNone(cache.get(versioned_key('page:gallery')))
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('gallery_view'))
+        self.assertFalse(any('MIN(' in query['sql'].upper() for query in context.captured_queries))
+
+        Domain.objects.create(name='Photo')
+        response = self.client.get(reverse('gallery_view'))
+        self.assertEqual([d.name for d in response.context['all_domains']], ['Photo', 'Vidéo'])
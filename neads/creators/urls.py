@@ -12,8 +12,11 @@ urlpatterns = [
     path('favorites/', views.favorites_view, name='favorites_view'),
     path('api/creators/', api_creators, name='api_creators'),
     path('api/creators/map-search/', views.api_map_search, name='api_map_search'),
+    path('api/nearest/', views.api_nearest, name='api_nearest'),
     path('api/cities/', views.api_cities, name='api_cities'),
+    path('api/countries/<str:iso2>/cities/', views.api_country_cities, name='api_country_cities'),
     path('api/domains/', views.api_domains, name='api_domains'),
+    path('api/facets/', views.api_facets, name='api_facets'),
     path('ajax-search/', views.ajax_filter_results, name='ajax_search'),
     path('toggle-favorite/<int:creator_id>/', views.toggle_favorite, name='toggle_favorite'),
     path('add-favorite/<int:creator_id>/', views.toggle_favorite, name='add_favorite'),
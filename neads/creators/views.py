@@ -1,9 +1,10 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, HttpResponseForbidden
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_POST
 from django.core.paginator import Paginator
-from django.db.models import Q, Count, Min, Max
+from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.utils import timezone
@@ -14,20 +15,32 @@ from functools import wraps
 from django.template.loader import render_to_string
 
 from neads.core.models import User
+from neads.core.pagination import CursorPaginator, cursor_requested, next_page_query, paginate
+from neads.core.streaming import StreamingJsonResponse
 from .models import Creator, Media, Rating, Domain, Favorite, Location
 from .forms import CreatorSearchForm, RatingForm, FavoriteForm, CreatorForm, LocationForm, MediaUploadForm
+from .cities import city_index
+from .countries import country_cities, country_name, dataset_fingerprint
+from .etags import ajax_catalog_etag, catalog_conditional
+from .facets import creator_facets
+from .page_context import countries_context, gallery_page_context
+from .query import CreatorQuery, located_creators, with_card_data, with_map_data
+from .results import CreatorResults
+from .nearest import haversine_many, nearest
+from .spatial import bbox_q, in_bbox, parse_bbox, radius_bbox
 
 import json
+import math
 import requests
 from typing import Dict, List, Any
-from math import radians, cos, sin, asin, sqrt
 import logging
-import re
 
-from py_countries_states_cities_database import get_all_countries_and_cities_nested
 
 logger = logging.getLogger(__name__)
 
+# Adresse enregistrée sans coordonnées (géocodée en arrière-plan, voir geocoding.py)
+PENDING_GEOCODING_MESSAGE = "L'adresse sera localisée sur la carte dans quelques instants."
+
 
 # Custom decorator to check user roles
 def role_required(allowed_roles):
@@ -125,30 +138,36 @@ def has_valid_file(media_obj):
 
 def get_creator_thumbnail(creator):
     """
-    Récupère une miniature pour un créateur en suivant cet ordre de priorité:
-    1. Image mise en avant (featured_image)
-    2. Première image valide du portfolio
-    3. Null si aucune image n'est disponible
+    Récupère la miniature d'un créateur (image mise en avant, sinon première
+    image valide du portfolio, sinon None).
+    La couverture est dénormalisée sur le créateur (Creator.cover_url): aucune
+    requête sur les médias ni accès disque n'est effectué ici.
     """
-    try:
-        # 1. D'abord, vérifier si une image mise en avant est définie
-        if creator.featured_image and creator.featured_image.name:
-            return creator.featured_image.url
-        
-        # 2. Ensuite, chercher la première image valide dans le portfolio
-        if creator.media.filter(media_type='image').exists():
-            image = creator.media.filter(media_type='image').first()
-            if has_valid_file(image):
-                return image.file.url
-        
-        # 3. Aucune image disponible
-        return None
-    except Exception:
-        # En cas d'erreur, retourner None pour éviter de casser le template
-        return None
+    return creator.cover_url or None
+
+
+def creator_card_data(creator):
+    """
+    Données JSON d'une carte de créateur (galerie et recherche).
+    Le créateur doit provenir d'un queryset préparé par with_card_data.
+    """
+    return {
+        'id': creator.id,
+        'full_name': creator.full_name,
+        'first_name': creator.first_name,
+        'last_name': creator.last_name,
+        'age': creator.age,
+        'gender': creator.get_gender_display(),
+        'location': str(creator.location) if creator.location else "",
+        'rating': float(creator.average_rating),
+        'total_ratings': creator.total_ratings,
+        'thumbnail': get_creator_thumbnail(creator),
+        'domains': [{'id': d.id, 'name': d.name} for d in creator.domains.all()],
+    }
 
 
 @login_required
+@catalog_conditional(etag_func=ajax_catalog_etag)
 def gallery_view(request):
     """
     Vue principale de la galerie des créateurs avec filtres.
@@ -165,8 +184,6 @@ def gallery_view(request):
             messages.error(request, f"Erreur d'accès au profil de créateur: {str(e)}")
             return redirect('creator_add')
 
-    creators = Creator.objects.all().order_by('-average_rating', 'full_name')
-    
     # Nettoyer les paramètres de l'URL pour éviter l'accumulation des paramètres 'page'
     current_params = request.GET.copy()
     if 'page' in current_params:
@@ -176,136 +193,53 @@ def gallery_view(request):
     # Créer le formulaire avec les paramètres GET
     form = CreatorSearchForm(request.GET)
     
-    # Appliquer les filtres si le formulaire est valide
-    if form.is_valid():
-        data = form.cleaned_data
-        
-        # Filtre par nom/prénom
-        if data.get('query'):
-            query = data['query']
-            creators = creators.filter(
-                Q(first_name__icontains=query) | 
-                Q(last_name__icontains=query) | 
-                Q(full_name__icontains=query)
-            )
-            
-        # Filtre par domaines
-        if data.get('domains'):
-            creators = creators.filter(domains__in=data['domains']).distinct()
-            
-        # Filtres par âge
-        if data.get('min_age'):
-            creators = creators.filter(age__gte=data['min_age'])
-        if data.get('max_age'):
-            creators = creators.filter(age__lte=data['max_age'])
-            
-        # Filtre par genre
-        if data.get('gender'):
-            creators = creators.filter(gender=data['gender'])
-            
-        # Filtres géographiques
-        if data.get('country'):
-            creators = creators.filter(location__full_address__icontains=data['country'])
-        if data.get('city'):
-            creators = creators.filter(location__full_address__icontains=data['city'])
-            
-        # Filtre par note minimale
-        if data.get('min_rating'):
-            creators = creators.filter(average_rating__gte=data['min_rating'])
-            
-        # Autres filtres spécifiques
-        if data.get('can_invoice'):
-            creators = creators.filter(can_invoice=True)
-        if data.get('verified_only'):
-            creators = creators.filter(verified_by_neads=True)
-        
-        # Filtre des favoris
-        if data.get('favorites_only') and request.user.is_authenticated:
-            # Récupérer les IDs des créateurs favoris de l'utilisateur
-            favorite_creator_ids = Favorite.objects.filter(user=request.user).values_list('creator_id', flat=True)
-            creators = creators.filter(id__in=favorite_creator_ids)
+    # Appliquer les filtres (moteur de filtrage partagé)
+    creator_query = CreatorQuery.from_form(form)
     
-    # Pagination
+    # Défilement infini: pagination par curseur, sans COUNT ni OFFSET
+    if cursor_requested(request) and request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        creators = with_card_data(creator_query.queryset(user=request.user))
+        page = CursorPaginator(creators, 12).get_page(request.GET.get('cursor'))
+        return JsonResponse({
+            'creators': [creator_card_data(creator) for creator in page],
+            'next_cursor': page.next_cursor,
+            'has_next': page.has_next,
+        })
+    
+    # Pagination sur les résultats en cache (seule la page affichée est lue en base)
+    creators = CreatorResults(creator_query, user=request.user)
     paginator = Paginator(creators, 12)  # 12 créateurs par page
     page_number = request.GET.get('page', 1)
     page_obj = paginator.get_page(page_number)
     
-    # Récupérer tous les domaines
-    all_domains = Domain.objects.all().order_by('name')
-    
-    # Récupérer les 6 domaines les plus utilisés
-    top_domains = Domain.objects.annotate(
-        creator_count=Count('creators')
-    ).order_by('-creator_count')[:6]
-    
-    # Obtenir les statistiques d'âge pour le slider
-    min_creator_age = Creator.objects.aggregate(Min('age'))['age__min'] or 18
-    max_creator_age = Creator.objects.aggregate(Max('age'))['age__max'] or 65
+    # Retourner JSON pour les requêtes AJAX (le contexte de page est inutile)
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        creator_data = [creator_card_data(creator) for creator in page_obj]
+            
+        return JsonResponse({
+            'creators': creator_data,
+            'page': page_number,
+            'total_pages': paginator.num_pages,
+            'total_creators': paginator.count,
+        })
     
     # Construire l'URL des paramètres sans le paramètre page
     clean_params = current_params.urlencode()
     
     # Préparer les données des domaines en JSON pour JavaScript
-    domains_json = []
-    for domain in all_domains:
-        creator_count = domain.creators.count()
-        domains_json.append({
-            'id': domain.id,
-            'name': domain.name,
-            'count': creator_count
-        })
-    all_countries = get_all_countries_and_cities_nested()
+    # (comptages de la recherche en cours, en une requête groupée)
+    domains_json = creator_facets(creator_query)['domains']
     
-    context = {
+    # Domaines, bornes d'âge et pays: construits une fois par version des données
+    context = gallery_page_context()
+    context.update({
         'creators': page_obj,
         'form': form,
-        'domains': all_domains,
-        'all_domains': all_domains,
-        'top_domains': top_domains,
         'total_creators': paginator.count,
         'clean_params': clean_params,
-        'min_creator_age': min_creator_age,
-        'max_creator_age': max_creator_age,
         'domains_json': json.dumps(domains_json),
-        'countries':all_countries,
-        'country_city_map': json.dumps({
-            entry["iso2"]: entry["cities"]
-            for entry in all_countries
-        })
-    }
+    })
     
-    # Retourner JSON pour les requêtes AJAX
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        creator_data = []
-        for creator in page_obj:
-            # Images pour la miniature
-            thumbnail = get_creator_thumbnail(creator)
-            
-            # Domaines comme badges
-            domains = [{'id': d.id, 'name': d.name} for d in creator.domains.all()]
-            
-            creator_data.append({
-                'id': creator.id,
-                'full_name': creator.full_name,
-                'first_name': creator.first_name,
-                'last_name': creator.last_name,
-                'age': creator.age,
-                'gender': creator.get_gender_display(),
-                'location': str(creator.location) if creator.location else "",
-                'rating': float(creator.average_rating),
-                'total_ratings': creator.total_ratings,
-                'thumbnail': thumbnail,
-                'domains': domains,
-                'verified': creator.verified_by_neads,
-            })
-            
-        return JsonResponse({
-            'creators': creator_data,
-            'page': page_number,
-            'total_pages': paginator.num_pages,
-            'total_creators': paginator.count,
-        })
-        
     return render(request, 'creators/gallery.html', context)
 
 
@@ -410,6 +344,8 @@ def creator_edit(request, creator_id):
             creator = creator_form.save()
             
             messages.success(request, "Le profil de créateur a été mis à jour avec succès!")
+            if location.geocoding_status == Location.GEOCODING_PENDING:
+                messages.info(request, PENDING_GEOCODING_MESSAGE)
             return redirect('creator_detail', creator_id=creator.id)
     else:
         creator_form = CreatorForm(instance=creator)
@@ -467,8 +403,8 @@ def rate_creator(request, creator_id):
             
         rating.save()
         
-        # Recalculer la note moyenne
-        creator.update_ratings()
+        # Note moyenne mise à jour par Rating.save (agrégats incrémentaux)
+        creator.refresh_from_db(fields=['average_rating', 'total_ratings'])
         
         # Message de succès simple
         messages.success(request, "Votre avis a été publié avec succès !")
@@ -545,6 +481,7 @@ def ajax_filter_results(request):
 
 
 @login_required
+@catalog_conditional
 def ajax_map_data(request):
     """
     Endpoint AJAX pour les données de carte.
@@ -552,39 +489,27 @@ def ajax_map_data(request):
     if not request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'error': 'AJAX requests only'}, status=400)
     
-    # Filtres de base similaires à gallery_view
-    creators = Creator.objects.filter(location__isnull=False)
-    
-    # Appliquer les filtres supplémentaires
-    form = CreatorSearchForm(request.GET)
-    if form.is_valid():
-        data = form.cleaned_data
-        
-        # Appliquer les mêmes filtres que dans gallery_view
-        # ...
-    
-    # Préparer les données pour la carte
-    map_points = []
-    for creator in creators:
-        if creator.location and creator.location.latitude and creator.location.longitude:
-            # Trouver une image pour l'aperçu
-            thumbnail = None
-            if creator.media.filter(media_type='image').exists():
-                media = creator.media.filter(media_type='image').first()
-                if has_valid_file(media):
-                    thumbnail = media.file.url
-                
-            map_points.append({
-                'id': creator.id,
-                'name': creator.full_name,
-                'lat': float(creator.location.latitude),
-                'lng': float(creator.location.longitude),
-                'rating': float(creator.average_rating),
-                'thumbnail': thumbnail,
-                'url': reverse('creator_detail', kwargs={'creator_id': creator.id}),
-            })
+    # Mêmes filtres que gallery_view, restreints aux créateurs localisés (résultats en cache)
+    creators = CreatorResults(
+        CreatorQuery.from_request(request), user=request.user, located=True, prepare=with_map_data
+    )
     
-    return JsonResponse({'points': map_points})
+    def map_points():
+        for creator in creators.iterator():
+            if creator.location and creator.location.latitude and creator.location.longitude:
+                yield {
+                    'id': creator.id,
+                    'name': creator.full_name,
+                    'lat': float(creator.location.latitude),
+                    'lng': float(creator.location.longitude),
+                    'rating': float(creator.average_rating),
+                    # Image d'aperçu dénormalisée sur le créateur
+                    'thumbnail': get_creator_thumbnail(creator),
+                    'url': reverse('creator_detail', kwargs={'creator_id': creator.id}),
+                }
+    
+    # Les points sont encodés et envoyés au fil de l'eau
+    return StreamingJsonResponse(map_points(), key='points', count_key=None)
 
 
 @login_required
@@ -694,48 +619,18 @@ def search_view(request):
     # N'effectuer la recherche que si le formulaire est soumis et valide
     if request.GET and form.is_valid():
         is_search = True
-        creators = Creator.objects.all().order_by('-average_rating', 'full_name')
-        data = form.cleaned_data
+        creator_query = CreatorQuery.from_form(form)
+        creators = CreatorResults(creator_query, user=request.user, ranked=True)
         
-        # Filtre par nom/prénom
-        if data.get('query'):
-            query = data['query']
-            creators = creators.filter(
-                Q(first_name__icontains=query) | 
-                Q(last_name__icontains=query) | 
-                Q(full_name__icontains=query) |
-                Q(bio__icontains=query)  # Recherche également dans la biographie
-            )
-            
-        # Filtre par domaines
-        if data.get('domains'):
-            creators = creators.filter(domains__in=data['domains']).distinct()
-            
-        # Filtres par âge
-        if data.get('min_age'):
-            creators = creators.filter(age__gte=data['min_age'])
-        if data.get('max_age'):
-            creators = creators.filter(age__lte=data['max_age'])
-            
-        # Filtre par genre
-        if data.get('gender'):
-            creators = creators.filter(gender=data['gender'])
-            
-        # Filtres géographiques
-        if data.get('country'):
-            creators = creators.filter(location__full_address__icontains=data['country'])
-        if data.get('city'):
-            creators = creators.filter(location__full_address__icontains=data['city'])
-            
-        # Filtre par note minimale
-        if data.get('min_rating'):
-            creators = creators.filter(average_rating__gte=data['min_rating'])
-            
-        # Autres filtres spécifiques
-        if data.get('can_invoice'):
-            creators = creators.filter(can_invoice=True)
-        if data.get('verified_only'):
-            creators = creators.filter(verified_by_neads=True)
+        # Défilement infini: pagination par curseur, sans COUNT ni OFFSET
+        if cursor_requested(request) and request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            creators = with_card_data(creator_query.queryset(user=request.user, ranked=True))
+            page = CursorPaginator(creators, 15).get_page(request.GET.get('cursor'))
+            return JsonResponse({
+                'creators': [creator_card_data(creator) for creator in page],
+                'next_cursor': page.next_cursor,
+                'has_next': page.has_next,
+            })
     
     # Pagination
     paginator = Paginator(creators, 15)  # 15 créateurs par page
@@ -752,32 +647,12 @@ def search_view(request):
         'is_search': is_search,
         'total_creators': paginator.count if is_search else 0,
         'search_query': request.GET.get('query', ''),
+        **countries_context(),
     }
     
     # Retourner JSON pour les requêtes AJAX
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        creator_data = []
-        for creator in page_obj:
-            # Images pour la miniature
-            thumbnail = get_creator_thumbnail(creator)
-            
-            # Domaines comme badges
-            domains = [{'id': d.id, 'name': d.name} for d in creator.domains.all()]
-            
-            creator_data.append({
-                'id': creator.id,
-                'full_name': creator.full_name,
-                'first_name': creator.first_name,
-                'last_name': creator.last_name,
-                'age': creator.age,
-                'gender': creator.get_gender_display(),
-                'location': str(creator.location) if creator.location else "",
-                'rating': float(creator.average_rating),
-                'total_ratings': creator.total_ratings,
-                'thumbnail': thumbnail,
-                'domains': domains,
-                'verified': creator.verified_by_neads,
-            })
+        creator_data = [creator_card_data(creator) for creator in page_obj]
             
         return JsonResponse({
             'creators': creator_data,
@@ -790,23 +665,17 @@ def search_view(request):
 
 
 @login_required
+@catalog_conditional
 def api_cities(request):
     """
-    API endpoint pour récupérer les villes des créateurs.
-    Retourne une liste de villes uniques présentes dans les emplacements des créateurs.
+    API endpoint d'autocomplétion des villes.
+    Retourne jusqu'à 10 villes commençant par la saisie `q` (sans tenir compte
+    des accents): villes des créateurs classées par nombre de créateurs, puis
+    villes du référentiel des pays (restreint au pays `country`, code ou nom,
+    s'il est fourni; un pays inconnu ne donne aucune ville).
     """
-    # Récupère le terme de recherche de la requête, s'il existe
     query = request.GET.get('q', '')
-    
-    # Récupère les villes uniques des emplacements des créateurs
-    cities = Location.objects.filter(
-        city__isnull=False,
-        city__istartswith=query
-    ).values_list('city', flat=True).distinct().order_by('city')[:10]
-    
-    # Convertit le queryset en liste
-    cities_list = list(cities)
-    
+    cities_list = city_index().search(query, limit=10, country=request.GET.get('country'))
     return JsonResponse(cities_list, safe=False)
 
 
@@ -927,149 +796,144 @@ def enrich_results_with_ai(results: List[Dict[str, Any]], query: str) -> List[Di
 
 
 @login_required
+@catalog_conditional
 def api_map_search(request):
     """
     API endpoint for searching creators on a map with distance filtering.
-    Returns creators that are within the specified radius from the given coordinates.
+    Returns creators that are within the specified radius from the given coordinates
+    and/or inside the given viewport (bbox), using the spatial index (spatial.py).
     """
-    # Get required parameters from request
+    # Paramètres: position et rayon (km), et/ou emprise affichée (bbox=ouest,sud,est,nord)
     try:
-        user_lat = float(request.GET.get('lat'))
-        user_lng = float(request.GET.get('lng'))
-        radius = float(request.GET.get('radius', 50))  # Default radius of 50km
+        bbox = parse_bbox(request.GET['bbox']) if request.GET.get('bbox') else None
+        if bbox is not None and not request.GET.get('lat'):
+            # Sans position, les distances sont mesurées depuis le centre de l'emprise
+            west, south, east, north = bbox
+            user_lat, user_lng = (south + north) / 2, (west + east) / 2
+        else:
+            user_lat = float(request.GET.get('lat'))
+            user_lng = float(request.GET.get('lng'))
+        if request.GET.get('radius'):
+            radius = float(request.GET['radius'])
+        else:
+            radius = None if bbox is not None else 50  # Default radius of 50km
     except (ValueError, TypeError):
         return JsonResponse({'error': 'Invalid location parameters'}, status=400)
+    if (not (math.isfinite(user_lat) and math.isfinite(user_lng))
+            or (radius is not None and not (math.isfinite(radius) and radius > 0))):
+        return JsonResponse({'error': 'Invalid location parameters'}, status=400)
 
-    # Get creators with valid location data
-    creators = Creator.objects.filter(
-        location__latitude__isnull=False,
-        location__longitude__isnull=False
-    )
+    # Get creators with valid location data, filtered like the gallery (cached results)
+    creator_query = CreatorQuery.from_request(request)
+    creators = CreatorResults(creator_query, user=request.user, located=True)
 
-    # Apply search filters, identiques à la galerie
-    query = request.GET.get('query')
-    if query:
-        creators = creators.filter(
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query) | 
-            Q(full_name__icontains=query)
+    # Candidats de l'index spatial: rectangle englobant le cercle et/ou l'emprise,
+    # restreints aux résultats de la recherche par sous-requête
+    candidates = located_creators()
+    if creator_query:
+        candidates = candidates.filter(
+            pk__in=creator_query.queryset(user=request.user, ordered=False).values('pk'),
         )
-    
-    # Filtres par domaines
-    domains_param = request.GET.get('domains')
-    if domains_param:
-        domain_ids = domains_param.split(',')
-        # Si plusieurs domaines, on exige qu'ils soient tous présents (AND)
-        for domain_id in domain_ids:
-            if domain_id.isdigit():
-                creators = creators.filter(domains__id=int(domain_id))
-    
-    # Filtre par genre
-    gender = request.GET.get('gender')
-    if gender:
-        creators = creators.filter(gender=gender)
-    
-    # Filtres d'âge
-    min_age = request.GET.get('min_age')
-    max_age = request.GET.get('max_age')
-    if min_age and min_age.isdigit():
-        creators = creators.filter(age__gte=int(min_age))
-    if max_age and max_age.isdigit():
-        creators = creators.filter(age__lte=int(max_age))
-    
-    # Filtres additionnels
-    can_invoice = request.GET.get('can_invoice')
-    if can_invoice == 'on':
-        creators = creators.filter(can_invoice=True)
-    
-    verified_only = request.GET.get('verified_only')
-    if verified_only == 'on':
-        creators = creators.filter(verified_by_neads=True)
-    
-    min_rating = request.GET.get('min_rating')
-    if min_rating and min_rating.isdigit():
-        creators = creators.filter(average_rating__gte=float(min_rating))
-    
-    # Filtre des favoris
-    favorites_only = request.GET.get('favorites_only')
-    if favorites_only == 'on' and request.user.is_authenticated:
-        # Récupérer les IDs des créateurs favoris de l'utilisateur
-        favorite_creator_ids = Favorite.objects.filter(user=request.user).values_list('creator_id', flat=True)
-        creators = creators.filter(id__in=favorite_creator_ids)
-    
-    # Filtres géographiques
-    city = request.GET.get('city')
-    if city:
-        creators = creators.filter(location__full_address__icontains=city)
-    
-    country = request.GET.get('country')
-    if country:
-        creators = creators.filter(location__full_address__icontains=country)
-
-    # Prepare creator data with distances
+    if radius is not None:
+        candidates = candidates.filter(bbox_q(radius_bbox(user_lat, user_lng, radius)))
+    if bbox is not None:
+        candidates = candidates.filter(bbox_q(bbox))
+
+    # Distance exacte calculée (par lot) pour les seuls candidats
+    rows = [
+        (pk, latitude, longitude)
+        for pk, latitude, longitude in candidates.values_list('id', 'location__latitude', 'location__longitude')
+        if bbox is None or in_bbox(latitude, longitude, bbox)
+    ]
+    candidate_distances = haversine_many(
+        user_lat, user_lng, [row[1] for row in rows], [row[2] for row in rows]
+    ).tolist()
+    matches = sorted(
+        (distance, row[0]) for distance, row in zip(candidate_distances, rows)
+        if radius is None or distance <= radius
+    )
+
+    # Lire les données (cartes) des créateurs retenus par lot, triés par distance
+    distances = {pk: distance for distance, pk in matches}
+
     creators_data = []
+    for creator in creators.fetch([pk for _, pk in matches]):
+        distance = distances[creator.pk]
+
+        # Get a thumbnail image
+        thumbnail = get_creator_thumbnail(creator)
+
+        # Format name based on user role
+        if request.user.role == 'client':
+            creator_name = f"{creator.first_name} {creator.last_name[0]}."
+        else:
+            creator_name = creator.full_name
+
+        # Récupérer les domaines du créateur
+        domains = [{'id': d.id, 'name': d.name} for d in creator.domains.all()]
+
+        creator_data = {
+            'id': creator.id,
+            'name': creator_name,
+            'first_name': creator.first_name,
+            'last_name': creator.last_name,
+            'rating': float(creator.average_rating),
+            'total_ratings': creator.total_ratings,
+            'age': creator.age,
+            'gender': creator.get_gender_display(),
+            'domains': domains,
+            'can_invoice': creator.can_invoice,
+            'distance': round(distance, 1),
+            'thumbnail': thumbnail,
+            'latitude': float(creator.location.latitude),
+            'longitude': float(creator.location.longitude),
+            'city': creator.location.city,
+            'country': country_name(creator.location.country_iso2),
+            'url': reverse('creator_detail', kwargs={'creator_id': creator.id}),
+        }
+        creators_data.append(creator_data)
     
-    def haversine(lat1, lon1, lat2, lon2):
-        """
-        Calculate the great circle distance between two points 
-        on the earth (specified in decimal degrees)
-        """
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlon = lon2 - lon1
-        dlat = lat2 - lat1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
-    
-    for creator in creators:
-        # Calculate distance
-        distance = haversine(
-            user_lat, user_lng, 
-            float(creator.location.latitude), float(creator.location.longitude)
-        )
-        
-        # Only include creators within the radius
-        if distance <= radius:
-            # Get a thumbnail image
-            thumbnail = get_creator_thumbnail(creator)
-            
-            # Format name based on user role
-            if request.user.role == 'client':
-                creator_name = f"{creator.first_name} {creator.last_name[0]}."
-            else:
-                creator_name = creator.full_name
-            
-            # Récupérer les domaines du créateur
-            domains = [{'id': d.id, 'name': d.name} for d in creator.domains.all()]
-            
-            creator_data = {
-                'id': creator.id,
-                'name': creator_name,
-                'first_name': creator.first_name,
-                'last_name': creator.last_name,
-                'rating': float(creator.average_rating),
-                'total_ratings': creator.total_ratings,
-                'age': creator.age,
-                'gender': creator.get_gender_display(),
-                'domains': domains,
-                'can_invoice': creator.can_invoice,
-                'distance': round(distance, 1),
-                'thumbnail': thumbnail,
-                'latitude': float(creator.location.latitude),
-                'longitude': float(creator.location.longitude),
-                'city': creator.location.full_address.split(',')[0] if creator.location.full_address else '',
-                'country': creator.location.full_address.split(',')[-1].strip() if creator.location.full_address and ',' in creator.location.full_address else '',
-                'url': reverse('creator_detail', kwargs={'creator_id': creator.id}),
-            }
-            creators_data.append(creator_data)
-    
-    # Trier les créateurs par distance
-    creators_data.sort(key=lambda x: x['distance'])
-    
+    return JsonResponse({'creators': creators_data, 'total': len(creators_data)})
+
+
+# Nombre maximal de créateurs retournés par /creators/api/nearest/
+NEAREST_MAX_RESULTS = 100
+
+
+@login_required
+@catalog_conditional
+def api_nearest(request):
+    """
+    API endpoint des créateurs les plus proches d'une position, sans rayon:
+    /creators/api/nearest/?lat=..&lng=..&k=10 et les filtres habituels.
+    """
+    try:
+        user_lat = float(request.GET.get('lat'))
+        user_lng = float(request.GET.get('lng'))
+        k = int(request.GET.get('k', 10))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Invalid location parameters'}, status=400)
+    if not (math.isfinite(user_lat) and math.isfinite(user_lng)
+            and -90 <= user_lat <= 90 and -180 <= user_lng <= 180):
+        return JsonResponse({'error': 'Invalid location parameters'}, status=400)
+    if not 1 <= k <= NEAREST_MAX_RESULTS:
+        return JsonResponse({'error': f'k must be between 1 and {NEAREST_MAX_RESULTS}'}, status=400)
+
+    creator_query = CreatorQuery.from_request(request)
+    matches = nearest(user_lat, user_lng, k=k, filters=creator_query, user=request.user)
+    distances = dict(matches)
+
+    creators_data = []
+    for creator in CreatorResults(creator_query, user=request.user).fetch([pk for pk, _ in matches]):
+        creator_data = creator_card_data(creator)
+        creator_data.update({
+            'distance': round(distances[creator.pk], 1),
+            'latitude': creator.location.latitude,
+            'longitude': creator.location.longitude,
+            'url': reverse('creator_detail', kwargs={'creator_id': creator.id}),
+        })
+        creators_data.append(creator_data)
+
     return JsonResponse({'creators': creators_data, 'total': len(creators_data)})
 
 
@@ -1082,17 +946,14 @@ def delete_rating(request, rating_id):
     """
     try:
         rating = get_object_or_404(Rating, id=rating_id)
-        creator_id = rating.creator.id
+        creator_id = rating.creator_id
         
         # Journaliser la suppression
         logger.info(f"Admin {request.user.email} a supprimé l'avis #{rating_id} sur le créateur #{creator_id}")
         
-        # Supprimer l'avis
+        # Supprimer l'avis (les moyennes du créateur sont mises à jour par le signal pre_delete)
         rating.delete()
         
-        # Mettre à jour les moyennes
-        rating.creator.update_ratings()
-        
         messages.success(request, "L'avis a été supprimé avec succès.")
         return redirect('creator_detail', creator_id=creator_id)
     except Exception as e:
@@ -1171,18 +1032,17 @@ def creators_list(request):
             Q(email__icontains=query)
         )
     
-    # Pagination
-    paginator = Paginator(creators, 20)  # 20 créateurs par page
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # Pagination (par curseur si le paramètre `cursor` est présent)
+    paginator, page_obj = paginate(request, creators, 20, ordering=('-created_at', 'id'))  # 20 créateurs par page
     
     context = {
         'creators': page_obj,
-        'total_creators': paginator.count,
+        'total_creators': paginator.count if paginator else None,
         'q': query,
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': paginator is not None and paginator.num_pages > 1,
         'page_obj': page_obj,
         'paginator': paginator,
+        'next_page_query': next_page_query(request, page_obj),
     }
     
     return render(request, 'creators/creators_list.html', context)
@@ -1216,6 +1076,8 @@ def creator_add(request):
             
             # Rediriger vers la page de détail du créateur
             messages.success(request, "Votre profil de créateur a été créé avec succès!")
+            if location.geocoding_status == Location.GEOCODING_PENDING:
+                messages.info(request, PENDING_GEOCODING_MESSAGE)
             return redirect('creator_detail', creator_id=creator.id)
     else:
         creator_form = CreatorForm()
@@ -1304,104 +1166,44 @@ def contact_creator(request, creator_id):
         return redirect('creator_detail', creator_id=creator_id)
 
 
+def _country_cities_etag(request, iso2):
+    return f"{dataset_fingerprint()}-{iso2.upper()}"
+
+
+@login_required
+@cache_control(private=True, max_age=24 * 60 * 60)
+@etag(_country_cities_etag)
+def api_country_cities(request, iso2):
+    """
+    API endpoint des villes d'un pays (code ISO2), chargées à la demande par les
+    sélecteurs de lieu. L'ETag dépend de la version du jeu de données.
+    """
+    cities = country_cities(iso2)
+    if cities is None:
+        return JsonResponse({'error': 'Unknown country'}, status=404)
+    return JsonResponse({'country': iso2.upper(), 'cities': cities})
+
+
 @login_required
+@catalog_conditional
 def api_domains(request):
     """
     API endpoint pour récupérer tous les domaines avec leur nombre d'utilisations.
+    Les filtres de recherche éventuels restreignent les comptages.
     """
-    domains = Domain.objects.all()
-    domains_data = []
-    
-    for domain in domains:
-        # Compter le nombre de créateurs qui utilisent ce domaine
-        count = Creator.objects.filter(domains=domain).count()
-        domains_data.append({
-            'id': domain.id,
-            'name': domain.name,
-            'count': count
-        })
-    
-    # Trier par nom
-    domains_data.sort(key=lambda x: x['name'])
-    
+    domains_data = creator_facets(CreatorQuery.from_request(request))['domains']
     return JsonResponse(domains_data, safe=False)
 
 
-# Fonction utilitaire pour normaliser les adresses et codes postaux
-def normalize_address(address_data):
+@login_required
+@catalog_conditional
+def api_facets(request):
     """
-    Normalise les adresses et codes postaux pour être cohérent avec les pratiques françaises.
-    Corrige notamment les codes postaux administratifs vs couramment utilisés.
+    API endpoint des facettes de recherche (domaines, genre, note, âge, facturation)
+    pour les filtres de la requête. `located=1` restreint aux créateurs localisés.
     """
-    if not address_data:
-        return address_data
-    
-    # Dictionnaire des corrections spécifiques de codes postaux
-    postal_corrections = {
-        'Montpellier': '34000',  # Au lieu de 34062 (administratif)
-        'Marseille': {
-            # Arrondissements de Marseille
-            'Marseille 1er Arrondissement': '13001',
-            'Marseille 2e Arrondissement': '13002',
-            'Marseille 3e Arrondissement': '13003',
-            'Marseille 4e Arrondissement': '13004',
-            'Marseille 5e Arrondissement': '13005',
-            'Marseille 6e Arrondissement': '13006',
-            'Marseille 7e Arrondissement': '13007',
-            'Marseille 8e Arrondissement': '13008',
-            'Marseille 9e Arrondissement': '13009',
-            'Marseille 10e Arrondissement': '13010',
-            'Marseille 11e Arrondissement': '13011',
-            'Marseille 12e Arrondissement': '13012',
-            'Marseille 13e Arrondissement': '13013',
-            'Marseille 14e Arrondissement': '13014',
-            'Marseille 15e Arrondissement': '13015',
-            'Marseille 16e Arrondissement': '13016',
-            # Fallback général pour Marseille
-            'Marseille': '13000',
-        },
-        'Lyon': {
-            # Arrondissements de Lyon
-            'Lyon 1er Arrondissement': '69001',
-            'Lyon 2e Arrondissement': '69002',
-            'Lyon 3e Arrondissement': '69003',
-            'Lyon 4e Arrondissement': '69004',
-            'Lyon 5e Arrondissement': '69005',
-            'Lyon 6e Arrondissement': '69006',
-            'Lyon 7e Arrondissement': '69007',
-            'Lyon 8e Arrondissement': '69008',
-            'Lyon 9e Arrondissement': '69009',
-            # Fallback général pour Lyon
-            'Lyon': '69000',
-        },
-        'Toulouse': '31000',  # Au lieu de 31500 (administratif)
-        'Bordeaux': '33000',  # Au lieu de 33063 (administratif)
-        'Nantes': '44000',    # Au lieu de 44109 (administratif)
-        'Strasbourg': '67000', # Au lieu de 67482 (administratif)
-        'Lille': '59000',     # Au lieu de 59350 (administratif)
-    }
-    
-    try:
-        # Vérifier si l'adresse contient une ville connue pour avoir des problèmes de code postal
-        for city, correction in postal_corrections.items():
-            if isinstance(correction, dict):
-                # Pour les villes avec des arrondissements
-                for district, code in correction.items():
-                    if district in address_data and re.search(r'\b\d{5}\b', address_data):
-                        # Remplacer le code postal existant par celui corrigé
-                        address_data = re.sub(r'\b\d{5}\b', code, address_data)
-                        logger.debug(f"Code postal corrigé pour {district}: {code}")
-                        break
-                if city in address_data and re.search(r'\b\d{5}\b', address_data) and not any(district in address_data for district in correction.keys()):
-                    # Utiliser le code par défaut si aucun arrondissement n'est trouvé
-                    address_data = re.sub(r'\b\d{5}\b', correction['Lyon' if city == 'Lyon' else 'Marseille'], address_data)
-                    logger.debug(f"Code postal général corrigé pour {city}")
-            else:
-                # Pour les villes sans arrondissements
-                if city in address_data and re.search(r'\b\d{5}\b', address_data):
-                    address_data = re.sub(r'\b\d{5}\b', correction, address_data)
-                    logger.debug(f"Code postal corrigé pour {city}: {correction}")
-    except Exception as e:
-        logger.error(f"Erreur lors de la normalisation de l'adresse: {str(e)}")
-    
-    return address_data
+    facets = creator_facets(
+        CreatorQuery.from_request(request),
+        located=request.GET.get('located') in ('1', 'true'),
+    )
+    return JsonResponse(facets)
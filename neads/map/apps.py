@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MapConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'neads.map'
+
+    def ready(self):
+        # Enregistrement des signaux (clusters de la carte)
+        from . import signals  # noqa: F401
@@ -0,0 +1,64 @@
+"""
+Agrégats de la carte par département et par région.
+
+Le département et la région de chaque localisation sont calculés à l'écriture
+à partir du code postal (voir neads/creators/addresses.py) et recopiés dans
+les points de la carte (voir points.py): compter les créateurs d'une zone est
+un GROUP BY sur les colonnes indexées de MapPoint, sans jointure ni aucun
+calcul géométrique (contours, appartenance d'un point à un polygone) pendant
+la requête. Le marqueur d'une zone est placé à la position moyenne de ses
+points.
+
+Avec des filtres de recherche, les points des résultats en cache (voir
+CreatorResults) sont agrégés de la même façon.
+
+Exemple d'utilisation:
+    area_counts('department')
+    # [{'code': '69', 'name': 'Rhône', 'count': 12, 'lat': 45.76, 'lng': 4.84}, ...]
+"""
+
+from collections import defaultdict
+
+from django.db.models import Avg, Count
+
+from neads.creators.departments import department_name, region_name
+
+from .models import MapPoint
+from .points import point_rows
+
+# Niveau d'agrégation: (colonne de MapPoint, nom d'une zone par son code)
+LEVELS = {
+    'department': ('department', department_name),
+    'region': ('region', region_name),
+}
+
+
+def _area(code, name, count, latitude, longitude):
+    return {'code': code, 'name': name(code), 'count': count, 'lat': latitude, 'lng': longitude}
+
+
+def area_counts(level, creator_ids=None):
+    """
+    Nombre de créateurs visibles sur la carte par zone du niveau donné
+    ('department' ou 'region'), restreint à `creator_ids` s'il est fourni.
+    Les points sans département (hors de France, code postal inconnu) sont ignorés.
+    """
+    column, name = LEVELS[level]
+
+    if creator_ids is None:
+        rows = MapPoint.objects.filter(is_visible=True).exclude(**{column: ''}).values(column).annotate(
+            count=Count('pk'), mean_latitude=Avg('latitude'), mean_longitude=Avg('longitude'),
+        ).order_by(column).values_list(column, 'count', 'mean_latitude', 'mean_longitude')
+        return [_area(code, name, count, latitude, longitude) for code, count, latitude, longitude in rows]
+
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    for code, latitude, longitude in point_rows(creator_ids, (column, 'latitude', 'longitude')):
+        if code:
+            total = totals[code]
+            total[0] += 1
+            total[1] += latitude
+            total[2] += longitude
+    return [
+        _area(code, name, count, latitude_sum / count, longitude_sum / count)
+        for code, (count, latitude_sum, longitude_sum) in sorted(totals.items())
+    ]
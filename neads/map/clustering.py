@@ -0,0 +1,377 @@
+"""
+Clustering des créateurs sur la carte par niveau de zoom.
+
+Les points visibles de la carte (MapPoint) sont regroupés sur une grille
+alignée sur les tuiles de la carte (projection Web Mercator): au zoom z, le
+monde est découpé en (2^z * CELLS_PER_TILE)² cellules d'environ 64 pixels.
+Les cellules sont calculées une fois au zoom maximal puis déduites pour les
+autres niveaux (la cellule (x, y) au zoom z appartient à la cellule
+(x // 2, y // 2) au zoom z - 1). Le regroupement est vectorisé avec NumPy
+(np.unique et np.bincount par niveau).
+
+Les clusters de tous les niveaux sont enregistrés dans MapCluster
+(is_dynamic=True) et lus par emprise et niveau de zoom par l'endpoint
+/map/api/clusters/?bbox=ouest,sud,est,nord&zoom=z. Ils sont tenus à jour:
+- de façon incrémentale à chaque création, déplacement ou suppression d'un
+  point (voir points.py et signals.py): seules les cellules concernées sont
+  relues et écrites
+- par un recalcul complet (`python manage.py build_map_clusters`, ou à la
+  première requête si les clusters n'ont jamais été construits): une requête
+  sur les points, puis seules les lignes modifiées sont écrites
+  (bulk_update, bulk_create)
+
+Les clusters fixes (is_dynamic=False) comptent les points de leur carré de
+±FIXED_CLUSTER_HALF_SIZE degrés et sont recalculés avec les mêmes opérations.
+
+Avec des filtres de recherche, les clusters du niveau demandé sont calculés à
+la volée sur les points des résultats en cache (voir CreatorResults).
+"""
+
+import math
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+
+from neads.creators.cache import bump_version, read_version
+from neads.creators.spatial import EARTH_RADIUS_KM, in_bbox, range_q
+
+from .models import MapCluster, MapPoint
+
+# Niveaux de zoom précalculés (au-delà, les cellules ne contiennent plus qu'un créateur)
+MIN_ZOOM = 0
+MAX_CLUSTER_ZOOM = 16
+ZOOMS = range(MIN_ZOOM, MAX_CLUSTER_ZOOM + 1)
+
+# Cellules par côté de tuile (tuiles de 256 pixels: cellules de 64 pixels)
+CELLS_PER_TILE = 4
+
+# Latitude maximale de la projection Web Mercator
+MAX_LATITUDE = 85.05112878
+
+# Demi-côté (degrés) du carré couvert par un cluster fixe
+FIXED_CLUSTER_HALF_SIZE = 0.5
+
+CLUSTERS_VERSION_KEY = 'map:clusters:version'
+CLUSTERS_BUILT_KEY = 'map:clusters:built'
+CLUSTERS_LOCK_KEY = 'map:clusters:lock'
+CLUSTERS_LOCK_TIMEOUT = 5 * 60
+
+BULK_BATCH_SIZE = 1000
+
+# Écart de centre (degrés) en deçà duquel un cluster n'est pas réécrit
+CENTER_TOLERANCE = 1e-9
+
+Cluster = namedtuple('Cluster', 'zoom x y latitude longitude count')
+
+
+def grid_size(zoom):
+    """Nombre de cellules par côté du monde au niveau de zoom."""
+    return (1 << zoom) * CELLS_PER_TILE
+
+
+def cells_of(latitudes, longitudes, zoom=MAX_CLUSTER_ZOOM):
+    """Cellules (tableaux x, y) de la grille contenant des positions au niveau de zoom."""
+    size = grid_size(zoom)
+    latitudes = np.clip(np.asarray(latitudes, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    sin_lat = np.sin(np.radians(latitudes))
+    x = (longitudes + 180) / 360
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    return (
+        np.clip((x * size).astype(np.int64), 0, size - 1),
+        np.clip((y * size).astype(np.int64), 0, size - 1),
+    )
+
+
+def cell_of(latitude, longitude, zoom=MAX_CLUSTER_ZOOM):
+    """Cellule (x, y) de la grille contenant la position au niveau de zoom."""
+    x, y = cells_of([latitude], [longitude], zoom)
+    return int(x[0]), int(y[0])
+
+
+def cell_bounds(x, y, zoom):
+    """Emprise (ouest, sud, est, nord) en degrés de la cellule (x, y) au niveau de zoom."""
+    size = grid_size(zoom)
+
+    def latitude(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / size))))
+
+    return x / size * 360 - 180, latitude(y + 1), (x + 1) / size * 360 - 180, latitude(y)
+
+
+def cell_radius_km(latitude, zoom):
+    """Demi-diagonale approximative d'une cellule à la latitude donnée."""
+    width = 2 * math.pi * EARTH_RADIUS_KM * math.cos(math.radians(latitude)) / grid_size(zoom)
+    return width * math.sqrt(2) / 2
+
+
+def aggregate(latitudes, longitudes, zooms=ZOOMS, weights=None):
+    """
+    Regroupe des positions par cellule pour chaque niveau de zoom.
+    Retourne {(zoom, x, y): (poids, somme des latitudes, somme des longitudes)};
+    les poids (1 par défaut) permettent d'agréger des retraits (-1).
+    """
+    latitudes = np.asarray(latitudes, dtype=np.float64)
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    zooms = sorted(set(zooms))
+    if not zooms or not len(latitudes):
+        return {}
+    weights = np.ones(len(latitudes)) if weights is None else np.asarray(weights, dtype=np.float64)
+    top = zooms[-1]
+    x, y = cells_of(latitudes, longitudes, top)
+
+    cells = {}
+    for zoom in zooms:
+        shift = top - zoom
+        size = grid_size(zoom)
+        keys = (x >> shift) * size + (y >> shift)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        lat_sums = np.bincount(inverse, weights=latitudes * weights)
+        lng_sums = np.bincount(inverse, weights=longitudes * weights)
+        for key, count, lat_sum, lng_sum in zip(
+            unique.tolist(), counts.tolist(), lat_sums.tolist(), lng_sums.tolist()
+        ):
+            cells[(zoom, key // size, key % size)] = (round(count), lat_sum, lng_sum)
+    return cells
+
+
+def cluster_points(points, zooms=ZOOMS):
+    """
+    Clusters (Cluster) de points (latitude, longitude) pour chaque niveau de
+    zoom demandé, retournés sous forme de dictionnaire {zoom: [clusters]}.
+    """
+    points = np.asarray(list(points), dtype=np.float64).reshape(-1, 2)
+    result = {zoom: [] for zoom in zooms}
+    for (zoom, x, y), (count, lat_sum, lng_sum) in aggregate(points[:, 0], points[:, 1], zooms).items():
+        result[zoom].append(Cluster(zoom, x, y, lat_sum / count, lng_sum / count, count))
+    return result
+
+
+def clusters_version():
+    """Version des clusters (incrémentée pour forcer un recalcul complet)."""
+    return read_version(CLUSTERS_VERSION_KEY)
+
+
+def mark_clusters_stale():
+    bump_version(CLUSTERS_VERSION_KEY)
+
+
+def visible_positions():
+    """Positions (tableaux latitudes, longitudes) de tous les points visibles, en une requête."""
+    rows = np.array(
+        list(MapPoint.objects.filter(is_visible=True).values_list('latitude', 'longitude')),
+        dtype=np.float64,
+    ).reshape(-1, 2)
+    return rows[:, 0], rows[:, 1]
+
+
+# Champs d'un nouveau cluster dynamique hors de sa cellule (get_or_create)
+NEW_CLUSTER_FIELDS = ('name', 'latitude', 'longitude', 'radius', 'points_count')
+
+
+def _new_cluster(zoom, x, y, count, latitude, longitude):
+    return MapCluster(
+        name=f"z{zoom}/{x}/{y}",
+        latitude=latitude,
+        longitude=longitude,
+        zoom_level=zoom,
+        radius=max(1, round(cell_radius_km(latitude, zoom))),
+        points_count=count,
+        cell_x=x,
+        cell_y=y,
+        is_dynamic=True,
+    )
+
+
+def fixed_cluster_counts(clusters, latitudes, longitudes):
+    """Nombre de points du carré de chaque cluster fixe (latitudes triées, recherche dichotomique)."""
+    order = np.argsort(latitudes)
+    latitudes, longitudes = latitudes[order], longitudes[order]
+    counts = []
+    for cluster in clusters:
+        start = np.searchsorted(latitudes, cluster.latitude - FIXED_CLUSTER_HALF_SIZE, side='left')
+        end = np.searchsorted(latitudes, cluster.latitude + FIXED_CLUSTER_HALF_SIZE, side='right')
+        band = longitudes[start:end]
+        counts.append(int(np.count_nonzero(np.abs(band - cluster.longitude) <= FIXED_CLUSTER_HALF_SIZE)))
+    return counts
+
+
+def cluster_points_count(cluster):
+    """
+    Nombre de points visibles d'un seul cluster: ceux de sa cellule (cluster
+    dynamique) ou de son carré (cluster fixe), sans lire les autres points.
+    """
+    points = MapPoint.objects.filter(is_visible=True)
+    if not cluster.is_dynamic or cluster.cell_x is None or cluster.cell_y is None:
+        return points.filter(
+            latitude__gte=cluster.latitude - FIXED_CLUSTER_HALF_SIZE,
+            latitude__lte=cluster.latitude + FIXED_CLUSTER_HALF_SIZE,
+            longitude__gte=cluster.longitude - FIXED_CLUSTER_HALF_SIZE,
+            longitude__lte=cluster.longitude + FIXED_CLUSTER_HALF_SIZE,
+        ).count()
+    # Emprise de la cellule élargie d'une marge, puis appartenance exacte (mêmes calculs que aggregate)
+    west, south, east, north = cell_bounds(cluster.cell_x, cluster.cell_y, cluster.zoom_level)
+    margin = 1e-6
+    rows = np.array(list(points.filter(
+        latitude__gte=south - margin, latitude__lte=north + margin,
+        longitude__gte=west - margin, longitude__lte=east + margin,
+    ).values_list('latitude', 'longitude')), dtype=np.float64).reshape(-1, 2)
+    if not len(rows):
+        return 0
+    x, y = cells_of(rows[:, 0], rows[:, 1], cluster.zoom_level)
+    return int(np.count_nonzero((x == cluster.cell_x) & (y == cluster.cell_y)))
+
+
+def recompute_cluster_counts(fixed_clusters=None):
+    """
+    Recalcule tous les clusters à partir des points visibles (une requête) et
+    n'écrit que les différences. `fixed_clusters` restreint le recalcul des
+    clusters fixes à une liste donnée. Retourne le nombre de lignes écrites.
+    """
+    version = clusters_version()
+    latitudes, longitudes = visible_positions()
+
+    target = aggregate(latitudes, longitudes)
+    to_update, to_delete = [], []
+    for cluster in MapCluster.objects.filter(is_dynamic=True).only(
+        'id', 'zoom_level', 'cell_x', 'cell_y', 'latitude', 'longitude', 'points_count',
+    ):
+        cell = target.pop((cluster.zoom_level, cluster.cell_x, cluster.cell_y), None)
+        if cell is None:
+            to_delete.append(cluster.pk)
+            continue
+        count, lat_sum, lng_sum = cell
+        latitude, longitude = lat_sum / count, lng_sum / count
+        # Centre comparé à une tolérance près (moyennes mises à jour de façon incrémentale)
+        if (cluster.points_count != count
+                or not math.isclose(cluster.latitude, latitude, abs_tol=CENTER_TOLERANCE)
+                or not math.isclose(cluster.longitude, longitude, abs_tol=CENTER_TOLERANCE)):
+            cluster.points_count, cluster.latitude, cluster.longitude = count, latitude, longitude
+            to_update.append(cluster)
+    to_create = [
+        _new_cluster(zoom, x, y, count, lat_sum / count, lng_sum / count)
+        for (zoom, x, y), (count, lat_sum, lng_sum) in target.items()
+    ]
+
+    if fixed_clusters is None:
+        fixed_clusters = list(MapCluster.objects.filter(is_dynamic=False))
+    fixed_updates = []
+    for cluster, count in zip(fixed_clusters, fixed_cluster_counts(fixed_clusters, latitudes, longitudes)):
+        if cluster.points_count != count:
+            cluster.points_count = count
+            fixed_updates.append(cluster)
+
+    with transaction.atomic():
+        MapCluster.objects.filter(pk__in=to_delete).delete()
+        MapCluster.objects.bulk_update(
+            to_update, ['points_count', 'latitude', 'longitude'], batch_size=BULK_BATCH_SIZE
+        )
+        MapCluster.objects.bulk_update(fixed_updates, ['points_count'], batch_size=BULK_BATCH_SIZE)
+        MapCluster.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+    cache.set(CLUSTERS_BUILT_KEY, version, timeout=None)
+    return len(to_delete) + len(to_update) + len(fixed_updates) + len(to_create)
+
+
+def ensure_clusters():
+    """Recalcule les clusters s'ils n'ont jamais été construits (ou ont été invalidés)."""
+    if cache.get(CLUSTERS_BUILT_KEY) == clusters_version():
+        return
+    # Un seul recalcul à la fois: les autres requêtes lisent les clusters existants
+    if cache.add(CLUSTERS_LOCK_KEY, 1, timeout=CLUSTERS_LOCK_TIMEOUT):
+        try:
+            recompute_cluster_counts()
+        finally:
+            cache.delete(CLUSTERS_LOCK_KEY)
+
+
+def apply_point_changes(removed=(), added=()):
+    """
+    Mise à jour incrémentale des clusters après le retrait et l'ajout de
+    positions (latitude, longitude): seules les cellules concernées (une par
+    niveau de zoom et par position) sont relues et écrites.
+    """
+    if cache.get(CLUSTERS_BUILT_KEY) != clusters_version():
+        # Clusters jamais construits: le prochain recalcul complet en tiendra compte
+        return
+    removed, added = list(removed), list(added)
+    if not removed and not added:
+        return
+    positions = np.array(removed + added, dtype=np.float64).reshape(-1, 2)
+    weights = [-1] * len(removed) + [1] * len(added)
+    deltas = {
+        key: delta
+        for key, delta in aggregate(positions[:, 0], positions[:, 1], weights=weights).items()
+        if delta != (0, 0, 0)
+    }
+
+    with transaction.atomic():
+        if deltas:
+            condition = reduce(or_, (Q(zoom_level=zoom, cell_x=x, cell_y=y) for zoom, x, y in deltas))
+            to_update, to_delete = [], []
+            for cluster in MapCluster.objects.select_for_update().filter(condition, is_dynamic=True):
+                delta = deltas.pop((cluster.zoom_level, cluster.cell_x, cluster.cell_y), None)
+                if delta is None:
+                    # Ligne inattendue (déjà traitée): le recalcul complet la corrigera
+                    continue
+                count, lat_sum, lng_sum = delta
+                new_count = cluster.points_count + count
+                if new_count <= 0:
+                    to_delete.append(cluster.pk)
+                    continue
+                cluster.latitude = (cluster.latitude * cluster.points_count + lat_sum) / new_count
+                cluster.longitude = (cluster.longitude * cluster.points_count + lng_sum) / new_count
+                cluster.points_count = new_count
+                to_update.append(cluster)
+            MapCluster.objects.filter(pk__in=to_delete).delete()
+            MapCluster.objects.bulk_update(to_update, ['points_count', 'latitude', 'longitude'])
+            # Nouvelles cellules: une écriture concurrente a pu créer la même cellule entre-temps
+            for (zoom, x, y), (count, lat_sum, lng_sum) in deltas.items():
+                if count <= 0:
+                    continue
+                new = _new_cluster(zoom, x, y, count, lat_sum / count, lng_sum / count)
+                cluster, created = MapCluster.objects.get_or_create(
+                    zoom_level=zoom, cell_x=x, cell_y=y, is_dynamic=True,
+                    defaults={field: getattr(new, field) for field in NEW_CLUSTER_FIELDS},
+                )
+                if not created:
+                    new_count = cluster.points_count + count
+                    MapCluster.objects.filter(pk=cluster.pk).update(
+                        points_count=new_count,
+                        latitude=(cluster.latitude * cluster.points_count + lat_sum) / new_count,
+                        longitude=(cluster.longitude * cluster.points_count + lng_sum) / new_count,
+                    )
+
+        # Clusters fixes dont le carré contient une position retirée ou ajoutée
+        for (latitude, longitude), weight in zip(positions.tolist(), weights):
+            MapCluster.objects.filter(
+                is_dynamic=False,
+                latitude__gte=latitude - FIXED_CLUSTER_HALF_SIZE,
+                latitude__lte=latitude + FIXED_CLUSTER_HALF_SIZE,
+                longitude__gte=longitude - FIXED_CLUSTER_HALF_SIZE,
+                longitude__lte=longitude + FIXED_CLUSTER_HALF_SIZE,
+            ).update(points_count=F('points_count') + weight)
+
+
+def stored_clusters(bbox, zoom):
+    """Clusters enregistrés du niveau de zoom dans l'emprise."""
+    ensure_clusters()
+    return [
+        Cluster(zoom, x, y, latitude, longitude, count)
+        for x, y, latitude, longitude, count in MapCluster.objects.filter(
+            range_q(bbox), is_dynamic=True, zoom_level=zoom,
+        ).values_list('cell_x', 'cell_y', 'latitude', 'longitude', 'points_count')
+    ]
+
+
+def filtered_clusters(positions, bbox, zoom):
+    """Clusters calculés à la volée pour des positions (résultats filtrés)."""
+    return [
+        cluster for cluster in cluster_points(positions, [zoom])[zoom]
+        if in_bbox(cluster.latitude, cluster.longitude, bbox)
+    ]
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from neads.map.clustering import MAX_CLUSTER_ZOOM, MIN_ZOOM, recompute_cluster_counts
+from neads.map.models import MapCluster
+
+
+class Command(BaseCommand):
+    help = "Recalcule les clusters de la carte et leurs comptages (seules les différences sont écrites)"
+
+    def handle(self, *args, **options):
+        written = recompute_cluster_counts()
+        total = MapCluster.objects.filter(is_dynamic=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} clusters (zooms {MIN_ZOOM} à {MAX_CLUSTER_ZOOM}), {written} lignes écrites."
+        ))
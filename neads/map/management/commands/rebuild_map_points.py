@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from neads.map.clustering import mark_clusters_stale
+from neads.map.points import rebuild_map_points
+
+
+class Command(BaseCommand):
+    help = "Reconstruit les points de la carte (MapPoint) de tous les créateurs"
+
+    def handle(self, *args, **options):
+        count = rebuild_map_points()
+        mark_clusters_stale()
+        self.stdout.write(self.style.SUCCESS(f"{count} points de carte synchronisés."))
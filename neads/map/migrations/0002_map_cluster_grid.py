@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('map', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mapcluster',
+            name='cell_x',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mapcluster',
+            name='cell_y',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='mapcluster',
+            index=models.Index(fields=['zoom_level', 'latitude', 'longitude'], name='mapcluster_zoom_position_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 20:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0016_location_spatial_index'),
+        ('map', '0002_map_cluster_grid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappoint',
+            name='client_title',
+            field=models.CharField(blank=True, default='', max_length=60),
+        ),
+        migrations.AddField(
+            model_name='mappoint',
+            name='first_name',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='mappoint',
+            name='last_name',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='mappoint',
+            name='rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='mappoint',
+            name='thumbnail',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='mappoint',
+            index=models.Index(fields=['is_visible', 'latitude', 'longitude'], name='mappoint_visible_position_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('map', '0003_map_point_read_model'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mapcluster',
+            index=models.Index(fields=['zoom_level', 'cell_x', 'cell_y'], name='mapcluster_zoom_cell_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 20:58
+
+from django.db import migrations, models
+
+
+def backfill_age(apps, schema_editor):
+    Creator = apps.get_model('creators', 'Creator')
+    MapPoint = apps.get_model('map', 'MapPoint')
+    MapPoint.objects.update(age=models.Subquery(
+        Creator.objects.filter(pk=models.OuterRef('creator_id')).values('age')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('map', '0004_map_cluster_cell_index'),
+        ('creators', '0021_creator_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappoint',
+            name='age',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_age, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+def backfill_department_region(apps, schema_editor):
+    Location = apps.get_model('creators', 'Location')
+    MapPoint = apps.get_model('map', 'MapPoint')
+    locations = Location.objects.filter(pk=models.OuterRef('location_id'))
+    MapPoint.objects.filter(location__isnull=False).update(
+        department=models.Subquery(locations.values('department')[:1]),
+        region=models.Subquery(locations.values('region')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('creators', '0021_creator_rating_sum'),
+        ('map', '0005_map_point_age'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mappoint',
+            name='department',
+            field=models.CharField(blank=True, default='', max_length=3),
+        ),
+        migrations.AddField(
+            model_name='mappoint',
+            name='region',
+            field=models.CharField(blank=True, default='', max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='mappoint',
+            index=models.Index(fields=['is_visible', 'department'], name='mappoint_visible_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mappoint',
+            index=models.Index(fields=['is_visible', 'region'], name='mappoint_visible_region_idx'),
+        ),
+        migrations.RunPython(backfill_department_region, migrations.RunPython.noop),
+    ]
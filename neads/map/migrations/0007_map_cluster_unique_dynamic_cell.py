@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 21:17
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_cells(apps, schema_editor):
+    # Garde un seul cluster dynamique par cellule; le recalcul suivant corrige les comptages
+    MapCluster = apps.get_model('map', 'MapCluster')
+    duplicates = MapCluster.objects.filter(is_dynamic=True).values('zoom_level', 'cell_x', 'cell_y').annotate(
+        first=Min('pk'), rows=Count('pk'),
+    ).filter(rows__gt=1)
+    for cell in duplicates:
+        MapCluster.objects.filter(
+            is_dynamic=True, zoom_level=cell['zoom_level'], cell_x=cell['cell_x'], cell_y=cell['cell_y'],
+        ).exclude(pk=cell['first']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('map', '0006_map_point_department_region'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_cells, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='mapcluster',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_dynamic', True)), fields=('zoom_level', 'cell_x', 'cell_y'), name='mapcluster_unique_dynamic_cell'),
+        ),
+    ]
@@ -15,6 +15,10 @@ Caractéristiques principales:
 - Système de clustering pour l'optimisation de l'affichage
 - Configuration de la visibilité et du style des points
 
+MapPoint est le modèle de lecture de la carte: il est maintenu à partir des
+créateurs, localisations et médias (voir points.py et signals.py) et les
+endpoints de la carte le lisent sans jointure.
+
 Relations principales:
 - MapPoint est lié à Creator (relation one-to-one)
 - MapPoint est lié à Location (relation many-to-one)
@@ -40,11 +44,30 @@ class MapPoint(models.Model):
     popup_content = models.TextField(blank=True, null=True)
     icon_type = models.CharField(max_length=50, default='default')
     
+    # Données dénormalisées du créateur (modèle de lecture de la carte, voir points.py)
+    first_name = models.CharField(max_length=50, blank=True, default='')
+    last_name = models.CharField(max_length=50, blank=True, default='')
+    client_title = models.CharField(max_length=60, blank=True, default='')  # Nom masqué pour les clients
+    rating = models.FloatField(default=0)
+    thumbnail = models.CharField(max_length=500, blank=True, default='')
+    age = models.PositiveIntegerField(blank=True, null=True)
+    department = models.CharField(max_length=3, blank=True, default='')  # Voir Location.department
+    region = models.CharField(max_length=2, blank=True, default='')
+    
     # Métadonnées
     is_visible = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Points visibles d'une emprise de la carte
+            models.Index(fields=['is_visible', 'latitude', 'longitude'], name='mappoint_visible_position_idx'),
+            # Agrégats par département et par région (voir areas.py)
+            models.Index(fields=['is_visible', 'department'], name='mappoint_visible_dept_idx'),
+            models.Index(fields=['is_visible', 'region'], name='mappoint_visible_region_idx'),
+        ]
+    
     def __str__(self):
         return f"Point sur la carte pour {self.creator}"
     
@@ -71,21 +94,39 @@ class MapCluster(models.Model):
     radius = models.PositiveIntegerField(default=50)  # rayon en km
     points_count = models.PositiveIntegerField(default=0)
     
+    # Cellule de la grille de clustering (clusters dynamiques, voir clustering.py)
+    cell_x = models.PositiveIntegerField(null=True, blank=True)
+    cell_y = models.PositiveIntegerField(null=True, blank=True)
+    
     # Métadonnées
     created_at = models.DateTimeField(auto_now_add=True)
     is_dynamic = models.BooleanField(default=True)  # Si True, généré dynamiquement, sinon fixe
     
+    class Meta:
+        indexes = [
+            # Clusters d'un niveau de zoom dans l'emprise affichée
+            models.Index(fields=['zoom_level', 'latitude', 'longitude'], name='mapcluster_zoom_position_idx'),
+            # Cellules touchées par la mise à jour incrémentale des comptages
+            models.Index(fields=['zoom_level', 'cell_x', 'cell_y'], name='mapcluster_zoom_cell_idx'),
+        ]
+        constraints = [
+            # Un seul cluster dynamique par cellule (mises à jour incrémentales concurrentes)
+            models.UniqueConstraint(
+                fields=['zoom_level', 'cell_x', 'cell_y'], condition=models.Q(is_dynamic=True),
+                name='mapcluster_unique_dynamic_cell',
+            ),
+        ]
+    
     def __str__(self):
         return f"Cluster {self.name} ({self.points_count} points)"
     
     def update_points_count(self):
-        # Cette méthode serait normalement implémentée avec une requête géospatiale
-        # Simplifiée ici pour l'exemple
-        self.points_count = MapPoint.objects.filter(
-            is_visible=True,
-            latitude__gte=self.latitude - 0.5,
-            latitude__lte=self.latitude + 0.5,
-            longitude__gte=self.longitude - 0.5,
-            longitude__lte=self.longitude + 0.5
-        ).count()
-        self.save()
+        """
+        Recompte les points de ce cluster (sa cellule ou son carré, voir
+        clustering.cluster_points_count) et n'écrit que sa propre ligne.
+        """
+        from .clustering import cluster_points_count
+        self.points_count = cluster_points_count(self)
+        if self.pk is not None:
+            MapCluster.objects.filter(pk=self.pk).update(points_count=self.points_count)
+        return self.points_count
@@ -0,0 +1,123 @@
+"""
+Formats compacts des points de la carte.
+
+Le format JSON par défaut répète pour chaque point les clés (`first_name`,
+`thumbnail`, `url`...) et une URL construite par reverse(). Pour l'affichage
+de la carte, seuls l'identifiant, la position et la note sont nécessaires;
+deux formats compacts sont proposés par négociation de contenu (en-tête
+Accept ou paramètre `format`):
+
+- `columns` (application/vnd.neads.map+json): tableaux par colonne, points
+  triés par identifiant, identifiants et coordonnées en virgule fixe
+  (1e-5 degré, soit environ 1 m) encodés en différences successives:
+
+    {"format": "columns", "count": 3, "scale": 100000,
+     "id": [12, 1, 5], "lat": [4885660, -12, 340], "lng": [...],
+     "rating": [45, 0, 38], "url_template": "/creators/detail/{id}/"}
+
+- `binary` (application/vnd.neads.map): en-tête de 12 octets (b"NMAP", version,
+  3 octets réservés, nombre de points en uint32), puis les tableaux Int32 des
+  identifiants, latitudes et longitudes en virgule fixe et enfin les notes
+  (uint8, dixièmes), le tout en little-endian. L'URL des fiches est fournie
+  par l'en-tête X-Url-Template.
+
+Le décodage côté navigateur est fait par static/js/map/map-payload.js.
+"""
+
+import struct
+import sys
+from array import array
+
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+
+COORDINATE_SCALE = 100000
+BINARY_MAGIC = b'NMAP'
+BINARY_VERSION = 1
+
+# Colonnes des points (MapPoint) lues pour les formats compacts
+COMPACT_POINT_FIELDS = ('creator_id', 'latitude', 'longitude', 'rating')
+
+FORMATS = {
+    'columns': 'application/vnd.neads.map+json',
+    'binary': 'application/vnd.neads.map',
+}
+
+
+def requested_format(request):
+    """Format compact demandé ('columns', 'binary') ou None pour le JSON par défaut."""
+    fmt = request.GET.get('format')
+    if fmt in FORMATS:
+        return fmt
+    accept = request.headers.get('accept', '')
+    for fmt, content_type in FORMATS.items():
+        if content_type in [part.split(';')[0].strip() for part in accept.split(',')]:
+            return fmt
+    return None
+
+
+# Identifiant fictif remplacé par `{id}` dans le modèle d'URL
+URL_PLACEHOLDER_ID = 2147483647
+
+
+def detail_url_template():
+    """Modèle d'URL des fiches créateurs, `{id}` étant remplacé côté client."""
+    url = reverse('creator_detail', kwargs={'creator_id': URL_PLACEHOLDER_ID})
+    return url.replace(str(URL_PLACEHOLDER_ID), '{id}')
+
+
+def _columns(points):
+    """(ids, lat, lng, notes) en entiers, triés par identifiant."""
+    ids, lats, lngs, ratings = array('i'), array('i'), array('i'), array('B')
+    for pk, lat, lng, rating in sorted(points):
+        ids.append(pk)
+        lats.append(round(lat * COORDINATE_SCALE))
+        lngs.append(round(lng * COORDINATE_SCALE))
+        ratings.append(round(float(rating or 0) * 10))
+    return ids, lats, lngs, ratings
+
+
+def _deltas(values):
+    previous = 0
+    result = []
+    for value in values:
+        result.append(value - previous)
+        previous = value
+    return result
+
+
+def columns_payload(points):
+    """Document du format `columns` pour des points (id, lat, lng, note)."""
+    ids, lats, lngs, ratings = _columns(points)
+    return {
+        'format': 'columns',
+        'count': len(ids),
+        'scale': COORDINATE_SCALE,
+        'id': _deltas(ids),
+        'lat': _deltas(lats),
+        'lng': _deltas(lngs),
+        'rating': list(ratings),
+        'url_template': detail_url_template(),
+    }
+
+
+def binary_payload(points):
+    """Contenu du format `binary` pour des points (id, lat, lng, note)."""
+    ids, lats, lngs, ratings = _columns(points)
+    if sys.byteorder != 'little':
+        for column in (ids, lats, lngs):
+            column.byteswap()
+    header = BINARY_MAGIC + struct.pack('<B3xI', BINARY_VERSION, len(ids))
+    return header + ids.tobytes() + lats.tobytes() + lngs.tobytes() + ratings.tobytes()
+
+
+def compact_response(fmt, points):
+    """Réponse au format compact demandé."""
+    if fmt == 'binary':
+        response = HttpResponse(binary_payload(points), content_type=FORMATS['binary'])
+        response['X-Url-Template'] = detail_url_template()
+    else:
+        response = JsonResponse(columns_payload(points), content_type=FORMATS['columns'])
+    patch_vary_headers(response, ['Accept'])
+    return response
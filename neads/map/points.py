@@ -0,0 +1,146 @@
+"""
+Points de la carte: modèle de lecture matérialisé (MapPoint).
+
+Chaque créateur localisé a un MapPoint qui contient tout ce qu'affiche la
+carte: position, nom complet (popup_title), nom masqué pour les clients
+(client_title, "Prénom N."), note, âge, image d'aperçu, domaines
+(popup_content), département et région.
+Les endpoints de la carte lisent cette seule table, étroite et indexée, sans
+jointure vers Creator, Location ou Media.
+
+Les points sont maintenus par les signaux (voir signals.py) à chaque écriture
+sur un créateur, une localisation, un média, un avis ou les domaines d'un créateur, et
+peuvent être reconstruits par `python manage.py rebuild_map_points`. Les
+clusters de la carte sont mis à jour en conséquence (voir clustering.py).
+"""
+
+from django.db.models import FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+
+from neads.creators.models import Creator, Location
+
+from .clustering import apply_point_changes
+from .models import MapPoint
+
+# Nombre de créateurs synchronisés par lot
+SYNC_BATCH_SIZE = 500
+
+# Colonnes mises à jour lors d'une synchronisation
+SYNCED_FIELDS = (
+    'location', 'latitude', 'longitude', 'popup_title', 'popup_content',
+    'first_name', 'last_name', 'client_title', 'rating', 'thumbnail', 'age',
+    'department', 'region', 'is_visible',
+)
+
+# Colonnes lues par les endpoints de la carte
+POINT_FIELDS = (
+    'creator_id', 'latitude', 'longitude', 'popup_title', 'client_title',
+    'first_name', 'last_name', 'rating', 'thumbnail',
+)
+
+# Colonnes lues par l'API des créateurs de la carte (/map/api/creators/)
+API_POINT_FIELDS = POINT_FIELDS + ('age',)
+
+
+def client_title(creator):
+    """Nom affiché aux clients: prénom et initiale du nom."""
+    initial = f" {creator.last_name[0]}." if creator.last_name else ''
+    return f"{creator.first_name}{initial}"
+
+
+def build_map_point(creator):
+    """MapPoint (non enregistré) d'un créateur, None s'il n'est pas localisé."""
+    location = creator.location
+    if location is None or location.latitude is None or location.longitude is None:
+        return None
+    return MapPoint(
+        creator_id=creator.pk,
+        location_id=location.pk,
+        latitude=location.latitude,
+        longitude=location.longitude,
+        popup_title=creator.full_name or f"{creator.first_name} {creator.last_name}",
+        popup_content=', '.join(sorted(domain.name for domain in creator.domains.all())),
+        first_name=creator.first_name,
+        last_name=creator.last_name,
+        client_title=client_title(creator),
+        rating=float(creator.average_rating or 0),
+        thumbnail=creator.cover_url or '',
+        age=creator.age,
+        department=location.department,
+        region=location.region,
+        is_visible=True,
+    )
+
+
+def sync_map_points(creator_ids):
+    """Crée, met à jour ou supprime les points des créateurs donnés."""
+    creator_ids = list(creator_ids)
+    for start in range(0, len(creator_ids), SYNC_BATCH_SIZE):
+        chunk = creator_ids[start:start + SYNC_BATCH_SIZE]
+        creators = Creator.objects.filter(pk__in=chunk).select_related('location').prefetch_related('domains')
+        points = [point for point in map(build_map_point, creators) if point is not None]
+        previous = {
+            creator_id: (latitude, longitude)
+            for creator_id, latitude, longitude in MapPoint.objects.filter(
+                creator_id__in=chunk, is_visible=True,
+            ).values_list('creator_id', 'latitude', 'longitude')
+        }
+        if points:
+            MapPoint.objects.bulk_create(
+                points, update_conflicts=True, unique_fields=['creator'], update_fields=SYNCED_FIELDS,
+            )
+
+        # Clusters: positions déplacées ou nouvelles (les suppressions passent par post_delete)
+        moved = [
+            point for point in points
+            if previous.get(point.creator_id) != (point.latitude, point.longitude)
+        ]
+        apply_point_changes(
+            removed=[previous[point.creator_id] for point in moved if point.creator_id in previous],
+            added=[(point.latitude, point.longitude) for point in moved],
+        )
+
+        located = {point.creator_id for point in points}
+        MapPoint.objects.filter(creator_id__in=[pk for pk in chunk if pk not in located]).delete()
+
+
+def refresh_map_point_thumbnail(creator_id):
+    """Recopie l'image de couverture du créateur dans son point, s'il existe."""
+    cover_url = Creator.objects.filter(pk=creator_id).values('cover_url')[:1]
+    MapPoint.objects.filter(creator_id=creator_id).update(thumbnail=Coalesce(Subquery(cover_url), Value('')))
+
+
+def refresh_map_point_rating(creator_id):
+    """Recopie la note moyenne du créateur dans son point, s'il existe."""
+    average_rating = Creator.objects.filter(pk=creator_id).values('average_rating')[:1]
+    MapPoint.objects.filter(creator_id=creator_id).update(
+        rating=Coalesce(Cast(Subquery(average_rating), FloatField()), Value(0.0)),
+    )
+
+
+def refresh_map_point_areas(location_ids):
+    """
+    Recopie le département et la région des localisations données dans leurs
+    points (écritures en masse sans signaux, voir backfill_location_addresses).
+    """
+    location = Location.objects.filter(pk=OuterRef('location_id'))
+    MapPoint.objects.filter(location_id__in=list(location_ids)).update(
+        department=Subquery(location.values('department')[:1]),
+        region=Subquery(location.values('region')[:1]),
+    )
+
+
+def rebuild_map_points():
+    """Synchronise les points de tous les créateurs et retourne le nombre de points."""
+    sync_map_points(Creator.objects.values_list('pk', flat=True).iterator())
+    return MapPoint.objects.count()
+
+
+def point_rows(creator_ids, fields=POINT_FIELDS, chunk_size=2000):
+    """Colonnes des points visibles des créateurs donnés, lues par lots (une table)."""
+    creator_ids = list(creator_ids)
+    for start in range(0, len(creator_ids), chunk_size):
+        yield from MapPoint.objects.filter(
+            creator_id__in=creator_ids[start:start + chunk_size], is_visible=True,
+        ).values_list(*fields)
+
@@ -0,0 +1,103 @@
+"""
+Signaux de l'application Map du projet NEADS.
+
+- Maintiennent les points de la carte (MapPoint, voir points.py) à chaque
+  écriture sur un créateur, une localisation, un média, un avis, un domaine
+  ou les domaines d'un créateur. Les signaux de l'application Creators (image de
+  couverture) sont enregistrés avant ceux-ci (ordre de INSTALLED_APPS): la
+  couverture est donc à jour lorsque le point est synchronisé.
+- Mettent à jour de façon incrémentale les clusters de la carte (voir
+  clustering.py) lorsqu'un point est créé, déplacé (points.py) ou supprimé.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from neads.creators.models import Creator, Domain, Location, Media, Rating
+
+from .clustering import apply_point_changes
+from .models import MapPoint
+from .points import refresh_map_point_rating, refresh_map_point_thumbnail, sync_map_points
+
+# Champs du créateur recopiés dans son point
+MAP_POINT_SOURCE_FIELDS = frozenset({
+    'first_name', 'last_name', 'full_name', 'location', 'average_rating', 'cover_url', 'age',
+})
+
+
+@receiver(post_save, sender=Creator)
+def creator_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not MAP_POINT_SOURCE_FIELDS.intersection(update_fields)):
+        return
+    sync_map_points([instance.pk])
+
+
+@receiver(post_delete, sender=MapPoint)
+def map_point_deleted(sender, instance, **kwargs):
+    # Suppression directe, d'un créateur (cascade) ou d'une localisation
+    if instance.is_visible:
+        apply_point_changes(removed=[(instance.latitude, instance.longitude)])
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_map_points(instance.creators.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Location)
+def location_deleted(sender, instance, **kwargs):
+    # Les créateurs perdent leur localisation (SET_NULL, sans signal)
+    MapPoint.objects.filter(creator__location=instance).delete()
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def media_changed(sender, instance, raw=False, **kwargs):
+    if raw or instance.media_type != 'image':
+        return
+    # Mise à jour seule (jamais de création): le créateur peut être en cours de suppression
+    refresh_map_point_thumbnail(instance.creator_id)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def rating_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Les agrégats du créateur sont écrits par update() (sans signal post_save du créateur)
+    refresh_map_point_rating(instance.creator_id)
+
+
+@receiver(post_save, sender=Domain)
+def domain_saved(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    sync_map_points(instance.creators.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Domain)
+def domain_deleting(sender, instance, **kwargs):
+    # Les liaisons sont supprimées sans signal m2m_changed
+    instance._map_creator_ids = list(instance.creators.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Domain)
+def domain_deleted(sender, instance, **kwargs):
+    sync_map_points(getattr(instance, '_map_creator_ids', []))
+
+
+@receiver(m2m_changed, sender=Creator.domains.through)
+def creator_domains_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # domain.creators.clear(): créateurs concernés inconnus après coup
+        instance._map_creator_ids = list(instance.creators.values_list('pk', flat=True))
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        sync_map_points([instance.pk])
+    elif action == 'post_clear':
+        sync_map_points(getattr(instance, '_map_creator_ids', []))
+    elif pk_set:
+        sync_map_points(pk_set)
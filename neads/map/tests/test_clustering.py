@@ -0,0 +1,166 @@
+import pytest
+import colorlog
+import logging
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import TestCase, Client
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.models import Creator
+from neads.creators.tests.test_query import make_creator
+from neads.map.clustering import (
+    MAX_CLUSTER_ZOOM, apply_point_changes, cell_of, cluster_points, ensure_clusters, recompute_cluster_counts,
+)
+from neads.map.models import MapCluster
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('map_clustering_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+PARIS = (48.8566, 2.3522)
+LYON = (45.7640, 4.8357)
+
+
+@pytest.mark.django_db
+class TestClustering(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests du clustering")
+        cache.clear()
+        for i in range(3):
+            make_creator(f'Paris{i}', 'Nom', lat=PARIS[0] + i * 0.001, lng=PARIS[1])
+        make_creator('Lyon', 'Nom', lat=LYON[0], lng=LYON[1], gender='M')
+        make_creator('Sans', 'Coordonnées')
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client = Client()
+        self.client.login(username='consultant@example.com', password='pass')
+
+    def test_hierarchy(self):
+        """Les clusters d'un niveau regroupent ceux du niveau plus détaillé."""
+        logger.info("Test de la hiérarchie des clusters")
+        levels = cluster_points([PARIS, PARIS, LYON], zooms=[2, 8, MAX_CLUSTER_ZOOM])
+        self.assertEqual([c.count for c in levels[2]], [3])
+        self.assertEqual(sorted(c.count for c in levels[8]), [1, 2])
+        self.assertEqual(cell_of(*PARIS, zoom=0), (2, 1))
+        for zoom, clusters in levels.items():
+            self.assertEqual(sum(c.count for c in clusters), 3)
+
+    def test_stored_clusters_rebuilt_on_change(self):
+        """Les clusters sont enregistrés dans MapCluster et reconstruits après une modification."""
+        logger.info("Test de la reconstruction des clusters")
+        ensure_clusters()
+        self.assertEqual(
+            sum(MapCluster.objects.filter(zoom_level=3).values_list('points_count', flat=True)), 4
+        )
+        make_creator('Lille', 'Nom', lat=50.63, lng=3.06)
+        ensure_clusters()
+        self.assertEqual(
+            sum(MapCluster.objects.filter(zoom_level=3).values_list('points_count', flat=True)), 5
+        )
+
+    def test_incremental_counts(self):
+        """Les mises à jour incrémentales donnent les mêmes clusters qu'un recalcul complet."""
+        logger.info("Test de la mise à jour incrémentale des clusters")
+        ensure_clusters()
+        lyon = Creator.objects.get(first_name='Lyon')
+        location = lyon.location
+        location.latitude, location.longitude = PARIS
+        location.save()
+        Creator.objects.get(first_name='Paris0').delete()
+        make_creator('Lille', 'Nom', lat=50.63, lng=3.06)
+
+        incremental = sorted(MapCluster.objects.values_list(
+            'zoom_level', 'cell_x', 'cell_y', 'points_count'
+        ))
+        self.assertEqual(
+            sum(count for zoom, _, _, count in incremental if zoom == 0), 4
+        )
+        self.assertEqual(recompute_cluster_counts(), 0)
+        self.assertEqual(sorted(MapCluster.objects.values_list(
+            'zoom_level', 'cell_x', 'cell_y', 'points_count'
+        )), incremental)
+
+    def test_fixed_cluster_counts(self):
+        """Les clusters fixes comptent les points de leur carré en un recalcul groupé."""
+        logger.info("Test des clusters fixes")
+        paris = MapCluster.objects.create(name='Paris', latitude=48.85, longitude=2.35, is_dynamic=False)
+        lyon = MapCluster.objects.create(name='Lyon', latitude=45.76, longitude=4.84, is_dynamic=False)
+        recompute_cluster_counts()
+        paris.refresh_from_db()
+        lyon.refresh_from_db()
+        self.assertEqual((paris.points_count, lyon.points_count), (3, 1))
+
+        make_creator('Lyon2', 'Nom', lat=45.7, lng=4.8)
+        lyon.refresh_from_db()
+        self.assertEqual(lyon.points_count, 2)
+
+        lyon.points_count = 0
+        lyon.update_points_count()
+        self.assertEqual(lyon.points_count, 2)
+
+    def test_update_points_count_single_cluster(self):
+        """Le recomptage d'un cluster dynamique ne lit que sa cellule et n'écrit que sa ligne."""
+        logger.info("Test du recomptage d'un cluster")
+        recompute_cluster_counts()
+        cluster = MapCluster.objects.filter(is_dynamic=True, zoom_level=12).order_by('-points_count').first()
+        expected = cluster.points_count
+        total = MapCluster.objects.count()
+        cluster.points_count = 0
+        self.assertEqual(cluster.update_points_count(), expected)
+
+        # Cellule sans point: comptage nul, aucune suppression ni création
+        empty = MapCluster.objects.create(
+            name='vide', latitude=0, longitude=0, zoom_level=12, cell_x=0, cell_y=0, is_dynamic=True,
+        )
+        self.assertEqual(empty.update_points_count(), 0)
+        self.assertEqual(MapCluster.objects.count(), total + 1)
+        unsaved = MapCluster(name='non enregistré', latitude=45.76, longitude=4.84, is_dynamic=False)
+        unsaved.update_points_count()
+        self.assertIsNone(unsaved.pk)
+        self.assertEqual(MapCluster.objects.count(), total + 1)
+
+    def test_unique_dynamic_cell(self):
+        """Une cellule n'a qu'un cluster dynamique; les ajouts s'appliquent au cluster existant."""
+        logger.info("Test de l'unicité des cellules")
+        ensure_clusters()
+        x, y = cell_of(*LYON, zoom=MAX_CLUSTER_ZOOM)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MapCluster.objects.create(
+                name='doublon', latitude=LYON[0], longitude=LYON[1],
+                zoom_level=MAX_CLUSTER_ZOOM, cell_x=x, cell_y=y, is_dynamic=True,
+            )
+
+        apply_point_changes(added=[LYON, (50.63, 3.06)])
+        cluster = MapCluster.objects.get(zoom_level=MAX_CLUSTER_ZOOM, cell_x=x, cell_y=y, is_dynamic=True)
+        self.assertEqual(cluster.points_count, 2)
+        self.assertEqual(
+            sum(MapCluster.objects.filter(zoom_level=0).values_list('points_count', flat=True)), 6
+        )
+
+    def test_api_clusters(self):
+        """L'endpoint retourne les clusters de l'emprise, filtres compris."""
+        logger.info("Test de l'endpoint des clusters")
+        url = reverse('api_map_clusters')
+        data = self.client.get(url, {'bbox': '-5,42,8,51', 'zoom': 5}).json()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(sorted(c['count'] for c in data['clusters']), [1, 3])
+
+        data = self.client.get(url, {'bbox': '4,45,6,46', 'zoom': 12}).json()
+        self.assertEqual([c['count'] for c in data['clusters']], [1])
+
+        data = self.client.get(url, {'bbox': '-5,42,8,51', 'zoom': 5, 'gender': 'M'}).json()
+        self.assertEqual(data['total'], 1)
+
+        self.assertEqual(self.client.get(url, {'bbox': 'x', 'zoom': 5}).status_code, 400)
@@ -29,7 +29,8 @@ logger.setLevel(logging.INFO)
 class TestMapPointModel(TestCase):
     def setUp(self):
         logger.info("Initialisation des tests du modèle MapPoint")
-        self.creator = CreatorFactory()
+        # Créateur sans localisation: son point n'est pas créé par la synchronisation (points.py)
+        self.creator = CreatorFactory(location=None)
         self.location = LocationFactory()
         self.map_point = MapPointFactory(
             creator=self.creator,
@@ -65,15 +66,17 @@ class TestMapPointModel(TestCase):
         """Test que le titre du popup est auto-généré si non spécifié."""
         logger.info("Test de génération automatique du titre du popup")
         
-        # Créer un point sans titre de popup
+        # Créer un point sans titre de popup (pour un autre créateur: un seul point par créateur)
+        creator = CreatorFactory(location=None)
         map_point = MapPointFactory.build(
-            creator=self.creator,
+            creator=creator,
+            location=self.location,
             popup_title=None
         )
         map_point.save()
         
         # Vérifier que le titre a été généré
-        self.assertEqual(map_point.popup_title, str(self.creator))
+        self.assertEqual(map_point.popup_title, str(creator))
 
     def test_auto_use_location_coordinates(self):
         """Test que les coordonnées de la location sont utilisées si non spécifiées."""
@@ -83,7 +86,7 @@ class TestMapPointModel(TestCase):
         
         # Créer un point sans coordonnées
         map_point = MapPointFactory.build(
-            creator=CreatorFactory(),
+            creator=CreatorFactory(location=None),
             location=location,
             latitude=None,
             longitude=None
@@ -101,23 +104,27 @@ class TestMapClusterModel(TestCase):
         logger.info("Initialisation des tests du modèle MapCluster")
         self.location = LocationFactory(latitude=48.8566, longitude=2.3522)
         
-        # Créer quelques points dans la zone
-        self.creator1 = CreatorFactory(location=self.location)
-        self.creator2 = CreatorFactory(location=self.location)
-        self.creator3 = CreatorFactory(location=self.location)
+        # Créer quelques points dans la zone (créateurs sans localisation:
+        # les points sont ceux de la fabrique, pas ceux de la synchronisation)
+        self.creator1 = CreatorFactory(location=None)
+        self.creator2 = CreatorFactory(location=None)
+        self.creator3 = CreatorFactory(location=None)
         
         self.map_point1 = MapPointFactory(
             creator=self.creator1,
+            location=self.location,
             latitude=48.86,
             longitude=2.35
         )
         self.map_point2 = MapPointFactory(
             creator=self.creator2,
+            location=self.location,
             latitude=48.87,
             longitude=2.36
         )
         self.map_point3 = MapPointFactory(
             creator=self.creator3,
+            location=self.location,
             latitude=48.85,
             longitude=2.34
         )
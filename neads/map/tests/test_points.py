@@ -0,0 +1,91 @@
+import pytest
+import colorlog
+import json
+import logging
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.models import Domain
+from neads.creators.tests.test_query import make_creator
+from neads.map.models import MapPoint
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('map_points_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+@pytest.mark.django_db
+class TestMapPoints(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des points de carte")
+        cache.clear()
+        self.video = Domain.objects.create(name='Vidéo')
+        self.creator = make_creator('Alice', 'Martin', domains=[self.video], lat=45.0, lng=5.0, average_rating=4.5)
+        self.unlocated = make_creator('Sans', 'Coordonnées')
+
+    def test_points_follow_writes(self):
+        """Les points suivent les créateurs, localisations et domaines."""
+        logger.info("Test de la synchronisation des points")
+        point = MapPoint.objects.get()
+        self.assertEqual(point.creator, self.creator)
+        self.assertEqual((point.latitude, point.longitude), (45.0, 5.0))
+        self.assertEqual(point.client_title, 'Alice M.')
+        self.assertEqual(point.popup_content, 'Vidéo')
+        self.assertEqual(point.rating, 4.5)
+
+        location = self.creator.location
+        location.latitude = 46.0
+        location.save()
+        self.assertEqual(MapPoint.objects.get().latitude, 46.0)
+
+        self.creator.domains.add(Domain.objects.create(name='Photo'))
+        self.assertEqual(MapPoint.objects.get().popup_content, 'Photo, Vidéo')
+        self.video.delete()
+        self.assertEqual(MapPoint.objects.get().popup_content, 'Photo')
+
+        location.latitude = None
+        location.save()
+        self.assertFalse(MapPoint.objects.exists())
+
+    def test_rebuild_command(self):
+        """La commande recrée les points manquants."""
+        logger.info("Test de la commande rebuild_map_points")
+        MapPoint.objects.all().delete()
+        call_command('rebuild_map_points', stdout=StringIO())
+        self.assertEqual(list(MapPoint.objects.values_list('creator_id', flat=True)), [self.creator.id])
+
+    def test_map_data_reads_points_only(self):
+        """Les points de la carte sont lus sans jointure, nom masqué pour les clients."""
+        logger.info("Test de la lecture des points")
+        User.objects.create_user(email='client@example.com', password='pass', role='client')
+        client = Client()
+        client.login(username='client@example.com', password='pass')
+        client.get(reverse('ajax_map_data'), **AJAX)  # Résultats de recherche en cache
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse('ajax_map_data'), **AJAX)
+            data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([p['name'] for p in data['points']], ['Alice M.'])
+        point_queries = [q['sql'] for q in context.captured_queries if 'map_mappoint' in q['sql']]
+        self.assertEqual(len(point_queries), 1)
+        self.assertNotIn('JOIN', point_queries[0])
@@ -0,0 +1,151 @@
+import pytest
+import colorlog
+import json
+import logging
+import struct
+from itertools import accumulate
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from neads.core.models import User
+from neads.creators.tests.test_query import make_creator
+from neads.map.areas import area_counts
+from neads.map.payload import FORMATS
+
+# Configuration de colorlog
+handler = colorlog.StreamHandler()
+handler.setFormatter(colorlog.ColoredFormatter(
+    '%(log_color)s%(levelname)s:%(name)s:%(message)s',
+    log_colors={
+        'DEBUG': 'cyan',
+        'INFO': 'green',
+        'WARNING': 'yellow',
+        'ERROR': 'red',
+        'CRITICAL': 'red,bg_white',
+    }
+))
+
+logger = colorlog.getLogger('map_view_tests')
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+@pytest.mark.django_db
+class TestAjaxMapData(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des données de carte")
+        cache.clear()
+        self.client = Client()
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client.login(username='consultant@example.com', password='pass')
+        for i in range(5):
+            make_creator(f'Prénom{i}', f'Nom{i}', lat=45.0 + i, lng=5.0, gender='M' if i % 2 else 'F')
+        make_creator('Sans', 'Coordonnées')
+
+    def test_streamed_points(self):
+        """Les points des créateurs localisés sont envoyés en flux, filtres appliqués."""
+        logger.info("Test du flux des points de carte")
+        response = self.client.get(reverse('ajax_map_data'), **AJAX)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['total'], 5)
+        self.assertEqual({p['lat'] for p in data['points']}, {45.0, 46.0, 47.0, 48.0, 49.0})
+        self.assertTrue(data['points'][0]['url'].startswith('/creators/detail/'))
+
+        response = self.client.get(reverse('ajax_map_data'), {'gender': 'M'}, **AJAX)
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['total'], 2)
+
+    def test_columns_format(self):
+        """Le format en colonnes se décode en identifiants et coordonnées d'origine."""
+        logger.info("Test du format compact en colonnes")
+        response = self.client.get(reverse('ajax_map_data'), HTTP_ACCEPT=FORMATS['columns'], **AJAX)
+        self.assertEqual(response['Content-Type'], FORMATS['columns'])
+        self.assertIn('Accept', response['Vary'])
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 5)
+        ids = list(accumulate(data['id']))
+        self.assertEqual(ids, sorted(ids))
+        lats = [value / data['scale'] for value in accumulate(data['lat'])]
+        self.assertEqual(lats, [45.0, 46.0, 47.0, 48.0, 49.0])
+        self.assertEqual(set(accumulate(data['lng'])), {500000})
+        self.assertEqual(data['url_template'].replace('{id}', str(ids[0])),
+                         reverse('creator_detail', kwargs={'creator_id': ids[0]}))
+
+    def test_binary_format(self):
+        """Le format binaire contient l'en-tête et quatre colonnes par point."""
+        logger.info("Test du format compact binaire")
+        response = self.client.get(reverse('ajax_map_data'), {'format': 'binary', 'gender': 'M'}, **AJAX)
+        self.assertEqual(response['Content-Type'], FORMATS['binary'])
+        self.assertIn('{id}', response['X-Url-Template'])
+        content = response.content
+        self.assertEqual(content[:4], b'NMAP')
+        version, count = struct.unpack_from('<B3xI', content, 4)
+        self.assertEqual((version, count), (1, 2))
+        self.assertEqual(len(content), 12 + count * (3 * 4 + 1))
+        lats = struct.unpack_from(f'<{count}i', content, 12 + count * 4)
+        self.assertEqual(sorted(lats), [4600000, 4800000])
+
+
+    def test_api_creators_age_and_masking(self):
+        """L'API des créateurs renvoie l'âge et masque le nom de famille pour les clients."""
+        logger.info("Test de l'API des créateurs de la carte")
+        data = self.client.get(reverse('api_creators'), {'gender': 'F'}).json()
+        self.assertEqual(len(data), 3)
+        self.assertTrue(all(creator['last_name'].startswith('Nom') for creator in data))
+        self.assertIn('age', data[0])
+
+        User.objects.create_user(email='client@example.com', password='pass', role='client')
+        self.client.login(username='client@example.com', password='pass')
+        data = self.client.get(reverse('api_creators')).json()
+        self.assertEqual({creator['last_name'] for creator in data}, {''})
+        self.assertTrue(all(creator['name'].endswith('N.') for creator in data))
+
+    def test_map_search_page(self):
+        """La page de recherche sur la carte s'affiche avec le nombre de créateurs localisés."""
+        logger.info("Test de la page de recherche sur la carte")
+        response = self.client.get(reverse('map_search'), {'gender': 'F'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_creators'], 5)
+
+@pytest.mark.django_db
+class TestMapAreas(TestCase):
+    def setUp(self):
+        logger.info("Initialisation des tests des agrégats par zone")
+        cache.clear()
+        self.client = Client()
+        User.objects.create_user(email='consultant@example.com', password='pass', role='consultant')
+        self.client.login(username='consultant@example.com', password='pass')
+        make_creator('Alice', 'Martin', address='3 place Bellecour, 69002 Lyon', lat=45.76, lng=4.83, gender='F')
+        make_creator('Bruno', 'Petit', address='1 rue Balay, 42000 Saint-Étienne', lat=45.44, lng=4.39, gender='M')
+        make_creator('Chloe', 'Durand', address='12 rue de la Paix, 75002 Paris', lat=48.87, lng=2.33, gender='F')
+        make_creator('Hors', 'France', address='Genève, Suisse', lat=46.2, lng=6.14)
+
+    def test_department_counts(self):
+        """Un agrégat par département, placé à la position moyenne de ses points."""
+        logger.info("Test des agrégats par département")
+        data = self.client.get(reverse('api_map_areas')).json()
+        self.assertEqual(data['level'], 'department')
+        self.assertEqual([(area['code'], area['name'], area['count']) for area in data['areas']],
+                         [('42', 'Loire', 1), ('69', 'Rhône', 1), ('75', 'Paris', 1)])
+        self.assertEqual(data['total'], 3)
+        self.assertAlmostEqual(data['areas'][1]['lat'], 45.76)
+        # Une seule table lue (colonnes recopiées dans MapPoint)
+        with CaptureQueriesContext(connection) as context:
+            area_counts('region')
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('creators_location', context.captured_queries[0]['sql'])
+
+    def test_region_counts_with_filters(self):
+        """Agrégats par région, restreints aux résultats de la recherche."""
+        logger.info("Test des agrégats par région filtrés")
+        data = self.client.get(reverse('api_map_areas'), {'level': 'region'}).json()
+        self.assertEqual({area['name']: area['count'] for area in data['areas']},
+                         {'Auvergne-Rhône-Alpes': 2, 'Île-de-France': 1})
+        data = self.client.get(reverse('api_map_areas'), {'level': 'region', 'gender': 'F'}).json()
+        self.assertEqual({area['code']: area['count'] for area in data['areas']}, {'84': 1, '11': 1})
+        response = self.client.get(reverse('api_map_areas'), {'level': 'commune'})
+        self.assertEqual(response.status_code, 400)
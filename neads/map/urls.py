@@ -6,4 +6,6 @@ urlpatterns = [
     path('ajax/data/', views.ajax_map_data, name='ajax_map_data'),
     path('search/', views.map_search_view, name='map_search'),
     path('api/creators/', views.api_creators, name='api_creators'),
+    path('api/clusters/', views.api_map_clusters, name='api_map_clusters'),
+    path('api/areas/', views.api_map_areas, name='api_map_areas'),
 ] 
\ No newline at end of file
@@ -1,14 +1,21 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
-from django.db.models import Q, Min, Max
-from django.urls import reverse
 import logging
 import json
 
-from neads.creators.models import Creator, Domain
 from neads.creators.forms import CreatorSearchForm
-from py_countries_states_cities_database import get_all_countries_and_cities_nested
+from neads.creators.facets import creator_facets
+from neads.creators.page_context import map_page_context
+from neads.core.streaming import StreamingJsonResponse
+from neads.creators.query import CreatorQuery
+from neads.creators.etags import catalog_conditional
+from neads.creators.results import CreatorResults
+from neads.creators.spatial import parse_bbox
+from .areas import LEVELS, area_counts
+from .clustering import MAX_CLUSTER_ZOOM, MIN_ZOOM, filtered_clusters, stored_clusters
+from .payload import COMPACT_POINT_FIELDS, compact_response, detail_url_template, requested_format
+from .points import API_POINT_FIELDS, point_rows
 
 
 
@@ -17,58 +24,33 @@ def map_view(request):
     """
     Vue principale de la carte des créateurs.
     """
-    # Récupérer tous les créateurs avec coordonnées de localisation
-    creators = Creator.objects.filter(
-        location__isnull=False,
-        location__latitude__isnull=False,
-        location__longitude__isnull=False
-    )
-    
     # Formulaire de recherche pour les filtres
     form = CreatorSearchForm(request.GET)
     
-    # Récupérer les domaines avec leur nombre d'utilisations, comme dans la galerie
-    domains = Domain.objects.all()
-    domains_data = []
-    
-    for domain in domains:
-        count = Creator.objects.filter(domains=domain).count()
-        domains_data.append({
-            'id': domain.id,
-            'name': domain.name,
-            'count': count
-        })
-    
-    # Trier les domaines par comptage
-    domains_data.sort(key=lambda x: x['count'], reverse=True)
+    # Récupérer les domaines avec leur nombre d'utilisations parmi les créateurs
+    # localisés correspondant aux filtres (une requête groupée, mise en cache)
+    domains_data = sorted(
+        creator_facets(CreatorQuery.from_form(form), located=True)['domains'],
+        key=lambda x: x['count'], reverse=True,
+    )
     
     # Convertir les domaines en JSON pour le template
     domains_json = json.dumps(domains_data)
     
-    # Âge minimum et maximum des créateurs pour les filtres
-    min_creator_age = Creator.objects.all().aggregate(Min('age'))['age__min'] or 18
-    max_creator_age = Creator.objects.all().aggregate(Max('age'))['age__max'] or 80
-    all_countries = get_all_countries_and_cities_nested()
-
-    
-    context = {
+    # Nombre de créateurs localisés, bornes d'âge et pays: construits une fois
+    # par version des données
+    context = map_page_context()
+    context.update({
         'form': form,
-        'total_creators': creators.count(),
         'domains': domains_data,
         'domains_json': domains_json,
-        'min_creator_age': min_creator_age,
-        'max_creator_age': max_creator_age,
-        'countries':all_countries,
-        'country_city_map': json.dumps({
-            entry["iso2"]: entry["cities"]
-            for entry in all_countries
-        })
-    }
+    })
     
     return render(request, 'search/map.html', context)
 
 
 @login_required
+@catalog_conditional
 def ajax_map_data(request):
     """
     Endpoint AJAX pour les données de carte avec filtres.
@@ -79,111 +61,48 @@ def ajax_map_data(request):
     if not request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'error': 'AJAX requests only'}, status=400)
     
-    # Filtres de base - uniquement créateurs avec coordonnées
-    creators = Creator.objects.filter(
-        location__isnull=False,
-        location__latitude__isnull=False, 
-        location__longitude__isnull=False
-    )
-    
     try:
-        # Appliquer les filtres supplémentaires
-        form = CreatorSearchForm(request.GET)
-        if form.is_valid():
-            data = form.cleaned_data
-            logger.info(f"Form is valid with data: {data}")
-            
-            # Filtre par nom/prénom
-            if data.get('query'):
-                query = data['query']
-                creators = creators.filter(
-                    Q(first_name__icontains=query) | 
-                    Q(last_name__icontains=query) | 
-                    Q(full_name__icontains=query)
-                )
-                
-            # Filtre par domaines
-            if data.get('domains'):
-                creators = creators.filter(domains__in=data['domains']).distinct()
-                
-            # Filtres par âge
-            if data.get('min_age'):
-                creators = creators.filter(age__gte=data['min_age'])
-            if data.get('max_age'):
-                creators = creators.filter(age__lte=data['max_age'])
-                
-            # Filtre par genre
-            if data.get('gender'):
-                creators = creators.filter(gender=data['gender'])
-                
-            # Filtre par type de contenu
-            if data.get('content_type'):
-                creators = creators.filter(content_types=data['content_type'])
-                
-            # Filtres géographiques
-            if data.get('country'):
-                creators = creators.filter(location__full_address__icontains=data['country'])
-            if data.get('city'):
-                creators = creators.filter(location__full_address__icontains=data['city'])
-                
-            # Filtre par note minimale
-            if data.get('min_rating'):
-                creators = creators.filter(average_rating__gte=data['min_rating'])
-                
-            # Autres filtres spécifiques
-            if data.get('can_invoice'):
-                creators = creators.filter(can_invoice=True)
-            if data.get('verified_only'):
-                creators = creators.filter(verified_by_neads=True)
+        # Filtres partagés avec la galerie, uniquement créateurs avec coordonnées
+        creator_query = CreatorQuery.from_request(request)
+        logger.info(f"Filter spec: {creator_query!r}")
+        creators = CreatorResults(creator_query, user=request.user, located=True, prepare=None)
+        # Évaluer la recherche avant de commencer la réponse
+        logger.info(f"Returning {len(creators)} map points")
     except Exception as e:
         logger.error(f"Error applying filters: {e}")
         return JsonResponse({'error': str(e), 'points': []}, status=500)
     
-    # Préparer les données pour la carte
-    map_points = []
-    try:
-        for creator in creators:
-            if creator.location and creator.location.latitude and creator.location.longitude:
-                # Trouver une image pour l'aperçu
-                thumbnail = None
-                try:
-                    if creator.media.filter(media_type='image').exists():
-                        media_obj = creator.media.filter(media_type='image').first()
-                        # Vérifier si le fichier existe réellement
-                        if media_obj.file and hasattr(media_obj.file, 'name') and media_obj.file.name:
-                            thumbnail = media_obj.file.url
-                except Exception as media_error:
-                    logger.warning(f"Error getting media for creator {creator.id}: {media_error}")
-                    
-                # Utiliser la fonction reverse pour générer une URL correcte
-                creator_url = reverse('creator_detail', kwargs={'creator_id': creator.id})
-                
-                # Format name based on user role
-                if request.user.role == 'client':
-                    creator_name = f"{creator.first_name} {creator.last_name[0]}."
-                else:
-                    creator_name = creator.full_name
-                
-                map_points.append({
-                    'id': creator.id,
-                    'name': creator_name,
-                    'first_name': creator.first_name,
-                    'last_name': creator.last_name,
-                    'lat': float(creator.location.latitude),
-                    'lng': float(creator.location.longitude),
-                    'rating': float(creator.average_rating),
-                    'thumbnail': thumbnail,
-                    'url': creator_url,
-                })
-    except Exception as e:
-        logger.error(f"Error preparing map points: {e}")
-        return JsonResponse({'error': str(e), 'points': []}, status=500)
-        
-    logger.info(f"Returning {len(map_points)} map points")
-    return JsonResponse({
-        'points': map_points,
-        'total': len(map_points)
-    })
+    # Formats compacts pour l'affichage de la carte (identifiants, positions, notes)
+    fmt = requested_format(request)
+    if fmt:
+        return compact_response(fmt, point_rows(creators.ids, COMPACT_POINT_FIELDS))
+    
+    # Points lus dans la seule table MapPoint (nom masqué précalculé pour les clients)
+    is_client = request.user.role == 'client'
+    url_template = detail_url_template()
+    
+    def map_points():
+        try:
+            for creator_id, lat, lng, title, masked_title, first_name, last_name, rating, thumbnail in point_rows(creators.ids):
+                yield {
+                    'id': creator_id,
+                    'name': masked_title if is_client else title,
+                    'first_name': first_name,
+                    # Nom de famille masqué pour les clients (voir client_title)
+                    'last_name': '' if is_client else last_name,
+                    'lat': lat,
+                    'lng': lng,
+                    'rating': rating,
+                    'thumbnail': thumbnail or None,
+                    'url': url_template.replace('{id}', str(creator_id)),
+                }
+        except Exception as e:
+            # La réponse est déjà commencée: le document est tronqué
+            logger.error(f"Error preparing map points: {e}")
+            raise
+    
+    # Les points sont encodés et envoyés au fil de l'eau (mémoire constante)
+    return StreamingJsonResponse(map_points(), key='points', count_key='total')
 
 
 @login_required
@@ -191,75 +110,111 @@ def map_search_view(request):
     """
     Vue de recherche sur la carte des créateurs.
     """
-    # Récupérer tous les créateurs avec coordonnées de localisation
-    creators = Creator.objects.filter(
-        location__isnull=False,
-        location__latitude__isnull=False,
-        location__longitude__isnull=False
-    )
-    
     # Formulaire de recherche pour les filtres
     form = CreatorSearchForm(request.GET)
     
-    context = {
+    # Nombre de créateurs localisés, bornes d'âge et pays: construits une fois
+    # par version des données (voir map_page_context)
+    context = map_page_context()
+    context.update({
         'form': form,
-        'total_creators': creators.count(),
-    }
+        'domains': creator_facets(CreatorQuery.from_form(form), located=True)['domains'],
+    })
     
-    return render(request, 'map/map_search.html', context)
+    return render(request, 'map/map_view.html', context)
 
 
 @login_required
+@catalog_conditional
 def api_creators(request):
     """
     API endpoint for retrieving creators with valid location data.
     Returns a list of creators with their location and profile information.
     """
-    # Get creators with valid location data
-    creators = Creator.objects.filter(
-        location__latitude__isnull=False,
-        location__longitude__isnull=False
-    )
+    # Get creators with valid location data, filtered like the gallery (cached results)
+    creators = CreatorResults(CreatorQuery.from_request(request), user=request.user, located=True, prepare=None)
+    is_client = request.user.role == 'client'
+    url_template = detail_url_template()
 
-    # Apply filters if provided
-    min_rating = request.GET.get('min_rating')
-    if min_rating and min_rating.isdigit():
-        creators = creators.filter(avg_rating__gte=float(min_rating))
-    
-    min_age = request.GET.get('min_age')
-    max_age = request.GET.get('max_age')
-    if min_age and min_age.isdigit():
-        creators = creators.filter(age__gte=int(min_age))
-    if max_age and max_age.isdigit():
-        creators = creators.filter(age__lte=int(max_age))
-    
-    city = request.GET.get('city')
-    if city:
-        creators = creators.filter(location__full_address__icontains=city)
-
-    # Prepare the creator data
+    # Prepare the creator data (MapPoint read model, no joins)
     creators_data = []
-    for creator in creators:
-        # Format name based on user role
-        if request.user.role == 'client':
-            creator_name = f"{creator.first_name} {creator.last_name[0]}."
-        else:
-            creator_name = f"{creator.first_name} {creator.last_name}"
-            
+    rows = point_rows(creators.ids, API_POINT_FIELDS)
+    for creator_id, lat, lng, title, masked_title, first_name, last_name, rating, thumbnail, age in rows:
         creator_data = {
-            'id': creator.id,
-            'name': creator_name,
-            'first_name': creator.first_name,
-            'last_name': creator.last_name,
-            'rating': creator.avg_rating,
-            'age': creator.age,
-            'image': creator.profile_image.url if creator.profile_image else None,
-            'lat': creator.location.latitude,
-            'lng': creator.location.longitude,
+            'id': creator_id,
+            'name': masked_title if is_client else title,
+            'first_name': first_name,
+            # Nom de famille masqué pour les clients (voir client_title)
+            'last_name': '' if is_client else last_name,
+            'rating': rating,
+            'age': age,
+            'image': thumbnail or None,
+            'lat': lat,
+            'lng': lng,
             'city': '',
             'country': '',
-            'url': reverse('creator_detail', args=[creator.id])
+            'url': url_template.replace('{id}', str(creator_id)),
         }
         creators_data.append(creator_data)
     
     return JsonResponse(creators_data, safe=False)
+
+
+@login_required
+@catalog_conditional
+def api_map_clusters(request):
+    """
+    API endpoint des clusters de créateurs d'une emprise de la carte.
+    Paramètres: bbox=ouest,sud,est,nord et zoom (niveau de zoom de la carte),
+    ainsi que les filtres de recherche habituels.
+    """
+    try:
+        bbox = parse_bbox(request.GET.get('bbox', ''))
+        zoom = int(request.GET.get('zoom', ''))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid bbox or zoom parameters'}, status=400)
+    zoom = max(MIN_ZOOM, min(MAX_CLUSTER_ZOOM, zoom))
+
+    creator_query = CreatorQuery.from_request(request)
+    if creator_query:
+        # Recherche filtrée: clusters du niveau demandé calculés sur les résultats en cache
+        creators = CreatorResults(creator_query, user=request.user, located=True, prepare=None)
+        positions = point_rows(creators.ids, ('latitude', 'longitude'))
+        clusters = filtered_clusters(positions, bbox, zoom)
+    else:
+        clusters = stored_clusters(bbox, zoom)
+
+    return JsonResponse({
+        'zoom': zoom,
+        'clusters': [
+            {'lat': cluster.latitude, 'lng': cluster.longitude, 'count': cluster.count}
+            for cluster in clusters
+        ],
+        'total': sum(cluster.count for cluster in clusters),
+    })
+
+
+@login_required
+@catalog_conditional
+def api_map_areas(request):
+    """
+    API endpoint du nombre de créateurs par zone (voir areas.py).
+    Paramètres: level=department (par défaut) ou region, ainsi que les filtres
+    de recherche habituels.
+    """
+    level = request.GET.get('level', 'department')
+    if level not in LEVELS:
+        return JsonResponse({'error': 'Invalid level parameter'}, status=400)
+
+    creator_query = CreatorQuery.from_request(request)
+    if creator_query:
+        creators = CreatorResults(creator_query, user=request.user, located=True, prepare=None)
+        areas = area_counts(level, creators.ids)
+    else:
+        areas = area_counts(level)
+
+    return JsonResponse({
+        'level': level,
+        'areas': areas,
+        'total': sum(area['count'] for area in areas),
+    })
@@ -94,4 +94,6 @@ LOGOUT_REDIRECT_URL = 'home'
 AUTH_USER_MODEL = 'core.User'
 
 # Location API settings
-NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search' 
\ No newline at end of file
+NOMINATIM_URL = 'https://nominatim.openstreetmap.org/search'
+# Intervalle minimal (secondes) entre deux requêtes à Nominatim (politique d'usage: 1 requête/s)
+NOMINATIM_MIN_INTERVAL = 1.0 
\ No newline at end of file
@@ -16,5 +16,12 @@ DATABASES = {
     }
 }
 
+# Cache local (un seul processus en développement)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Email backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend' 
\ No newline at end of file
@@ -0,0 +1,63 @@
+/**
+ * Sélecteur de villes dépendant du pays (galerie et carte).
+ *
+ * Les villes ne sont pas incluses dans la page: elles proviennent du fichier
+ * statique compilé (data-cities-url, mis en cache par le navigateur) ou, à
+ * défaut, de l'API pays par pays (data-cities-endpoint, "XX" = code ISO2).
+ */
+(function () {
+    let allCities = null;
+    const countryCache = {};
+
+    async function fetchCities(select, iso2) {
+        const assetUrl = select.dataset.citiesUrl;
+        if (assetUrl) {
+            if (!allCities) {
+                const response = await fetch(assetUrl);
+                if (!response.ok) throw new Error('Fichier des villes indisponible');
+                allCities = await response.json();
+            }
+            return allCities[iso2] || [];
+        }
+        if (!countryCache[iso2]) {
+            const url = select.dataset.citiesEndpoint.replace('XX', encodeURIComponent(iso2));
+            const response = await fetch(url, { credentials: 'same-origin' });
+            if (!response.ok) return [];
+            countryCache[iso2] = (await response.json()).cities;
+        }
+        return countryCache[iso2];
+    }
+
+    window.updateCities = async function () {
+        const countrySelect = document.getElementById('country');
+        const citySelect = document.getElementById('city');
+        const selectedCountryIso2 = countrySelect.value;
+
+        citySelect.innerHTML = '<option value="">Sélectionnez une ville</option>';
+
+        if (!selectedCountryIso2) {
+            return;
+        }
+
+        let cities = [];
+        try {
+            cities = await fetchCities(countrySelect, selectedCountryIso2);
+        } catch (error) {
+            console.error('Erreur lors du chargement des villes:', error);
+        }
+
+        // Le pays a pu changer pendant le chargement
+        if (countrySelect.value !== selectedCountryIso2) {
+            return;
+        }
+
+        const fragment = document.createDocumentFragment();
+        cities.forEach(name => {
+            const option = document.createElement('option');
+            option.value = name;
+            option.textContent = name;
+            fragment.appendChild(option);
+        });
+        citySelect.appendChild(fragment);
+    };
+})();
@@ -0,0 +1,85 @@
+/**
+ * Décodage des formats compacts des points de la carte (voir neads/map/payload.py)
+ * Usage:
+ *   MapPayload.fetchPoints(url, 'binary').then(points => ...)
+ * Chaque point est {id, lat, lng, rating, url}
+ */
+const MapPayload = (() => {
+    const CONTENT_TYPES = {
+        columns: 'application/vnd.neads.map+json',
+        binary: 'application/vnd.neads.map'
+    };
+    const MAGIC = 'NMAP';
+    const HEADER_SIZE = 12;
+
+    function buildPoints(ids, lats, lngs, ratings, scale, urlTemplate) {
+        const points = new Array(ids.length);
+        for (let i = 0; i < ids.length; i++) {
+            points[i] = {
+                id: ids[i],
+                lat: lats[i] / scale,
+                lng: lngs[i] / scale,
+                rating: ratings[i] / 10,
+                url: urlTemplate ? urlTemplate.replace('{id}', ids[i]) : null
+            };
+        }
+        return points;
+    }
+
+    // Somme cumulée des différences successives
+    function undelta(values) {
+        const result = new Array(values.length);
+        let current = 0;
+        for (let i = 0; i < values.length; i++) {
+            current += values[i];
+            result[i] = current;
+        }
+        return result;
+    }
+
+    function decodeColumns(data) {
+        return buildPoints(
+            undelta(data.id), undelta(data.lat), undelta(data.lng),
+            data.rating, data.scale, data.url_template
+        );
+    }
+
+    function decodeBinary(buffer, urlTemplate, scale = 100000) {
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(
+            view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+        );
+        if (magic !== MAGIC) {
+            throw new Error('Format de points inconnu');
+        }
+        const count = view.getUint32(8, true);
+        const read = (index) => {
+            const column = new Int32Array(count);
+            const offset = HEADER_SIZE + index * count * 4;
+            for (let i = 0; i < count; i++) {
+                column[i] = view.getInt32(offset + i * 4, true);
+            }
+            return column;
+        };
+        const ratings = new Uint8Array(buffer, HEADER_SIZE + 3 * count * 4, count);
+        return buildPoints(read(0), read(1), read(2), ratings, scale, urlTemplate);
+    }
+
+    function fetchPoints(url, format = 'binary') {
+        return fetch(url, {
+            headers: { 'Accept': CONTENT_TYPES[format] },
+            credentials: 'same-origin'
+        }).then(response => {
+            if (!response.ok) {
+                throw new Error(`Erreur HTTP ${response.status}`);
+            }
+            if (format === 'binary') {
+                const urlTemplate = response.headers.get('X-Url-Template');
+                return response.arrayBuffer().then(buffer => decodeBinary(buffer, urlTemplate));
+            }
+            return response.json().then(decodeColumns);
+        });
+    }
+
+    return { decodeColumns, decodeBinary, fetchPoints };
+})();